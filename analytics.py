@@ -0,0 +1,142 @@
+"""
+Which habits go together: co-occurrence counts, same-day and next-day
+correlations between habits, and rolling completion rates.
+
+The history is loaded once into a day-by-habit boolean matrix straight from
+the store's day masks, so every statistic is a handful of NumPy operations
+over the whole matrix instead of a Python loop over days and habit lists.
+
+    python analytics.py [--data habits.json] [--lag 1] [--start 2025-01-01]
+"""
+import argparse
+from datetime import date, timedelta
+
+import numpy as np
+
+from habit_bitmap import HABIT_BITS
+from habit_core import DATA_FILE, DEFAULT_HABITS, HABITS_CONFIG_FILE, HabitLog, load_habits_config, parse_day
+
+ROLLING_WINDOW = 30
+
+
+class HabitMatrix:
+    """
+    done[d, h] is True if habits[h] was completed on day start + d, and
+    logged[d] if anything at all was logged that day. Days with no log
+    count as "not done" in the counts and rates, but are left out of the
+    correlations, which should only compare days someone actually filled in.
+    """
+
+    def __init__(self, start, habits, done, logged):
+        self.start = start
+        self.habits = list(habits)
+        self.done = done
+        self.logged = logged
+
+    @classmethod
+    def load(cls, habit_log, start=None, end=None):
+        """The matrix for habit_log's habits from start (default: first logged day) to end (default: today)."""
+        end = parse_day(end)
+        if start is None:
+            first = next(iter(habit_log.query(end=end)), None)
+            start = date.fromisoformat(first[0]) if first else end
+        start = parse_day(start)
+        masks = np.array(habit_log.store.range_masks(start, end), dtype=np.uint64)
+        habit_ids = habit_log.store.bitmap().habit_ids
+        # Habits never logged have no ID yet; their column stays all False.
+        ids = np.array([habit_ids.get(habit, HABIT_BITS) for habit in habit_log.habits], dtype=np.uint64)
+        done = (masks[:, np.newaxis] >> ids & np.uint64(1)).astype(bool)
+        done[:, ids == HABIT_BITS] = False
+        logged = (masks >> np.uint64(HABIT_BITS)).astype(bool)
+        return cls(start, habit_log.habits, done, logged)
+
+    def __len__(self):
+        return len(self.done)
+
+    @property
+    def end(self):
+        return self.start + timedelta(days=len(self) - 1)
+
+    def totals(self):
+        return self.done.sum(axis=0)
+
+    def co_occurrence(self):
+        """counts[i, j]: days both habits i and j were done. The diagonal is each habit's total."""
+        # A float matmul goes through BLAS; integer ones don't. Counts stay exact.
+        done = self.done.astype(np.float64)
+        return (done.T @ done).astype(np.int64)
+
+    def conditional_rates(self):
+        """rates[i, j]: share of the days habit i was done that habit j was done too."""
+        counts = self.co_occurrence()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(counts.diagonal()[:, np.newaxis] > 0, counts / counts.diagonal()[:, np.newaxis], 0.0)
+
+    def lagged_correlation(self, lag=0):
+        """
+        corr[i, j]: Pearson correlation between habit i on a day and habit j
+        lag days later, over pairs of days that were both logged. lag 0 is
+        the same day. NaN where a habit never varies over those days.
+        """
+        if lag < 0:
+            raise ValueError("lag must be 0 or more days")
+        if lag >= len(self):
+            return np.full((len(self.habits), len(self.habits)), np.nan)
+        both = self.logged[:len(self) - lag] & self.logged[lag:]
+        before = self.done[:len(self) - lag][both].astype(np.float64)
+        after = self.done[lag:][both].astype(np.float64)
+        before -= before.mean(axis=0) if len(before) else 0
+        after -= after.mean(axis=0) if len(after) else 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            norms = np.sqrt((before * before).sum(axis=0))[:, np.newaxis] * np.sqrt((after * after).sum(axis=0))
+            return (before.T @ after) / norms
+
+    def rolling_rates(self, window=ROLLING_WINDOW):
+        """rates[d, h]: share of the window days ending on day start + window - 1 + d that habit h was done."""
+        if window > len(self):
+            return np.zeros((0, len(self.habits)))
+        sums = np.cumsum(self.done, axis=0, dtype=np.int64)
+        sums = np.concatenate([np.zeros((1, len(self.habits)), dtype=np.int64), sums])
+        return (sums[window:] - sums[:-window]) / window
+
+
+def strongest_pairs(matrix, correlation, limit=10):
+    """(habit, other, r) for the largest correlations, strongest first, skipping a habit against itself."""
+    values = np.where(np.eye(len(matrix.habits), dtype=bool), np.nan, correlation)
+    order = np.argsort(-np.nan_to_num(values, nan=-np.inf), axis=None)
+    pairs = []
+    for flat in order[:limit]:
+        i, j = divmod(int(flat), len(matrix.habits))
+        if np.isnan(values[i, j]):
+            break
+        pairs.append((matrix.habits[i], matrix.habits[j], float(values[i, j])))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show which habits tend to be done together.")
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--habits-file", default=HABITS_CONFIG_FILE)
+    parser.add_argument("--start", help="first day to include (default: the first logged day)")
+    parser.add_argument("--end", help="last day to include (default: today)")
+    parser.add_argument("--lag", type=int, default=1, help="days between a habit and the one it may predict")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    habits = load_habits_config(args.habits_file) or DEFAULT_HABITS
+    matrix = HabitMatrix.load(HabitLog(habits, args.data), args.start, args.end)
+    print(f"{len(matrix)} days from {matrix.start} to {matrix.end}, {int(matrix.logged.sum())} logged")
+    width = max(len(habit) for habit in matrix.habits)
+    rates = matrix.conditional_rates()
+    print("\nDone together (share of the row habit's days):")
+    for habit, row in zip(matrix.habits, rates):
+        print(f"  {habit:<{width}}  " + " ".join(f"{rate:>4.0%}" for rate in row))
+    for lag in sorted({0, args.lag}):
+        when = "the same day" if lag == 0 else f"{lag} day{'s' if lag > 1 else ''} later"
+        print(f"\nStrongest links, habit -> habit {when}:")
+        for habit, other, r in strongest_pairs(matrix, matrix.lagged_correlation(lag), args.top):
+            print(f"  {habit:<{width}} -> {other:<{width}}  r={r:+.2f}")
+
+
+if __name__ == "__main__":
+    main()
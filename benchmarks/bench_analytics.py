@@ -0,0 +1,105 @@
+"""
+Times the analytics engine against the same statistics computed by looping
+over the habits.json dict of name lists, on a synthetic history (by default
+10 years x 50 habits). Checks that both give the same numbers.
+
+    python -m benchmarks.bench_analytics --years 10 --habits 50
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from analytics import HabitMatrix
+from benchmarks.synth import DEFAULT_END, habit_names, write_history
+from habit_core import HabitLog
+from habit_store import HabitStore
+
+
+def loop_co_occurrence(data, habits):
+    counts = [[0] * len(habits) for _ in habits]
+    for names in data.values():
+        done = [i for i, habit in enumerate(habits) if habit in names]
+        for i in done:
+            for j in done:
+                counts[i][j] += 1
+    return counts
+
+
+def loop_correlation(data, habits, start, end, lag):
+    pairs = []
+    day = start
+    while day + timedelta(days=lag) <= end:
+        before, after = data.get(day.isoformat()), data.get((day + timedelta(days=lag)).isoformat())
+        if before is not None and after is not None:
+            pairs.append(([habit in before for habit in habits], [habit in after for habit in habits]))
+        day += timedelta(days=1)
+    n = len(pairs)
+    means_before = [sum(p[0][i] for p in pairs) / n for i in range(len(habits))]
+    means_after = [sum(p[1][i] for p in pairs) / n for i in range(len(habits))]
+    corr = [[0.0] * len(habits) for _ in habits]
+    for i in range(len(habits)):
+        for j in range(len(habits)):
+            cov = var_i = var_j = 0.0
+            for before, after in pairs:
+                x, y = before[i] - means_before[i], after[j] - means_after[j]
+                cov += x * y
+                var_i += x * x
+                var_j += y * y
+            corr[i][j] = cov / math.sqrt(var_i * var_j) if var_i and var_j else float("nan")
+    return corr
+
+
+def loop_rolling_rates(data, habits, start, end, window):
+    days = [data.get((start + timedelta(days=i)).isoformat(), []) for i in range((end - start).days + 1)]
+    return [[sum(habit in names for names in days[d:d + window]) / window for habit in habits]
+            for d in range(len(days) - window + 1)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--habits", type=int, default=50)
+    parser.add_argument("--window", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, "habits.json")
+        habits = habit_names(args.habits)
+        days = write_history(path, args.years, habits)
+        habit_log = HabitLog(habits, store=HabitStore(path, habits))
+        data = habit_log.store.data()
+        start = min(date.fromisoformat(day) for day in data)
+        end = DEFAULT_END
+        print(f"{days} days x {len(habits)} habits")
+
+        matrix, load_s = timed(lambda: HabitMatrix.load(habit_log, start, end))
+        print(f"{'':<20} {'numpy ms':>10} {'loops ms':>10} {'speedup':>8}")
+        print(f"{'load matrix':<20} {load_s * 1000:>10.1f}")
+        cases = [
+            ("co-occurrence", matrix.co_occurrence, lambda: loop_co_occurrence(data, habits)),
+            ("correlation lag 0", lambda: matrix.lagged_correlation(0), lambda: loop_correlation(data, habits, start, end, 0)),
+            ("correlation lag 1", lambda: matrix.lagged_correlation(1), lambda: loop_correlation(data, habits, start, end, 1)),
+            ("rolling rates", lambda: matrix.rolling_rates(args.window),
+             lambda: loop_rolling_rates(data, habits, start, end, args.window)),
+        ]
+        for name, vectorized, loops in cases:
+            fast, fast_s = timed(vectorized)
+            slow, slow_s = timed(loops)
+            if not np.allclose(fast, np.array(slow, dtype=np.float64), equal_nan=True):
+                raise SystemExit(f"{name}: numpy and loop results differ")
+            print(f"{name:<20} {fast_s * 1000:>10.1f} {slow_s * 1000:>10.1f} {slow_s / fast_s:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
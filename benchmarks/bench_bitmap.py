@@ -0,0 +1,65 @@
+"""
+Compares the habits.json dict-of-lists representation with HabitBitmap:
+resident memory, load time (parsing habits.json against reading the binary
+cache HabitStore keeps next to it), and the cost of membership, count and
+weekly-sum queries.
+
+    python -m benchmarks.bench_bitmap
+"""
+import argparse
+import json
+import timeit
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks.synth import generate_history, habit_names
+from habit_bitmap import HabitBitmap
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--habits", type=int, default=20)
+    args = parser.parse_args()
+
+    habits = habit_names(args.habits)
+    raw = json.dumps(generate_history(args.years, habits))
+
+    data, dict_bytes = measure_memory(lambda: json.loads(raw))
+    bitmap, bitmap_bytes = measure_memory(lambda: HabitBitmap.from_dict(json.loads(raw), habits))
+    # from_dict parses into a temporary dict first; what stays resident is the array.
+    bitmap_bytes = bitmap.days.buffer_info()[1] * bitmap.days.itemsize
+
+    dates = list(data)
+    probe = dates[len(dates) // 2]
+    week_start = date.fromisoformat(probe)
+    week = [(week_start + timedelta(days=i)).isoformat() for i in range(7)]
+    habit = habits[-1]
+
+    print(f"{args.years} years x {args.habits} habits, {len(dates)} days")
+    print(f"memory      dict {dict_bytes / 1024:10.1f} KiB   bitmap {bitmap_bytes / 1024:10.1f} KiB")
+    blob = bitmap.to_bytes()
+    json_ms = min(timeit.repeat(lambda: HabitBitmap.from_dict(json.loads(raw), habits), number=1, repeat=5)) * 1000
+    binary_ms = min(timeit.repeat(lambda: HabitBitmap.from_bytes(blob, habits), number=1, repeat=5)) * 1000
+    print(f"load        json {json_ms:10.3f} ms    binary {binary_ms:10.3f} ms")
+    queries = [
+        ("contains", lambda: habit in data.get(probe, []), lambda: bitmap.contains(probe, habit)),
+        ("count", lambda: len(data.get(probe, [])), lambda: bitmap.count(probe)),
+        ("week sum", lambda: sum(len(data.get(d, [])) for d in week), lambda: bitmap.week_sum(week_start)),
+    ]
+    for name, dict_query, bitmap_query in queries:
+        dict_us = min(timeit.repeat(dict_query, number=10000, repeat=5)) / 10000 * 1e6
+        bitmap_us = min(timeit.repeat(bitmap_query, number=10000, repeat=5)) / 10000 * 1e6
+        print(f"{name:<10}  dict {dict_us:10.3f} us       bitmap {bitmap_us:10.3f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Times a graph refresh the old way (new pyplot figure, styling, tight_layout
+and full draw on every log) against updating the persistent HabitPlot, and
+against a ChartRenderer job: the same draw on the worker thread plus the
+copy into a raster, measured from submit to result. All run on the Agg
+backend so no display is needed.
+
+    python -m benchmarks.bench_chart
+"""
+import argparse
+import random
+import statistics
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from chart import ChartRenderer, HabitPlot, RenderJob
+
+LABELS = [f"2025-07-{day:02d}" for day in range(21, 28)]
+
+
+def rebuild(counts):
+    fig, ax = plt.subplots(figsize=(5, 3), facecolor="#f0f0f0")
+    ax.plot(LABELS, counts, marker='o', linestyle='-', color='#4caf50', markerfacecolor='#4caf50', markersize=8, picker=5)
+    ax.set_xlabel("Date", color="#333333")
+    ax.set_ylabel("Habits Completed", color="#333333")
+    ax.set_title("Weekly Habit Progress", color="#333333")
+    ax.set_yticks(range(6))
+    ax.set_ylim(0, 5)
+    ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+    ax.set_facecolor("#ffffff")
+    plt.xticks(rotation=45, ha="right", color="#333333")
+    plt.yticks(color="#333333")
+    plt.tight_layout()
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def make_reuse():
+    plot = HabitPlot()
+    canvas = FigureCanvasAgg(plot.figure)
+
+    def reuse(counts):
+        plot.set_data(LABELS, counts, "Weekly Habit Progress", "Date", 5)
+        canvas.draw()
+
+    return reuse
+
+
+def make_worker():
+    renderer = ChartRenderer()
+    generations = iter(range(1, 10 ** 9))
+
+    def worker(counts):
+        key = (tuple(LABELS), tuple(counts), "Weekly Habit Progress", "Date", 5, 500, 300)
+        renderer.submit(RenderJob(next(generations), key, *key))
+        renderer.results.get()
+
+    return worker
+
+
+def time_updates(update, iterations, seed=0):
+    rng = random.Random(seed)
+    update([rng.randint(0, 5) for _ in LABELS])  # warm-up: fonts, first layout
+    samples = []
+    for _ in range(iterations):
+        counts = [rng.randint(0, 5) for _ in LABELS]
+        start = time.perf_counter()
+        update(counts)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'approach':<10}  {'median ms':>10}  {'p90 ms':>8}")
+    for name, update in (("rebuild", rebuild), ("reuse", make_reuse()), ("worker", make_worker())):
+        samples = sorted(time_updates(update, args.iterations))
+        p90 = samples[int(len(samples) * 0.9) - 1]
+        print(f"{name:<10}  {statistics.median(samples) * 1000:>10.1f}  {p90 * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Measures export_charts throughput (images/sec) against the number of worker
+processes, on a synthetic history, plus the cost of a re-run where every
+image is already up to date.
+
+    python -m benchmarks.bench_export --years 2 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synth import habit_names, write_history
+from export_charts import export
+from habit_core import HabitLog
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--habits", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, "habits.json")
+        habits = habit_names(args.habits)
+        write_history(path, args.years, habits)
+        habit_log = HabitLog(habits, path)
+
+        print(f"{os.cpu_count()} CPUs")
+        print(f"{'workers':>7}  {'images':>6}  {'seconds':>8}  {'images/s':>9}")
+        for workers in sorted(set(args.workers)):
+            out_dir = os.path.join(data_dir, f"charts-{workers}")
+            start = time.perf_counter()
+            images, rendered = export(habit_log, out_dir, workers)
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>7}  {rendered:>6}  {elapsed:>8.2f}  {rendered / elapsed:>9.1f}")
+
+        start = time.perf_counter()
+        images, rendered = export(habit_log, out_dir, workers)
+        print(f"re-run with nothing changed: {rendered} of {images} redrawn in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
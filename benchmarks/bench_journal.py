@@ -0,0 +1,63 @@
+"""
+Compares the cost of logging one day with the plain JSON store (full
+rewrite) against the journal store (single append) as history grows.
+
+    python -m benchmarks.bench_journal
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks.synth import generate_history, habit_names
+from habit_store import HabitStore, JournalStore
+
+HABITS = habit_names(5)
+
+
+def time_logs(store, logs):
+    samples = []
+    for i in range(logs):
+        start = time.perf_counter()
+        store.set_day("2099-01-01", HABITS[: i % len(HABITS)])
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(years_list, logs):
+    rows = []
+    for years in years_list:
+        history = generate_history(years, HABITS)
+        for name, store_class in (("json", HabitStore), ("journal", JournalStore)):
+            workdir = tempfile.mkdtemp(prefix="habits-bench-")
+            try:
+                path = os.path.join(workdir, "habits.json")
+                with open(path, "w") as f:
+                    json.dump(history, f, indent=4)
+                store = store_class(path)
+                if isinstance(store, JournalStore):
+                    # Keep compaction out of the per-log numbers.
+                    store.compact_threshold = logs + 1
+                samples = time_logs(store, logs)
+                rows.append((years, name, statistics.median(samples) * 1000, max(samples) * 1000))
+            finally:
+                shutil.rmtree(workdir)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--logs", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'years':>5}  {'store':<8}  {'median ms':>10}  {'max ms':>8}")
+    for years, name, median_ms, max_ms in run(args.years, args.logs):
+        print(f"{years:>5}  {name:<8}  {median_ms:>10.3f}  {max_ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Times switching between profiles through ProfileCache, cold (the profile
+has to be opened from disk) and warm (still in the cache), and shows that
+memory held by open profiles stops growing at the cache size.
+
+    python -m benchmarks.bench_profiles --profiles 24 --years 5 --cache 4
+"""
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synth import habit_names, write_history
+from profiles import ProfileCache, create_profile
+
+
+def switch(cache, name):
+    # What HabitTracker.switch_profile asks of the store before redrawing.
+    start = time.perf_counter()
+    habit_log = cache.get(name)
+    habit_log.states_on()
+    habit_log.period_counts("Week")
+    habit_log.summary()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=24)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--habits", type=int, default=5)
+    parser.add_argument("--cache", type=int, default=4)
+    args = parser.parse_args()
+    if args.profiles <= args.cache:
+        parser.error("--profiles must be more than --cache, or nothing is ever evicted")
+
+    habits = habit_names(args.habits)
+    with tempfile.TemporaryDirectory() as root:
+        names = [f"user{i:02d}" for i in range(args.profiles)]
+        for seed, name in enumerate(names):
+            write_history(create_profile(name, root).data, args.years, habits, seed)
+
+        cache = ProfileCache(lambda name: habits, root, capacity=args.cache)
+        tracemalloc.start()
+        for i, name in enumerate(names):
+            switch(cache, name)
+            if i + 1 in (1, args.cache, args.profiles):
+                print(f"after opening {i + 1:>3} profiles: {tracemalloc.get_traced_memory()[0] / 1e6:6.1f} MB held, "
+                      f"{len(cache)} open")
+        tracemalloc.stop()
+        # Timed without tracemalloc, which slows allocation down. The
+        # earlier profiles have all been evicted by now.
+        reopened = names[:-args.cache]
+        cold = [switch(cache, name) for name in reopened]
+        recent = reopened[-args.cache:]
+        warm = [switch(cache, name) for _ in range(20) for name in recent]
+        print(f"cold switch (open from disk): {statistics.median(cold) * 1000:7.2f} ms median")
+        print(f"warm switch (cached):         {statistics.median(warm) * 1000:7.2f} ms median")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compares the JSON store with the SQLite store at several history sizes:
+opening the store, logging one day, and the weekly / monthly range queries
+behind the graph and puzzle. Also times the streaming migration.
+
+    python -m benchmarks.bench_sqlite --days 1000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.synth import history_end, write_history
+from habit_core import DEFAULT_HABITS
+from habit_store import HabitStore
+from migrate_sqlite import migrate
+from sqlite_store import SqliteStore
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def measure(store, today, logs, queries):
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    rng = random.Random(1)
+    counter = iter(range(10 ** 9))
+
+    def log():
+        day = today - timedelta(days=next(counter) % 7)
+        store.set_day(day.isoformat(), [h for h in DEFAULT_HABITS if rng.random() < 0.5])
+
+    return {
+        "log": timed(log, logs),
+        "week sum": timed(lambda: store.range_count(week_start, week_start + timedelta(days=6)), queries),
+        "month daily": timed(lambda: store.daily_counts(month_start, today), queries),
+        "year months": timed(lambda: [store.range_count(today.replace(month=m, day=1), today.replace(month=m, day=28))
+                                      for m in range(1, 13)], queries),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'days':>8}  {'store':<7} {'open ms':>10} {'log ms':>9} {'week sum':>9} {'month':>9} {'year':>9}")
+    for days in args.days:
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, "habits.json")
+            write_history(path, habits=DEFAULT_HABITS, days=days, skip_rate=0)
+            # Rewriting a large habits.json per log is slow; keep the sample small there.
+            logs = 20 if days <= 100000 else 3
+
+            start = time.perf_counter()
+            store = HabitStore(path, DEFAULT_HABITS)
+            store.range_count(date(2025, 1, 1), date(2025, 1, 7))  # builds the range index
+            open_ms = (time.perf_counter() - start) * 1000
+            results = measure(store, history_end(days), logs, args.queries)
+            print(f"{days:>8}  {'json':<7} {open_ms:>10.1f} {results['log']:>9.3f} {results['week sum']:>9.4f}"
+                  f" {results['month daily']:>9.4f} {results['year months']:>9.4f}")
+
+            store = SqliteStore(path, DEFAULT_HABITS)
+            start = time.perf_counter()
+            migrate(path, store)
+            migrate_s = time.perf_counter() - start
+            store.close()
+
+            start = time.perf_counter()
+            store = SqliteStore(path, DEFAULT_HABITS)
+            open_ms = (time.perf_counter() - start) * 1000
+            results = measure(store, history_end(days), 100, args.queries)
+            store.close()
+            print(f"{days:>8}  {'sqlite':<7} {open_ms:>10.1f} {results['log']:>9.3f} {results['week sum']:>9.4f}"
+                  f" {results['month daily']:>9.4f} {results['year months']:>9.4f}   (migrated in {migrate_s:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
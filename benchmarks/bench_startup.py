@@ -0,0 +1,114 @@
+"""
+Measures the tracker's cold start: time to first window (wheel and log
+button painted) and time to interactive (graph loaded), plus the slowest
+top-level imports reported by python -X importtime. Needs a display.
+
+    python -m benchmarks.bench_startup --budget-first-window 0.5 --budget-interactive 2.0
+
+Exits with status 1 if a median exceeds its budget, so it can gate changes.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from habit_core import DEFAULT_HABITS, HABITS_CONFIG_FILE
+from startup import STARTUP_PROBE_ENV_VAR
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def prepare_workdir():
+    workdir = tempfile.mkdtemp(prefix="habits-startup-")
+    source = os.path.join(REPO_ROOT, "habits.json")
+    if os.path.exists(source):
+        shutil.copy(source, workdir)
+    with open(os.path.join(workdir, HABITS_CONFIG_FILE), "w") as f:
+        json.dump(DEFAULT_HABITS, f)
+    return workdir
+
+
+def launch(app, workdir, importtime=False):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    env[STARTUP_PROBE_ENV_VAR] = "1"
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command.append(os.path.join(REPO_ROOT, app))
+
+    started = time.time()
+    proc = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise SystemExit(f"{app} exited with {proc.returncode}:\n{proc.stderr[-2000:]}")
+
+    milestones = {}
+    for line in proc.stdout.splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        milestones[record["event"]] = record["time"] - started
+    return milestones, proc.stderr
+
+
+def slowest_imports(importtime_output, limit):
+    imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        self_us, cumulative_us, name = fields
+        # Nested imports are indented under the module that triggered them.
+        if name[1:].startswith(" "):
+            continue
+        imports.append((int(cumulative_us), name.strip()))
+    return sorted(imports, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--app", default="main.py", choices=["main.py", "main_copy.py"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--imports", type=int, default=8, help="slowest top-level imports to list")
+    parser.add_argument("--budget-first-window", type=float, help="seconds")
+    parser.add_argument("--budget-interactive", type=float, help="seconds")
+    args = parser.parse_args()
+
+    workdir = prepare_workdir()
+    try:
+        runs = [launch(args.app, workdir)[0] for _ in range(args.runs)]
+        _, importtime_output = launch(args.app, workdir, importtime=True)
+    finally:
+        shutil.rmtree(workdir)
+
+    failed = False
+    budgets = {"first_window": args.budget_first_window, "interactive": args.budget_interactive}
+    for event, budget in budgets.items():
+        samples = [run[event] for run in runs if event in run]
+        if not samples:
+            print(f"{event:<14} not reported")
+            failed = True
+            continue
+        median = statistics.median(samples)
+        verdict = ""
+        if budget is not None:
+            verdict = "  OK" if median <= budget else f"  OVER BUDGET ({budget:.3f} s)"
+            failed |= median > budget
+        print(f"{event:<14} median {median:.3f} s  min {min(samples):.3f} s  max {max(samples):.3f} s{verdict}")
+
+    print("\nslowest imports (cumulative):")
+    for cumulative_us, name in slowest_imports(importtime_output, args.imports):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Times incremental stats updates against a full rebuild, and checks that the
+incremental aggregates match the rebuild after a random mix of daily logs,
+same-day re-logs and backfills.
+
+    python -m benchmarks.bench_stats
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from benchmarks.synth import generate_history, habit_names
+from habit_bitmap import HabitBitmap
+from habit_stats import HabitStats
+
+
+def random_log(rng, habits):
+    return [h for h in habits if rng.random() < 0.6]
+
+
+def check_consistency(habits, steps, seed):
+    rng = random.Random(seed)
+    bitmap = HabitBitmap(habits)
+    stats = HabitStats().sync(bitmap)
+    day = date(2024, 1, 1)
+    for step in range(steps):
+        roll = rng.random()
+        if roll < 0.6:
+            day += timedelta(days=rng.choice((1, 1, 1, 2, 5)))
+            target = day
+        elif roll < 0.9:
+            target = day
+        else:
+            target = day - timedelta(days=rng.randrange(1, 30))
+        ordinal = target.toordinal()
+        old_mask = bitmap.set_day(target.isoformat(), random_log(rng, habits))
+        stats.update(bitmap, ordinal, old_mask)
+        stats.sync(bitmap)
+        if not stats.matches_rebuild(bitmap):
+            raise SystemExit(f"Mismatch after step {step} ({target})")
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--habits", type=int, default=5)
+    parser.add_argument("--check-steps", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    habits = habit_names(args.habits)
+    steps = check_consistency(habits, args.check_steps, args.seed)
+    print(f"consistency  {steps} random logs, re-logs and backfills matched a full rebuild")
+
+    bitmap = HabitBitmap.from_dict(generate_history(args.years, habits, args.seed), habits)
+    start = time.perf_counter()
+    stats = HabitStats.build(bitmap)
+    rebuild_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(args.seed)
+    ordinal = bitmap.last_ordinal
+    updates = 10000
+    start = time.perf_counter()
+    for i in range(updates):
+        # Alternate between logging a new day and re-logging it.
+        ordinal += i % 2
+        old_mask = bitmap.set_day(date.fromordinal(ordinal).isoformat(), random_log(rng, habits))
+        stats.update(bitmap, ordinal, old_mask)
+    update_us = (time.perf_counter() - start) / updates * 1e6
+
+    print(f"{args.years} years x {args.habits} habits, {len(bitmap)} days")
+    print(f"full rebuild {rebuild_ms:10.2f} ms")
+    print(f"update       {update_us:10.2f} us  (includes the bitmap write)")
+
+
+if __name__ == "__main__":
+    main()
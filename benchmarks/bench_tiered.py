@@ -0,0 +1,80 @@
+"""
+Compares opening the store and answering the app's first queries (this
+week's counts and the streak summary) on plain JSON against tiered storage,
+for histories of growing length. Each open runs in a fresh interpreter so
+its peak RSS can be measured too.
+
+    python -m benchmarks.bench_tiered --years 1 10 50
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import date
+
+from benchmarks.synth import habit_names, write_history
+from habit_store import TieredStore
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in the child: open, query like the app does at startup, report.
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+from habit_core import HabitLog
+habit_log = HabitLog(json.loads(sys.argv[3]), sys.argv[1], backend=sys.argv[2])
+habit_log.period_counts("Week")
+habit_log.summary()
+elapsed = time.perf_counter() - start
+# ru_maxrss carries over the parent's peak across fork+exec on Linux;
+# VmHWM belongs to this address space alone.
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+try:
+    with open("/proc/self/status") as f:
+        peak_kb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+except OSError:
+    pass
+print(json.dumps({"seconds": elapsed, "max_rss_kb": peak_kb, "days": len(habit_log.store.bitmap())}))
+"""
+
+
+def probe(path, backend, habits):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    proc = subprocess.run([sys.executable, "-c", PROBE, path, backend, json.dumps(habits)],
+                          env=env, capture_output=True, text=True, timeout=300)
+    if proc.returncode != 0:
+        raise SystemExit(f"{backend} probe failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--habits", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    habits = habit_names(args.habits)
+    print(f"{'years':>5}  {'backend':<8} {'open+query ms':>14} {'peak RSS MB':>12} {'days in memory':>15}")
+    for years in args.years:
+        workdir = tempfile.mkdtemp(prefix="habits-tiered-")
+        try:
+            path = os.path.join(workdir, "habits.json")
+            write_history(path, years, habits, end=date.today())
+            # The first open splits habits.json into the tiers; time the ones after.
+            TieredStore(path, habits)
+            for backend in ("json", "tiered"):
+                runs = [probe(path, backend, habits) for _ in range(args.repeats)]
+                seconds = statistics.median(run["seconds"] for run in runs)
+                rss = statistics.median(run["max_rss_kb"] for run in runs)
+                print(f"{years:>5}  {backend:<8} {seconds * 1000:>14.1f} {rss / 1024:>12.1f} {runs[0]['days']:>15}")
+        finally:
+            shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Load-tests server.py on localhost: requests/sec and latency percentiles for a
+mix of conditional GETs (mostly 304s), full GETs and writes.
+
+Starts its own server on a scratch copy of synthetic data unless --port
+points at one that is already running.
+
+    python -m benchmarks.loadtest_server --connections 50 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synth import write_history
+from habit_core import DEFAULT_HABITS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READ_TARGETS = ["/stats", "/days?from=2025-01-01&to=2025-12-31", "/days/2025-06-01", "/habits"]
+# The synthetic history ends on 2025-12-31; writes re-log the last days or
+# start new ones, like the app does.
+WRITE_DAYS = ["2025-12-30", "2025-12-31", "2026-01-01", "2026-01-02"]
+
+
+async def request(reader, writer, method, target, headers=(), body=b""):
+    lines = [f"{method} {target} HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}", *headers]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        response_headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(response_headers.get("content-length", 0)))
+    return status, response_headers
+
+
+async def client(port, deadline, write_ratio, rng, latencies, statuses):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    etags = {}
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if rng.random() < write_ratio:
+                day = rng.choice(WRITE_DAYS)
+                body = json.dumps({"habits": [h for h in DEFAULT_HABITS if rng.random() < 0.5]}).encode()
+                status, headers = await request(reader, writer, "PUT", f"/days/{day}", body=body)
+            else:
+                target = rng.choice(READ_TARGETS)
+                extra = [f"If-None-Match: {etags[target]}"] if target in etags else []
+                status, headers = await request(reader, writer, "GET", target, extra)
+                if "etag" in headers:
+                    etags[target] = headers["etag"]
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(port, connections, duration, write_ratio, seed):
+    latencies = []
+    statuses = {}
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(port, deadline, write_ratio, random.Random(seed + i), latencies, statuses)
+        for i in range(connections)
+    ))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def start_server(data_dir, storage):
+    path = os.path.join(data_dir, "habits.json")
+    write_history(path, years=3, habits=DEFAULT_HABITS)
+    command = [sys.executable, os.path.join(REPO_ROOT, "server.py"), "--port", "0", "--data", path,
+               "--habits-file", os.path.join(data_dir, "none.json")]
+    if storage:
+        command += ["--storage", storage]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    # The server prints its URL once it is listening; anything else means it didn't start.
+    line = process.stdout.readline().strip()
+    try:
+        port = int(line.rstrip("/").rsplit(":", 1)[1])
+    except (IndexError, ValueError):
+        process.kill()
+        process.wait()
+        raise SystemExit(f"server.py failed to start (exit status {process.returncode}); "
+                         f"expected its URL, got {line!r}")
+    return process, port
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, help="test an already running server instead of starting one")
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    parser.add_argument("--storage", choices=("json", "journal", "sqlite", "tiered"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    process = None
+    with tempfile.TemporaryDirectory() as data_dir:
+        port = args.port
+        if port is None:
+            process, port = start_server(data_dir, args.storage)
+        try:
+            latencies, statuses, elapsed = asyncio.run(
+                run_load(port, args.connections, args.duration, args.write_ratio, args.seed))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    latencies.sort()
+    print(f"{len(latencies)} requests over {args.connections} connections in {elapsed:.1f}s")
+    print(f"throughput  {len(latencies) / elapsed:10.0f} req/s")
+    for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        print(f"{name:<11} {percentile(latencies, fraction) * 1000:10.2f} ms")
+    print("statuses    " + "  ".join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    main()
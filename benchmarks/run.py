@@ -0,0 +1,307 @@
+"""
+Runs the benchmark suite over synthetic histories and writes the results as
+JSON, optionally comparing them against a saved baseline.
+
+Micro benchmarks time one operation (loading a store, saving a day, a week
+query); macro benchmarks time what the app does around it (a log with the
+graph and stats refresh, a graph redraw on the Agg backend).
+
+    python -m benchmarks.run --years 1 10 --habits 5 --output baseline.json
+    python -m benchmarks.run --years 1 10 --habits 5 --compare baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from benchmarks.synth import DEFAULT_END, habit_names, write_history
+from chart import HabitPlot
+from habit_core import HabitLog
+from habit_store import HabitStore, JournalStore
+from migrate_sqlite import migrate
+from periods import VIEW_AXIS_LABELS, VIEW_TITLES, VIEWS
+from sqlite_store import SqliteStore
+
+SCHEMA_VERSION = 1
+TODAY = DEFAULT_END
+
+
+class Case:
+    """One synthetic history written out for every storage backend."""
+
+    def __init__(self, workdir, years, habits, seed):
+        self.years = years
+        self.habits = habit_names(habits)
+        self.dir = os.path.join(workdir, f"{years}y-{habits}h")
+        os.makedirs(self.dir)
+        self.json_path = os.path.join(self.dir, "habits.json")
+        self.days = write_history(self.json_path, years, self.habits, seed)
+        self.sqlite_path = os.path.join(self.dir, "sqlite", "habits.json")
+        os.makedirs(os.path.dirname(self.sqlite_path))
+        store = SqliteStore(self.sqlite_path, self.habits)
+        migrate(self.json_path, store)
+        store.close()
+
+    def scratch_copy(self, sqlite=False):
+        """A fresh copy of the data for benchmarks that write; returns its habits.json path."""
+        path = os.path.join(tempfile.mkdtemp(dir=self.dir), "habits.json")
+        shutil.copy(self.json_path, path)
+        if sqlite:
+            shutil.copy(os.path.splitext(self.sqlite_path)[0] + ".db", os.path.splitext(path)[0] + ".db")
+        return path
+
+
+def alternating_days():
+    # Writes alternate between re-logging today and logging tomorrow, so
+    # neither path is measured alone and the history barely grows.
+    i = 0
+    while True:
+        yield (TODAY + timedelta(days=i % 2)).isoformat()
+        i += 1
+
+
+# Each benchmark takes a Case and returns the zero-argument callable to time.
+
+def load_json_cold(case):
+    # Without its binary copy the store has to parse habits.json (and then
+    # writes the copy again, as a real first open would).
+    def load():
+        try:
+            os.remove(case.json_path + ".bin")
+        except FileNotFoundError:
+            pass
+        return HabitStore(case.json_path, case.habits).range_count(TODAY, TODAY)
+    return load
+
+
+def load_json_cached(case):
+    return lambda: HabitStore(case.json_path, case.habits).range_count(TODAY, TODAY)
+
+
+def load_sqlite(case):
+    return lambda: SqliteStore(case.sqlite_path, case.habits).close()
+
+
+def save_store(store_class):
+    def setup(case):
+        store = store_class(case.scratch_copy(), case.habits)
+        if isinstance(store, JournalStore):
+            # Compaction is background work; keep it out of the per-log numbers.
+            store.compact_threshold = float("inf")
+        days = alternating_days()
+        return lambda: store.set_day(next(days), case.habits[::2])
+    return setup
+
+
+def save_sqlite(case):
+    store = SqliteStore(case.scratch_copy(sqlite=True), case.habits)
+    days = alternating_days()
+    return lambda: store.set_day(next(days), case.habits[::2])
+
+
+def week_query_json(case):
+    store = HabitStore(case.json_path, case.habits)
+    week_start = TODAY - timedelta(days=TODAY.weekday())
+    return lambda: store.range_count(week_start, week_start + timedelta(days=6))
+
+
+def week_query_sqlite(case):
+    store = SqliteStore(case.sqlite_path, case.habits)
+    week_start = TODAY - timedelta(days=TODAY.weekday())
+    return lambda: store.range_count(week_start, week_start + timedelta(days=6))
+
+
+def period_counts(case):
+    habit_log = HabitLog(case.habits, store=HabitStore(case.json_path, case.habits))
+    return lambda: [habit_log.period_counts(view, TODAY) for view in VIEWS]
+
+
+def stats_summary(case):
+    habit_log = HabitLog(case.habits, store=HabitStore(case.json_path, case.habits))
+    habit_log.summary(TODAY)
+    return lambda: habit_log.summary(TODAY)
+
+
+def render_view(plot, canvas, habit_log, view):
+    buckets, counts = habit_log.period_counts(view, TODAY)
+    labels = [label for label, start, end in buckets]
+    plot.set_data(labels, counts, f"{VIEW_TITLES[view]} Habit Progress", VIEW_AXIS_LABELS[view],
+                  habit_log.period_capacity(buckets))
+    canvas.draw()
+
+
+def log_habits(case):
+    """What HabitTracker.log_habits does, minus Tk: log, then refresh graph data, stats and puzzle."""
+    habit_log = HabitLog(case.habits, store=HabitStore(case.scratch_copy(), case.habits))
+    habit_log.summary(TODAY)
+    days = alternating_days()
+
+    def run():
+        habit_log.log(case.habits[::2], next(days))
+        habit_log.period_counts("Week", TODAY)
+        habit_log.rolling_rates(TODAY)
+        habit_log.summary(TODAY + timedelta(days=1))
+        habit_log.week_total(TODAY)
+    return run
+
+
+def update_graph(case):
+    """A graph refresh for unchanged layout: new data into the persistent plot, then an Agg draw."""
+    habit_log = HabitLog(case.habits, store=HabitStore(case.json_path, case.habits))
+    plot = HabitPlot()
+    canvas = FigureCanvasAgg(plot.figure)
+    render_view(plot, canvas, habit_log, "Week")
+    return lambda: render_view(plot, canvas, habit_log, "Week")
+
+
+def switch_view(case):
+    """Cycling Week -> Month -> Year, so every draw also redoes the layout."""
+    habit_log = HabitLog(case.habits, store=HabitStore(case.json_path, case.habits))
+    plot = HabitPlot()
+    canvas = FigureCanvasAgg(plot.figure)
+    views = iter(VIEWS * 10 ** 6)
+    render_view(plot, canvas, habit_log, "Week")
+    return lambda: render_view(plot, canvas, habit_log, next(views))
+
+
+BENCHMARKS = [
+    ("load/json-cold", "micro", load_json_cold),
+    ("load/json-cached", "micro", load_json_cached),
+    ("load/sqlite", "micro", load_sqlite),
+    ("save/json", "micro", save_store(HabitStore)),
+    ("save/journal", "micro", save_store(JournalStore)),
+    ("save/sqlite", "micro", save_sqlite),
+    ("query/week/json", "micro", week_query_json),
+    ("query/week/sqlite", "micro", week_query_sqlite),
+    ("query/period_counts", "micro", period_counts),
+    ("query/stats_summary", "micro", stats_summary),
+    ("app/log_habits", "macro", log_habits),
+    ("app/update_graph", "macro", update_graph),
+    ("app/switch_view", "macro", switch_view),
+]
+
+
+def measure(fn, min_time, min_repeats, max_repeats):
+    """Times fn until min_time has passed (within the repeat bounds); returns the samples in seconds."""
+    fn()  # warm-up
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_repeats and (len(samples) < min_repeats or time.perf_counter() - started < min_time):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def result_key(result):
+    return f"{result['name']}[years={result['years']},habits={result['habits']}]"
+
+
+def run_suite(args):
+    results = []
+    workdir = tempfile.mkdtemp(prefix="habits-bench-")
+    try:
+        for years in args.years:
+            for habits in args.habits:
+                case = Case(workdir, years, habits, args.seed)
+                for name, kind, setup in BENCHMARKS:
+                    if args.filter and not any(pattern in name for pattern in args.filter):
+                        continue
+                    samples = sorted(measure(setup(case), args.min_time, args.min_repeats, args.max_repeats))
+                    result = {
+                        "name": name,
+                        "kind": kind,
+                        "years": years,
+                        "habits": habits,
+                        "days": case.days,
+                        "repeats": len(samples),
+                        "median_ms": statistics.median(samples) * 1000,
+                        "min_ms": samples[0] * 1000,
+                        "p90_ms": samples[min(int(len(samples) * 0.9), len(samples) - 1)] * 1000,
+                    }
+                    results.append(result)
+                    print(f"{result_key(result):<48} {result['median_ms']:>10.3f} ms  (n={result['repeats']})", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir)
+    return {
+        "schema": SCHEMA_VERSION,
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "matplotlib": matplotlib.__version__,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Prints current against baseline by median; returns the keys that regressed past threshold."""
+    previous = {result_key(result): result for result in baseline["results"]}
+    regressions = []
+    print(f"{'benchmark':<48} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for result in current["results"]:
+        key = result_key(result)
+        before = previous.get(key)
+        if before is None:
+            print(f"{key:<48} {'-':>12} {result['median_ms']:>12.3f} {'new':>8}")
+            continue
+        change = result["median_ms"] / before["median_ms"] - 1 if before["median_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  slower"
+            regressions.append(key)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{key:<48} {before['median_ms']:>12.3f} {result['median_ms']:>12.3f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--habits", type=int, nargs="+", default=[5])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--filter", nargs="+", help="only run benchmarks whose name contains one of these")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend timing each benchmark")
+    parser.add_argument("--min-repeats", type=int, default=5)
+    parser.add_argument("--max-repeats", type=int, default=1000)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a results JSON saved earlier")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change that counts as slower/faster")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 if anything got slower")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    elif not args.compare:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.threshold:.0%}")
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
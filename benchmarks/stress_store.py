@@ -0,0 +1,104 @@
+"""
+Stress-tests the store across processes: several writers log concurrently
+into one habits.json while a reader keeps reloading it, then checks that no
+log was lost and that the reader never saw a torn or shrinking history.
+
+    python -m benchmarks.stress_store --writers 8 --logs 200 --storage journal
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from habit_core import DEFAULT_HABITS
+from habit_store import open_store
+
+START = date(2020, 1, 1)
+
+
+def expected_habits(writer, i):
+    return [habit for n, habit in enumerate(DEFAULT_HABITS) if (writer + i) >> n & 1]
+
+
+def writer_process(path, storage, writer, logs, compact_threshold):
+    store = open_store(path, storage, DEFAULT_HABITS)
+    if compact_threshold:
+        store.compact_threshold = compact_threshold
+    for i in range(logs):
+        # Each writer owns its own days, so every log must survive.
+        day = START + timedelta(days=writer * logs + i)
+        store.set_day(day.isoformat(), expected_habits(writer, i))
+    store.close()
+
+
+def reader_process(path, storage, stop, result):
+    store = open_store(path, storage, DEFAULT_HABITS)
+    reloads = 0
+    seen = 0
+    errors = []
+    while not stop.is_set():
+        if store.refresh():
+            reloads += 1
+            logged = sum(1 for _ in store.iter_days())
+            if logged < seen:
+                errors.append(f"history shrank from {seen} to {logged} days")
+            seen = logged
+    result.put((reloads, errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--logs", type=int, default=100, help="logs per writer")
+    parser.add_argument("--storage", choices=("json", "journal", "sqlite", "tiered"), default="json")
+    parser.add_argument("--compact-threshold", type=int, default=50,
+                        help="journal entries before compaction (journal storage only)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, "habits.json")
+        stop = multiprocessing.Event()
+        result = multiprocessing.Queue()
+        reader = multiprocessing.Process(target=reader_process, args=(path, args.storage, stop, result))
+        reader.start()
+
+        threshold = args.compact_threshold if args.storage == "journal" else 0
+        writers = [
+            multiprocessing.Process(target=writer_process, args=(path, args.storage, n, args.logs, threshold))
+            for n in range(args.writers)
+        ]
+        start = time.perf_counter()
+        for process in writers:
+            process.start()
+        for process in writers:
+            process.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        reloads, errors = result.get()
+        reader.join()
+
+        store = open_store(path, args.storage, DEFAULT_HABITS)
+        lost = []
+        for writer in range(args.writers):
+            for i in range(args.logs):
+                day = (START + timedelta(days=writer * args.logs + i)).isoformat()
+                if store.get(day) != expected_habits(writer, i):
+                    lost.append(day)
+        store.close()
+
+    total = args.writers * args.logs
+    print(f"{args.writers} writers x {args.logs} logs ({args.storage}) in {elapsed:.2f}s, {total / elapsed:.0f} logs/s")
+    print(f"reader reloaded {reloads} times")
+    for error in errors:
+        print(f"reader: {error}")
+    if lost:
+        print(f"LOST {len(lost)} of {total} logs, e.g. {', '.join(lost[:5])}")
+    if lost or errors:
+        raise SystemExit(1)
+    print(f"all {total} logs present")
+
+
+if __name__ == "__main__":
+    main()
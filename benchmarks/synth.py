@@ -0,0 +1,59 @@
+"""
+Seeded synthetic habit histories for the benchmarks.
+
+The same (years, habits, seed) always gives the same history. Each habit
+gets its own completion rate around the requested one, and some days are
+left unlogged, so the data has roughly the shape of a real habits.json.
+"""
+import json
+import random
+from datetime import date
+
+from habit_core import DEFAULT_HABITS
+
+DEFAULT_END = date(2025, 12, 31)
+
+
+def habit_names(count):
+    """The app's default habits first, then numbered ones."""
+    names = list(DEFAULT_HABITS[:count])
+    names += [f"Habit {i}" for i in range(len(names) + 1, count + 1)]
+    return names
+
+
+def history_end(days, end=DEFAULT_END):
+    # More days than fit before end (a million, say) run into the future instead.
+    return date.fromordinal(max(end.toordinal(), days))
+
+
+def iter_history(years=1, habits=5, seed=0, days=None, end=DEFAULT_END, completion_rate=0.6, skip_rate=0.05):
+    """
+    Yields (date_str, habit names) oldest first for `days` days (default
+    365 * years) ending on end. habits is a count or a list of names.
+    """
+    rng = random.Random(seed)
+    names = habit_names(habits) if isinstance(habits, int) else list(habits)
+    rates = [min(max(rng.uniform(completion_rate - 0.2, completion_rate + 0.2), 0.0), 1.0) for _ in names]
+    days = 365 * years if days is None else days
+    last = history_end(days, end).toordinal()
+    for ordinal in range(last - days + 1, last + 1):
+        if rng.random() < skip_rate:
+            continue
+        yield date.fromordinal(ordinal).isoformat(), [name for name, rate in zip(names, rates) if rng.random() < rate]
+
+
+def generate_history(years=1, habits=5, seed=0, **kwargs):
+    """The history as a habits.json-style dict."""
+    return dict(iter_history(years, habits, seed, **kwargs))
+
+
+def write_history(path, years=1, habits=5, seed=0, **kwargs):
+    """Writes the history as habits.json one day at a time. Returns the number of days written."""
+    count = 0
+    with open(path, "w") as f:
+        f.write("{")
+        for date_str, names in iter_history(years, habits, seed, **kwargs):
+            f.write(("," if count else "") + json.dumps(date_str) + ":" + json.dumps(names))
+            count += 1
+        f.write("}")
+    return count
@@ -0,0 +1,112 @@
+"""
+Builds the static data behind index.html.
+
+Writes one shard per month to <out>/months/YYYY-MM.<hash>.json, named by a
+hash of its contents so browsers and CDNs can cache it forever, and a small
+<out>/manifest.json listing the shards with precomputed per-month counts
+and per-habit totals. The page loads the manifest and then only the months
+being looked at.
+
+    python build_site.py [--data habits.json] [--out data]
+"""
+import argparse
+import hashlib
+import json
+import os
+
+from habit_core import DATA_FILE, DEFAULT_HABITS, HABITS_CONFIG_FILE, HabitLog, load_habits_config
+from habit_store import atomic_write_json
+
+SHARD_DIR = "months"
+HASH_LENGTH = 12
+OUT_DIR = "data"
+
+
+def write_shard(out_dir, month, days):
+    payload = json.dumps({"month": month, "days": days}, separators=(",", ":")).encode()
+    digest = hashlib.sha256(payload).hexdigest()[:HASH_LENGTH]
+    name = f"{SHARD_DIR}/{month}.{digest}.json"
+    path = os.path.join(out_dir, name)
+    # Same name means same bytes, so an existing shard is already correct.
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    return name
+
+
+def iter_months(days):
+    """Groups the ordered (date_str, habits) stream into (month, days) chunks."""
+    month, chunk = None, []
+    for date_str, habits in days:
+        if date_str[:7] != month:
+            if chunk:
+                yield month, chunk
+            month, chunk = date_str[:7], []
+        chunk.append({"date": date_str, "count": len(habits), "habits": habits})
+    if chunk:
+        yield month, chunk
+
+
+def build(habit_log, out_dir):
+    os.makedirs(os.path.join(out_dir, SHARD_DIR), exist_ok=True)
+    habit_totals = dict.fromkeys(habit_log.habits, 0)
+    months = []
+    last_logged = None
+    for month, days in iter_months(habit_log.query()):
+        for day in days:
+            for habit in day["habits"]:
+                habit_totals[habit] = habit_totals.get(habit, 0) + 1
+        months.append({
+            "month": month,
+            "file": write_shard(out_dir, month, days),
+            "days": len(days),
+            "completions": sum(day["count"] for day in days),
+        })
+        last_logged = days[-1]["date"]
+    months.reverse()
+
+    # Nothing in the manifest depends on when it was built, so an unchanged
+    # history rebuilds to identical files and git sees no change.
+    manifest = {
+        "last_logged": last_logged,
+        "habits": habit_log.habits,
+        "habit_totals": habit_totals,
+        "total_days": sum(month["days"] for month in months),
+        "months": months,
+    }
+    # The manifest goes last and atomically, so the page never sees it
+    # pointing at a shard that hasn't been written yet.
+    atomic_write_json(os.path.join(out_dir, "manifest.json"), manifest, indent=None)
+
+    live = {month["file"] for month in months}
+    shard_dir = os.path.join(out_dir, SHARD_DIR)
+    for name in os.listdir(shard_dir):
+        if f"{SHARD_DIR}/{name}" not in live:
+            os.remove(os.path.join(shard_dir, name))
+    return manifest
+
+
+def build_files(data_path=DATA_FILE, habits_path=HABITS_CONFIG_FILE, out_dir=OUT_DIR):
+    """Builds out_dir from the data and habit list files, the way the app would open them."""
+    habit_log = HabitLog(load_habits_config(habits_path) or DEFAULT_HABITS, data_path)
+    try:
+        return build(habit_log, out_dir)
+    finally:
+        habit_log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the sharded static data for index.html.")
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--habits-file", default=HABITS_CONFIG_FILE)
+    parser.add_argument("--out", default=OUT_DIR)
+    args = parser.parse_args()
+
+    manifest = build_files(args.data, args.habits_file, args.out)
+    print(f"Wrote {len(manifest['months'])} month shards and manifest.json to {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import functools
+import math
+from collections import namedtuple
+
+ON_COLOR = "#4caf50"
+OFF_COLOR = "#cccccc"
+CELL_OFF_COLOR = "#e0e0e0"
+
+
+class Debouncer:
+    """
+    Coalesces a burst of events (e.g. <Configure> while a window is being
+    dragged) into a single callback on the next frame, via widget.after.
+    """
+
+    def __init__(self, widget, callback, delay_ms=16):
+        self.widget = widget
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self._pending = None
+
+    def __call__(self, event=None):
+        if self._pending is None:
+            self._pending = self.widget.after(self.delay_ms, self._fire)
+
+    def _fire(self):
+        self._pending = None
+        self.callback()
+
+    def cancel(self):
+        if self._pending is not None:
+            self.widget.after_cancel(self._pending)
+            self._pending = None
+
+
+def rounded_rectangle_points(x1, y1, x2, y2, radius=25):
+    """Control points for a smoothed polygon that draws a rounded rectangle."""
+    return [x1 + radius, y1,
+            x1 + radius, y1,
+            x2 - radius, y1,
+            x2 - radius, y1,
+            x2, y1,
+            x2, y1 + radius,
+            x2, y1 + radius,
+            x2, y2 - radius,
+            x2, y2 - radius,
+            x2, y2,
+            x2 - radius, y2,
+            x2 - radius, y2,
+            x1 + radius, y2,
+            x1 + radius, y2,
+            x1, y2,
+            x1, y2 - radius,
+            x1, y2 - radius,
+            x1, y1 + radius,
+            x1, y1 + radius,
+            x1, y1]
+
+
+# Sectors wider than this (fewer than three habits) get extra outer points,
+# so one or two habits still make a sensible wheel.
+MAX_SEGMENT_ANGLE = 2 * math.pi / 3
+# Past this many habits, labels are turned to point out from the centre
+# so they don't overlap.
+RADIAL_LABELS_OVER = 8
+
+WheelGeometry = namedtuple("WheelGeometry", "center_x center_y radius sectors labels sub_step normals apothem")
+
+
+@functools.lru_cache(maxsize=32)
+def wheel_geometry(width, height, count):
+    """
+    Everything the wheel needs for a canvas size and habit count: sector
+    polygon coords, label positions, and the edge normals hit-testing uses.
+    Cached, so redrawing at a size seen before and clicking do no
+    trigonometry beyond one atan2.
+    """
+    center_x, center_y = width / 2, height / 2
+    radius = min(width, height) * 0.35
+    step = 2 * math.pi / count
+    segments = math.ceil(step / MAX_SEGMENT_ANGLE)
+    sub_step = step / segments
+    sectors = []
+    labels = []
+    for i in range(count):
+        start = step * i - math.pi / 2
+        coords = [center_x, center_y]
+        for k in range(segments + 1):
+            angle = start + sub_step * k
+            coords += [center_x + radius * math.cos(angle), center_y + radius * math.sin(angle)]
+        sectors.append(tuple(coords))
+
+        label_angle = start + step / 2
+        labels.append((center_x + (radius + 25) * math.cos(label_angle),
+                       center_y + (radius + 25) * math.sin(label_angle)))
+    # Unit normal of each straight outer edge; sub-edge k belongs to sector k // segments.
+    normals = tuple(
+        (math.cos(sub_step * (k + 0.5) - math.pi / 2), math.sin(sub_step * (k + 0.5) - math.pi / 2))
+        for k in range(count * segments)
+    )
+    return WheelGeometry(center_x, center_y, radius, tuple(sectors), tuple(labels),
+                         sub_step, normals, radius * math.cos(sub_step / 2))
+
+
+def radial_label_options(count):
+    """Per-label text angle (degrees) and anchor that point each label away from the centre."""
+    step = 360 / count
+    options = []
+    for i in range(count):
+        # Screen angles run clockwise from 3 o'clock; Tk text angles run anticlockwise.
+        angle = (-(step * i - 90 + step / 2)) % 360
+        if 90 < angle < 270:
+            options.append(((angle + 180) % 360, "e"))
+        else:
+            options.append((angle, "w"))
+    return options
+
+
+class HabitWheel:
+    """
+    The clickable wheel of habit sectors (a pentagon for five habits), drawn
+    in retained mode.
+
+    Sector polygons and labels are created once; a resize only moves them
+    with coords() and a state change only recolours the sectors that changed
+    with itemconfig(). Geometry comes from wheel_geometry's cache.
+    """
+
+    def __init__(self, canvas, habits):
+        self.canvas = canvas
+        self.habits = habits
+        self.sector_ids = [
+            canvas.create_polygon(0, 0, 0, 0, 0, 0, fill=OFF_COLOR, outline="white", width=2)
+            for _ in habits
+        ]
+        if len(habits) > RADIAL_LABELS_OVER:
+            self.label_ids = [
+                canvas.create_text(0, 0, text=habit, font=("Helvetica", 8, "bold"), angle=angle, anchor=anchor)
+                for habit, (angle, anchor) in zip(habits, radial_label_options(len(habits)))
+            ]
+        else:
+            self.label_ids = [
+                canvas.create_text(0, 0, text=habit, font=("Helvetica", 10, "bold"))
+                for habit in habits
+            ]
+        self._colors = [OFF_COLOR] * len(habits)
+        self._size = None
+        self._geometry = None
+
+    def layout(self):
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        if (width, height) == self._size:
+            return
+        self._size = (width, height)
+        self._geometry = wheel_geometry(width, height, len(self.habits))
+
+        for sector_id, coords in zip(self.sector_ids, self._geometry.sectors):
+            self.canvas.coords(sector_id, *coords)
+        for label_id, position in zip(self.label_ids, self._geometry.labels):
+            self.canvas.coords(label_id, *position)
+
+    def paint(self, states):
+        for i, state in enumerate(states):
+            color = ON_COLOR if state else OFF_COLOR
+            if self._colors[i] != color:
+                self.canvas.itemconfig(self.sector_ids[i], fill=color)
+                self._colors[i] = color
+
+    def render(self, states):
+        self.layout()
+        self.paint(states)
+
+    def index_at(self, x, y):
+        """Index of the habit sector under (x, y), or None."""
+        if self._geometry is None:
+            return None
+        return sector_at(self._geometry, x, y)
+
+
+def sector_at(geometry, x, y):
+    """
+    Which of wheel_geometry's sectors contains (x, y), from the angle to the
+    centre. Sectors have straight outer edges, so the point must also be on
+    the inner side of the edge it faces, not just within the radius; thin
+    sectors stay exact since nothing depends on item shapes or proximity.
+    """
+    dx, dy = x - geometry.center_x, y - geometry.center_y
+    angle = (math.atan2(dy, dx) + math.pi / 2) % (2 * math.pi)
+    sub = min(int(angle / geometry.sub_step), len(geometry.normals) - 1)
+    normal_x, normal_y = geometry.normals[sub]
+    if dx * normal_x + dy * normal_y > geometry.apothem:
+        return None
+    return sub * len(geometry.sectors) // len(geometry.normals)
+
+
+class ProgressPuzzle:
+    """
+    The weekly progress grid: one row per habit and one column per day,
+    created once, with the first `filled` cells recoloured green via
+    itemconfig. Past max_rows habits the rows stop growing and each cell
+    stands for several completions instead.
+    """
+
+    def __init__(self, canvas, habit_count=5, cols=7, max_rows=10, gap=5, corner_radius=8):
+        self.canvas = canvas
+        self.rows = max(1, min(habit_count, max_rows))
+        self.cols = cols
+        self.capacity = max(1, habit_count) * cols
+        self.gap = gap
+        self.corner_radius = corner_radius
+        self.cell_ids = [
+            canvas.create_polygon(rounded_rectangle_points(0, 0, 0, 0, corner_radius), fill=CELL_OFF_COLOR, outline="", smooth=True)
+            for _ in range(self.rows * cols)
+        ]
+        self._filled = 0
+        self._size = None
+
+    def layout(self):
+        canvas_width = self.canvas.winfo_width()
+        canvas_height = self.canvas.winfo_height()
+        if (canvas_width, canvas_height) == self._size:
+            return
+        self._size = (canvas_width, canvas_height)
+
+        gap = self.gap
+        cell_width = (canvas_width - (self.cols + 1) * gap) / self.cols
+        cell_height = (canvas_height - (self.rows + 1) * gap) / self.rows
+        for i, cell_id in enumerate(self.cell_ids):
+            row, col = divmod(i, self.cols)
+            x1 = gap + col * (cell_width + gap)
+            y1 = gap + row * (cell_height + gap)
+            self.canvas.coords(cell_id, rounded_rectangle_points(x1, y1, x1 + cell_width, y1 + cell_height, self.corner_radius))
+
+    def cells_for(self, completions):
+        # A cell only turns green once all the completions it stands for are in.
+        return max(0, min(completions * len(self.cell_ids) // self.capacity, len(self.cell_ids)))
+
+    def paint(self, completions):
+        filled = self.cells_for(completions)
+        if filled == self._filled:
+            return
+        lo, hi = sorted((filled, self._filled))
+        color = ON_COLOR if filled > self._filled else CELL_OFF_COLOR
+        for cell_id in self.cell_ids[lo:hi]:
+            self.canvas.itemconfig(cell_id, fill=color)
+        self._filled = filled
+
+    def render(self, completions):
+        self.layout()
+        self.paint(completions)
@@ -0,0 +1,321 @@
+import bisect
+import math
+import queue
+import threading
+import tkinter as tk
+from collections import OrderedDict, namedtuple
+from tkinter import ttk
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import AutoLocator
+
+from canvas_widgets import Debouncer
+
+TEXT_COLOR = "#333333"
+LINE_COLOR = "#4caf50"
+FACE_COLOR = "#f0f0f0"
+DPI = 100
+# Used until the graph frame has been laid out and has a real size.
+DEFAULT_SIZE = (500, 300)
+HOVER_RADIUS = 8
+
+
+class HabitPlot:
+    """
+    The progress graph's Figure, Axes and Line2D, created once.
+
+    set_data only swaps the line's data; ticks, titles and tight_layout are
+    redone only when the labels or scale actually change (a new week, a
+    different view). It has no Tk dependency so it can be drawn on Agg.
+    """
+
+    def __init__(self, figsize=(5, 3), dpi=DPI):
+        self.figure = Figure(figsize=figsize, dpi=dpi, facecolor=FACE_COLOR)
+        self.ax = self.figure.add_subplot()
+        self.line = self.ax.plot([], [], marker='o', linestyle='-', color=LINE_COLOR, markerfacecolor=LINE_COLOR, markersize=8)[0]
+        self.ax.set_ylabel("Habits Completed", color=TEXT_COLOR)
+        self.ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+        self.ax.set_facecolor("#ffffff")
+        self.ax.tick_params(axis="y", labelcolor=TEXT_COLOR)
+        self._layout_key = None
+
+    def set_size(self, width, height):
+        """Resizes the figure to width x height pixels; the next set_data redoes the layout."""
+        dpi = self.figure.dpi
+        if self.figure.get_size_inches().tolist() != [width / dpi, height / dpi]:
+            self.figure.set_size_inches(width / dpi, height / dpi)
+            self._layout_key = None
+
+    def set_data(self, labels, counts, title, xlabel, y_max):
+        """Updates the plotted series. Returns True if the layout was redone."""
+        positions = range(len(counts))
+        self.line.set_data(positions, counts)
+
+        layout_key = (tuple(labels), title, xlabel, y_max)
+        if layout_key == self._layout_key:
+            return False
+
+        ax = self.ax
+        ax.set_xticks(positions)
+        ax.set_xticklabels(labels, rotation=45, ha="right", color=TEXT_COLOR)
+        margin = 0.05 * (len(labels) - 1) or 0.5
+        ax.set_xlim(-margin, len(labels) - 1 + margin)
+        ax.set_xlabel(xlabel, color=TEXT_COLOR)
+        ax.set_title(title, color=TEXT_COLOR)
+        if y_max <= 10:
+            ax.set_yticks(range(y_max + 1))
+        else:
+            ax.yaxis.set_major_locator(AutoLocator())
+        ax.set_ylim(0, y_max)
+        self.figure.tight_layout()
+        self._layout_key = layout_key
+        return True
+
+
+RenderJob = namedtuple("RenderJob", "generation key labels counts title xlabel y_max width height")
+# ppm is None if the render failed, and error then says why. points are the
+# plotted points in image pixels (origin top left), for hover hit-testing.
+RenderResult = namedtuple("RenderResult", "generation key ppm points error", defaults=(None,))
+
+
+def to_ppm(rgba):
+    height, width = rgba.shape[:2]
+    return f"P6 {width} {height} 255\n".encode("ascii") + np.ascontiguousarray(rgba[:, :, :3]).tobytes()
+
+
+class ChartRenderer:
+    """
+    Draws the graph on a background thread that owns its own HabitPlot and
+    Agg canvas, and hands back finished rasters through a queue.
+
+    Only the newest job matters: submit() replaces one that hasn't started,
+    and a render whose job was superseded while it was being laid out is
+    abandoned before the (expensive) draw.
+    """
+
+    def __init__(self):
+        self.results = queue.Queue()
+        self._job = None
+        self._stopped = False
+        self._wakeup = threading.Condition()
+        self._plot = None
+        self._canvas = None
+        self._thread = threading.Thread(target=self._run, name="chart-renderer", daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        with self._wakeup:
+            self._job = job
+            self._wakeup.notify()
+
+    def stop(self, timeout=None):
+        with self._wakeup:
+            self._stopped = True
+            self._wakeup.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        self._plot = HabitPlot()
+        self._canvas = FigureCanvasAgg(self._plot.figure)
+        while True:
+            with self._wakeup:
+                while self._job is None and not self._stopped:
+                    self._wakeup.wait()
+                if self._stopped:
+                    return
+                job, self._job = self._job, None
+            try:
+                result = self.render(job)
+            except Exception as e:
+                # Reported by HabitChart on the Tk thread, in place of the graph.
+                result = RenderResult(job.generation, job.key, None, [], f"Graph rendering failed: {e}")
+            if result is not None:
+                self.results.put(result)
+
+    def render(self, job):
+        """Renders job to a PPM raster, or returns None if a newer job arrived first."""
+        plot = self._plot
+        plot.set_size(job.width, job.height)
+        plot.set_data(job.labels, job.counts, job.title, job.xlabel, job.y_max)
+        with self._wakeup:
+            superseded = self._job is not None
+        if superseded:
+            return None
+        self._canvas.draw()
+        rgba = np.asarray(self._canvas.buffer_rgba())
+        xy = plot.ax.transData.transform(np.column_stack([np.arange(len(job.counts)), job.counts]))
+        points = [(float(x), rgba.shape[0] - float(y)) for x, y in xy]
+        return RenderResult(job.generation, job.key, to_ppm(rgba), points)
+
+
+class HabitChart:
+    """
+    Tk widget for the graph panel. The figure is rendered off the main
+    thread by a ChartRenderer; the main thread only blits the finished
+    raster into a PhotoImage on a plain canvas.
+
+    Rasters are cached by their inputs (data, titles and pixel size), so
+    switching back to a view whose data hasn't changed is just a blit. The
+    canvas and the "no data" label are both created up front; switching
+    between them is a pack/pack_forget.
+    """
+
+    def __init__(self, master, show_tooltips=False, cache_size=16):
+        self.renderer = ChartRenderer()
+        self.widget = tk.Canvas(master, highlightthickness=0, bg=FACE_COLOR)
+        self.image_id = self.widget.create_image(0, 0, anchor="nw")
+        self.image = None
+        self.empty_label = ttk.Label(master, text="", style="Header.TLabel")
+        self.details = None
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._showing = None
+        self._request = None
+        self._generation = 0
+        self._pending = None
+        self._shown_key = None
+        self._points = []
+        self._xs = []
+        self._hover_index = None
+        self._pointer = None
+        self.widget.bind("<Configure>", Debouncer(self.widget, self._resize))
+
+        self.tooltip = None
+        if show_tooltips:
+            self.tooltip = ttk.Label(master, text="", background="white", relief="solid", borderwidth=1, font=("Helvetica", 10))
+            # Motion events only record the pointer; the lookup runs at
+            # most once a frame.
+            self._hover_update = Debouncer(self.widget, self._update_hover)
+            self.widget.bind("<Motion>", self._on_motion)
+            self.widget.bind("<Leave>", lambda event: self._hide_tooltip())
+
+    def show_empty(self, text):
+        self.empty_label.config(text=text)
+        if self._showing != "empty":
+            self.widget.pack_forget()
+            self.empty_label.pack(expand=True)
+            self._showing = "empty"
+        self._hide_tooltip()
+
+    def show(self, labels, counts, title, xlabel, y_max, details=None):
+        """
+        Plots counts against labels. details, if given, maps a point index
+        to the lines shown in its hover tooltip.
+        """
+        self.details = details
+        self._request = (tuple(labels), tuple(counts), title, xlabel, y_max)
+        if self._showing != "chart":
+            self.empty_label.pack_forget()
+            self.widget.pack(expand=True, fill="both")
+            self._showing = "chart"
+        self._submit()
+
+    def hide(self):
+        """Takes the graph off screen, e.g. while another view uses the panel."""
+        self.widget.pack_forget()
+        self.empty_label.pack_forget()
+        self._showing = None
+        self._hide_tooltip()
+
+    def close(self):
+        self.renderer.stop(timeout=1)
+
+    def _size(self):
+        width, height = self.widget.winfo_width(), self.widget.winfo_height()
+        if width < 50 or height < 50:
+            return DEFAULT_SIZE
+        return width, height
+
+    def _submit(self):
+        key = self._request + self._size()
+        # Whatever is still rendering is stale now; its raster is cached
+        # when it arrives but not shown.
+        self._generation += 1
+        polling = self._pending is not None
+        self._pending = None
+        if key == self._shown_key:
+            return
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.blit(cached)
+            return
+        self._pending = self._generation
+        self.renderer.submit(RenderJob(self._generation, key, *key))
+        if not polling:
+            self.widget.after(10, self._poll)
+
+    def _resize(self):
+        if self._showing == "chart" and self._request is not None:
+            self._submit()
+
+    def _poll(self):
+        while True:
+            try:
+                result = self.renderer.results.get_nowait()
+            except queue.Empty:
+                break
+            if result.ppm is not None:
+                self._cache[result.key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            if result.generation == self._pending:
+                self._pending = None
+                if result.ppm is not None:
+                    self.blit(result)
+                elif self._showing == "chart":
+                    self.show_empty(result.error)
+        if self._pending is not None:
+            self.widget.after(10, self._poll)
+
+    def blit(self, result):
+        self.image = tk.PhotoImage(data=result.ppm, format="PPM")
+        self.widget.itemconfig(self.image_id, image=self.image)
+        self._points = result.points
+        self._xs = [x for x, y in result.points]
+        self._shown_key = result.key
+        self._hide_tooltip()
+
+    def _hide_tooltip(self):
+        self._hover_index = None
+        if self.tooltip is not None:
+            self.tooltip.place_forget()
+
+    def _on_motion(self, event):
+        self._pointer = (event.x, event.y)
+        self._hover_update()
+
+    def _update_hover(self):
+        index = None
+        if self.details is not None and self._showing == "chart" and self._pointer is not None:
+            index = nearest_point(self._xs, self._points, *self._pointer)
+        if index == self._hover_index:
+            return
+        lines = self.details(index) if index is not None else None
+        if not lines:
+            self._hide_tooltip()
+            return
+        self._hover_index = index
+        # Anchored to the point, not the pointer, so it only moves when the
+        # hovered point changes.
+        x, y = self._points[index]
+        self.tooltip.config(text="\n".join(lines))
+        self.tooltip.place(x=self.widget.winfo_x() + x + 12, y=self.widget.winfo_y() + y + 12)
+
+
+def nearest_point(xs, points, x, y, radius=HOVER_RADIUS):
+    """
+    Index of the plotted point within radius pixels of (x, y), or None.
+    xs are the points' x positions in ascending order, so bisect narrows the
+    search to the two neighbours of x.
+    """
+    i = bisect.bisect_left(xs, x)
+    candidates = [j for j in (i - 1, i) if 0 <= j < len(xs)]
+    if not candidates:
+        return None
+    nearest = min(candidates, key=lambda j: abs(xs[j] - x))
+    if math.dist(points[nearest], (x, y)) > radius:
+        return None
+    return nearest
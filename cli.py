@@ -0,0 +1,140 @@
+"""
+Command-line interface to the habit tracker.
+
+    python cli.py log Calculus Exercise
+    python cli.py log --date 2025-07-20 Reading
+    python cli.py query --from 2025-07-01 --to 2025-07-31
+    python cli.py stats
+    python cli.py stats --verify
+    python cli.py export history.csv
+    python cli.py import backfill.jsonl
+    python cli.py --user alice stats
+"""
+import argparse
+import json
+import sys
+from contextlib import nullcontext
+
+from habit_core import DATA_FILE, DEFAULT_HABITS, HABITS_CONFIG_FILE, HabitLog, load_habits_config
+from habit_io import FORMATS, READERS, WRITERS, guess_format
+from habit_store import STORAGE_BACKENDS
+from profiles import create_profile
+
+
+def open_stream(path, mode):
+    if path == "-":
+        return nullcontext(sys.stdin if "r" in mode else sys.stdout)
+    return open(path, mode, newline="")
+
+
+def cmd_log(habit_log, args):
+    completed = habit_log.log(args.habits, args.date)
+    print(f"{args.date or 'Today'}: {', '.join(completed) or 'nothing'}")
+
+
+def cmd_query(habit_log, args):
+    days = habit_log.query(args.start, args.end)
+    if args.format == "text":
+        for date_str, habits in days:
+            print(f"{date_str}  {', '.join(habits) or '-'}")
+    else:
+        WRITERS[args.format](sys.stdout, days)
+
+
+def cmd_stats(habit_log, args):
+    if args.verify:
+        if not habit_log.stats_match_rebuild():
+            raise ValueError("incremental stats differ from a full rebuild")
+        print("Incremental stats match a full rebuild.")
+        return
+    stats = habit_log.stats(args.date)
+    if args.json:
+        print(json.dumps(stats, indent=4))
+        return
+    print(f"Days logged:        {stats['days_logged']}")
+    print(f"Total completions:  {stats['total_completions']}")
+    print(f"This week:          {stats['this_week']}")
+    print("Completion rate:    " + "   ".join(f"{window} {rate:.0%}" for window, rate in stats["rolling_rates"].items()))
+    print(f"Streak:             {stats['any']['current_streak']} days (best {stats['any']['longest_streak']})")
+    print(f"  {'':<20} {'total':>6} {'streak':>7} {'best':>5} {'week':>5} {'month':>6}")
+    for habit, habit_stats in stats["habits"].items():
+        print(f"  {habit:<20} {habit_stats['total']:>6} {habit_stats['current_streak']:>7} {habit_stats['longest_streak']:>5}"
+              f" {habit_stats['week_rate']:>5.0%} {habit_stats['month_rate']:>6.0%}")
+
+
+def cmd_import(habit_log, args):
+    file_format = args.format or guess_format(args.file)
+    with open_stream(args.file, "r") as f:
+        count = habit_log.import_records(READERS[file_format](f))
+    print(f"Imported {count} records from {args.file}", file=sys.stderr)
+
+
+def cmd_export(habit_log, args):
+    file_format = args.format or guess_format(args.file)
+    with open_stream(args.file, "w") as f:
+        rows = WRITERS[file_format](f, habit_log.query(args.start, args.end))
+    print(f"Exported {rows} rows to {args.file}", file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Track daily habits from the command line.")
+    parser.add_argument("--data", default=DATA_FILE, help="habit data file (default: %(default)s)")
+    parser.add_argument("--habits-file", default=HABITS_CONFIG_FILE, help="habit list; the built-in list is used if it is missing")
+    parser.add_argument("--storage", choices=list(STORAGE_BACKENDS), help="storage backend (default: $HABIT_TRACKER_STORAGE or json)")
+    parser.add_argument("--user", help="profile to use; sets --data and --habits-file to its files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    log_parser = commands.add_parser("log", help="record the habits completed on a day")
+    log_parser.add_argument("habits", nargs="*", help="habits completed; none logs an empty day")
+    log_parser.add_argument("--date", help="YYYY-MM-DD (default: today)")
+    log_parser.set_defaults(func=cmd_log)
+
+    query_parser = commands.add_parser("query", help="list logged days in a date range")
+    query_parser.add_argument("--from", dest="start", help="first date, inclusive")
+    query_parser.add_argument("--to", dest="end", help="last date, inclusive")
+    query_parser.add_argument("--format", choices=("text",) + FORMATS, default="text")
+    query_parser.set_defaults(func=cmd_query)
+
+    stats_parser = commands.add_parser("stats", help="show totals and completion rates")
+    stats_parser.add_argument("--date", help="compute as of YYYY-MM-DD (default: today)")
+    stats_parser.add_argument("--json", action="store_true")
+    stats_parser.add_argument("--verify", action="store_true", help="check the incremental stats against a full rebuild")
+    stats_parser.set_defaults(func=cmd_stats)
+
+    import_parser = commands.add_parser("import", help="bulk import days from CSV or JSONL ('-' for stdin)")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--format", choices=FORMATS)
+    import_parser.set_defaults(func=cmd_import)
+
+    export_parser = commands.add_parser("export", help="export days to CSV or JSONL ('-' for stdout)")
+    export_parser.add_argument("file")
+    export_parser.add_argument("--format", choices=FORMATS)
+    export_parser.add_argument("--from", dest="start", help="first date, inclusive")
+    export_parser.add_argument("--to", dest="end", help="last date, inclusive")
+    export_parser.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.user:
+        try:
+            # A profile's directory may not exist yet; its files appear with the first write.
+            args.data, args.habits_file = create_profile(args.user)
+        except (ValueError, OSError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    habits = load_habits_config(args.habits_file) or DEFAULT_HABITS
+    habit_log = HabitLog(habits, args.data, args.storage)
+    try:
+        args.func(habit_log, args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        habit_log.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Renders a progress chart image for every week and month in the history,
+for reports.
+
+Images are drawn in the app's graph style (HabitPlot) on the headless Agg
+backend, spread over a process pool. The inputs of each image are hashed
+into <out>/index.json, so a re-run only renders the periods whose data
+changed.
+
+    python export_charts.py [--data habits.json] [--out charts] [--workers 4]
+    python export_charts.py --readme          # also refresh habits.png
+"""
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from chart import HabitPlot
+from habit_core import DATA_FILE, DEFAULT_HABITS, HABITS_CONFIG_FILE, HabitLog, load_habits_config
+from habit_store import atomic_write_json
+from periods import VIEW_AXIS_LABELS, VIEW_TITLES
+
+PERIOD_VIEWS = ("Week", "Month")
+PERIOD_DIRS = {"Week": "week", "Month": "month"}
+HASH_LENGTH = 12
+# Part of every image's hash: bump it when HabitPlot's look changes so the
+# next export redraws everything.
+STYLE_VERSION = 1
+README_IMAGE = "habits.png"
+
+_plot = None
+_canvas = None
+
+
+def iter_periods(view, first, last):
+    """Yields the first day of each week or month from first to last."""
+    if view == "Week":
+        day = first - timedelta(days=first.weekday())
+        while day <= last:
+            yield day
+            day += timedelta(days=7)
+    else:
+        day = first.replace(day=1)
+        while day <= last:
+            yield day
+            day = (day + timedelta(days=32)).replace(day=1)
+
+
+def period_file(view, day):
+    if view == "Week":
+        year, week, _ = day.isocalendar()
+        return f"{PERIOD_DIRS[view]}/{year}-W{week:02d}.png"
+    return f"{PERIOD_DIRS[view]}/{day:%Y-%m}.png"
+
+
+def period_title(view, day):
+    if view == "Week":
+        return f"{VIEW_TITLES[view]} Habit Progress, week of {day:%d %b %Y}"
+    return f"{VIEW_TITLES[view]} Habit Progress, {day:%B %Y}"
+
+
+def chart_spec(habit_log, view, day, title=None):
+    """HabitPlot.set_data arguments for the period containing day."""
+    buckets, counts = habit_log.period_counts(view, day)
+    labels = [label for label, start, end in buckets]
+    return labels, counts, title or period_title(view, day), VIEW_AXIS_LABELS[view], habit_log.period_capacity(buckets)
+
+
+def chart_specs(habit_log):
+    """(file name, spec) for every week and month with any completions."""
+    # Ask the store rather than its bitmap, which may only hold recent weeks.
+    logged = [date_str for date_str, habits in habit_log.query()]
+    if not logged:
+        return []
+    first, last = date.fromisoformat(logged[0]), date.fromisoformat(logged[-1])
+    specs = []
+    for view in PERIOD_VIEWS:
+        for day in iter_periods(view, first, last):
+            spec = chart_spec(habit_log, view, day)
+            if any(spec[1]):
+                specs.append((period_file(view, day), spec))
+    return specs
+
+
+def spec_hash(spec):
+    payload = json.dumps([STYLE_VERSION, *spec], separators=(",", ":")).encode()
+    return hashlib.sha256(payload).hexdigest()[:HASH_LENGTH]
+
+
+def render_chart(task):
+    """Draws one (path, spec) task. Each worker process keeps one HabitPlot for all its tasks."""
+    global _plot, _canvas
+    if _plot is None:
+        _plot = HabitPlot()
+        _canvas = FigureCanvasAgg(_plot.figure)
+    path, spec = task
+    _plot.set_data(*spec)
+    tmp_path = path + ".tmp"
+    # print_png draws once; Figure.savefig goes through print_figure, which
+    # draws a second time.
+    _canvas.print_png(tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_index(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def export(habit_log, out_dir, workers=None, force=False):
+    """
+    Brings out_dir up to date with the history. Returns (images, rendered):
+    how many images the history has and how many had to be drawn.
+    """
+    for folder in PERIOD_DIRS.values():
+        os.makedirs(os.path.join(out_dir, folder), exist_ok=True)
+    index_path = os.path.join(out_dir, "index.json")
+    previous = {} if force else load_index(index_path)
+
+    index = {}
+    tasks = []
+    for name, spec in chart_specs(habit_log):
+        digest = spec_hash(spec)
+        index[name] = digest
+        path = os.path.join(out_dir, name)
+        if previous.get(name) != digest or not os.path.exists(path):
+            tasks.append((path, spec))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) < 2:
+        for task in tasks:
+            render_chart(task)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Chunks amortize the pickling round trips; several per worker
+            # keep the pool balanced.
+            chunksize = max(1, len(tasks) // (workers * 4))
+            for _ in pool.map(render_chart, tasks, chunksize=chunksize):
+                pass
+
+    # The index goes last, so an interrupted run re-renders what it missed.
+    atomic_write_json(index_path, index, indent=None)
+    for folder in PERIOD_DIRS.values():
+        for name in os.listdir(os.path.join(out_dir, folder)):
+            if f"{folder}/{name}" not in index:
+                os.remove(os.path.join(out_dir, folder, name))
+    return len(index), len(tasks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render chart images for every week and month in the history.")
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--habits-file", default=HABITS_CONFIG_FILE)
+    parser.add_argument("--out", default="charts")
+    parser.add_argument("--workers", type=int, help="processes to render with (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="redraw every image, even unchanged ones")
+    parser.add_argument("--readme", nargs="?", const=README_IMAGE, metavar="PATH",
+                        help=f"also draw this week's graph to PATH (default {README_IMAGE})")
+    args = parser.parse_args()
+
+    habits = load_habits_config(args.habits_file) or DEFAULT_HABITS
+    habit_log = HabitLog(habits, args.data)
+    images, rendered = export(habit_log, args.out, args.workers, args.force)
+    print(f"{images} charts in {args.out}/, {rendered} redrawn")
+    if args.readme:
+        render_chart((args.readme, chart_spec(habit_log, "Week", date.today(), "Weekly Habit Progress")))
+        print(f"Wrote {args.readme}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import json
+import sys
+from array import array
+from datetime import date, timedelta
+from functools import lru_cache
+
+from range_index import FenwickTree
+
+# Bit 63 marks a day as logged so an explicitly empty log ("nothing done
+# today") survives a round trip, leaving 63 bits for habits.
+LOGGED_BIT = 1 << 63
+HABIT_BITS = 63
+HABIT_MASK = LOGGED_BIT - 1
+# Ranges shorter than this are summed straight off the array, which beats
+# two Fenwick prefix walks.
+SHORT_RANGE_DAYS = 32
+
+
+# The UI asks about the same few dates (today, this week) over and over.
+@lru_cache(maxsize=1024)
+def date_to_ordinal(date_str):
+    return date.fromisoformat(date_str).toordinal()
+
+
+def ordinal_to_date(ordinal):
+    return date.fromordinal(ordinal).isoformat()
+
+
+def to_ordinal(day):
+    """Accepts a date or an ISO date string."""
+    if isinstance(day, date):
+        return day.toordinal()
+    return date_to_ordinal(day)
+
+
+class HabitBitmap:
+    """
+    Daily completions stored as one 64-bit mask per day.
+
+    Habit names are interned to small integer IDs (in the order given, so
+    user_habits.json order is preserved) and day N of the history lives at
+    days[N - first_ordinal]. Counting and membership are bit operations on
+    machine integers instead of scans over lists of strings, and a Fenwick
+    tree over the per-day counts (built on first use) answers range sums.
+    """
+
+    def __init__(self, habits=()):
+        self.habit_ids = {}
+        self.habit_names = []
+        self.first_ordinal = None
+        self.days = array("Q")
+        # Bumped on every write so derived aggregates can tell they're stale.
+        self.version = 0
+        self._counts = None
+        for habit in habits:
+            self.intern(habit)
+
+    @classmethod
+    def from_dict(cls, data, habits=()):
+        bitmap = cls(habits)
+        for date_str, names in data.items():
+            bitmap.set_day(date_str, names)
+        return bitmap
+
+    @classmethod
+    def from_bytes(cls, data, habits=()):
+        """
+        Reads what to_bytes wrote. Returns None if its habit IDs don't start
+        with habits, so that habits keep their configured IDs.
+        """
+        newline = data.find(b"\n")
+        if newline < 0:
+            raise ValueError("Missing bitmap header")
+        header = json.loads(data[:newline])
+        if header["habits"][:len(habits)] != list(habits):
+            return None
+        bitmap = cls(header["habits"])
+        bitmap.first_ordinal = header["first"]
+        bitmap.days.frombytes(memoryview(data)[newline + 1:])
+        if sys.byteorder == "big":
+            bitmap.days.byteswap()
+        return bitmap
+
+    def to_bytes(self):
+        """A JSON header line (habit names, first day), then the masks as little-endian uint64."""
+        header = json.dumps({"habits": self.habit_names, "first": self.first_ordinal}).encode() + b"\n"
+        if sys.byteorder == "big":
+            days = array("Q", self.days)
+            days.byteswap()
+            return header + days.tobytes()
+        return header + self.days.tobytes()
+
+    def copy(self):
+        bitmap = HabitBitmap()
+        bitmap.habit_ids = dict(self.habit_ids)
+        bitmap.habit_names = list(self.habit_names)
+        bitmap.first_ordinal = self.first_ordinal
+        bitmap.days = array("Q", self.days)
+        return bitmap
+
+    def __len__(self):
+        return len(self.days)
+
+    def intern(self, habit):
+        habit_id = self.habit_ids.get(habit)
+        if habit_id is None:
+            if len(self.habit_names) >= HABIT_BITS:
+                raise ValueError(f"Cannot track more than {HABIT_BITS} distinct habits")
+            habit_id = len(self.habit_names)
+            self.habit_ids[habit] = habit_id
+            self.habit_names.append(habit)
+        return habit_id
+
+    def encode(self, names):
+        mask = LOGGED_BIT
+        for name in names:
+            mask |= 1 << self.intern(name)
+        return mask
+
+    def decode(self, mask):
+        return [name for habit_id, name in enumerate(self.habit_names) if mask >> habit_id & 1]
+
+    @property
+    def last_ordinal(self):
+        if self.first_ordinal is None:
+            return None
+        return self.first_ordinal + len(self.days) - 1
+
+    def _offset_for_write(self, ordinal):
+        if self.first_ordinal is None:
+            self.first_ordinal = ordinal
+        if ordinal < self.first_ordinal:
+            self.days[:0] = array("Q", bytes(8 * (self.first_ordinal - ordinal)))
+            self.first_ordinal = ordinal
+            # Backfilling before the first day shifts every offset; rebuild
+            # the count index lazily rather than patching it.
+            self._counts = None
+        offset = ordinal - self.first_ordinal
+        if offset >= len(self.days):
+            missing = offset + 1 - len(self.days)
+            self.days.extend(array("Q", bytes(8 * missing)))
+            if self._counts is not None:
+                self._counts.extend([0] * missing)
+        return offset
+
+    def _count_index(self):
+        if self._counts is None:
+            self._counts = FenwickTree((mask & HABIT_MASK).bit_count() for mask in self.days)
+        return self._counts
+
+    def mask_at(self, ordinal):
+        if self.first_ordinal is None:
+            return 0
+        offset = ordinal - self.first_ordinal
+        if 0 <= offset < len(self.days):
+            return self.days[offset]
+        return 0
+
+    def set_mask_at(self, ordinal, mask):
+        """Stores mask for the day and returns the mask it replaced."""
+        offset = self._offset_for_write(ordinal)
+        old_mask = self.days[offset]
+        self.days[offset] = mask
+        self.version += 1
+        if self._counts is not None:
+            self._counts.set(offset, (mask & HABIT_MASK).bit_count())
+        return old_mask
+
+    def merge_masks(self, first_ordinal, masks):
+        """
+        Stores masks for consecutive days from first_ordinal, leaving any day
+        that already holds a mask alone.
+        """
+        if not masks:
+            return
+        self._offset_for_write(first_ordinal + len(masks) - 1)
+        offset = self._offset_for_write(first_ordinal)
+        days = self.days
+        for i, mask in enumerate(masks, offset):
+            if mask and not days[i]:
+                days[i] = mask
+        self.version += 1
+        self._counts = None
+
+    def set_day(self, date_str, names):
+        return self.set_mask_at(date_to_ordinal(date_str), self.encode(names))
+
+    def mask(self, date_str):
+        return self.mask_at(date_to_ordinal(date_str))
+
+    def get(self, date_str):
+        return self.decode(self.mask(date_str))
+
+    def is_logged(self, date_str):
+        return bool(self.mask(date_str) & LOGGED_BIT)
+
+    def count(self, date_str):
+        return (self.mask(date_str) & HABIT_MASK).bit_count()
+
+    def contains(self, date_str, habit):
+        habit_id = self.habit_ids.get(habit)
+        if habit_id is None:
+            return False
+        return bool(self.mask(date_str) >> habit_id & 1)
+
+    def range_masks(self, start_ordinal, end_ordinal):
+        """Masks for every day in [start_ordinal, end_ordinal], zeros for gaps."""
+        if self.first_ordinal is None or end_ordinal < start_ordinal:
+            return [0] * max(0, end_ordinal - start_ordinal + 1)
+        lo = max(start_ordinal, self.first_ordinal)
+        hi = min(end_ordinal, self.last_ordinal)
+        if lo > hi:
+            return [0] * (end_ordinal - start_ordinal + 1)
+        before = [0] * (lo - start_ordinal)
+        after = [0] * (end_ordinal - hi)
+        return before + self.days[lo - self.first_ordinal:hi - self.first_ordinal + 1].tolist() + after
+
+    def daily_counts(self, start_ordinal, end_ordinal):
+        return [(mask & HABIT_MASK).bit_count() for mask in self.range_masks(start_ordinal, end_ordinal)]
+
+    def range_sum(self, start_ordinal, end_ordinal):
+        """Total completions over [start_ordinal, end_ordinal] in O(log n)."""
+        if self.first_ordinal is None:
+            return 0
+        if end_ordinal - start_ordinal < SHORT_RANGE_DAYS:
+            lo = max(start_ordinal - self.first_ordinal, 0)
+            hi = max(end_ordinal - self.first_ordinal + 1, 0)
+            return sum((mask & HABIT_MASK).bit_count() for mask in self.days[lo:hi])
+        return self._count_index().range_sum(start_ordinal - self.first_ordinal, end_ordinal - self.first_ordinal)
+
+    def week_sum(self, week_start):
+        ordinal = to_ordinal(week_start)
+        return self.range_sum(ordinal, ordinal + 6)
+
+    def iter_days(self, start_ordinal=None, end_ordinal=None):
+        """Yields (date_str, habit names) for logged days in range, oldest first."""
+        if self.first_ordinal is None:
+            return
+        lo = 0 if start_ordinal is None else max(start_ordinal - self.first_ordinal, 0)
+        hi = len(self.days) if end_ordinal is None else min(end_ordinal - self.first_ordinal + 1, len(self.days))
+        first_day = date.fromordinal(self.first_ordinal)
+        for offset in range(lo, hi):
+            mask = self.days[offset]
+            if mask & LOGGED_BIT:
+                yield (first_day + timedelta(days=offset)).isoformat(), self.decode(mask)
+
+    def to_dict(self):
+        return dict(self.iter_days())
@@ -0,0 +1,164 @@
+import json
+import os
+from datetime import date, datetime
+
+from habit_stats import HabitStats
+from habit_store import open_store
+from periods import ROLLING_WINDOWS, period_buckets, week_dates
+
+DEFAULT_HABITS = ["Calculus", "Chemistry", "Reading", "Projects", "Exercise"]
+HABITS_CONFIG_FILE = "user_habits.json"
+DATA_FILE = "habits.json"
+
+
+def load_habits_config(path=HABITS_CONFIG_FILE):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return None
+
+
+def save_habits_config(habits, path=HABITS_CONFIG_FILE):
+    with open(path, "w") as f:
+        json.dump(habits, f, indent=4)
+
+
+def parse_day(value):
+    """Accepts None (today), a date/datetime, or an ISO date string."""
+    if value is None:
+        return datetime.now().date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+class HabitLog:
+    """
+    Logging, querying and persistence for one list of habits, with no UI.
+
+    The Tk trackers and the command line both drive a HabitLog; everything
+    that touches the store goes through here.
+    """
+
+    def __init__(self, habits, path=DATA_FILE, backend=None, store=None):
+        self.habits = list(habits)
+        self.store = store or open_store(path, backend, habits=self.habits)
+        self._stats = HabitStats()
+
+    def completed_on(self, day=None):
+        return self.store.get(parse_day(day).isoformat())
+
+    def states_on(self, day=None):
+        date_str = parse_day(day).isoformat()
+        return [self.store.contains(date_str, habit) for habit in self.habits]
+
+    def log(self, completed, day=None):
+        """Records the habits completed on day (default today), replacing any earlier log."""
+        unknown = [habit for habit in completed if habit not in self.habits]
+        if unknown:
+            raise ValueError(f"Unknown habit(s): {', '.join(unknown)}")
+        completed = [habit for habit in self.habits if habit in completed]
+        day = parse_day(day)
+        old_mask = self.store.set_day(day.isoformat(), completed)
+        if self._stats.tracking:
+            self._stats.update(self.store.bitmap(), day.toordinal(), old_mask)
+        return completed
+
+    def log_states(self, states, day=None):
+        return self.log([habit for habit, state in zip(self.habits, states) if state], day)
+
+    def query(self, start=None, end=None):
+        """Yields (date_str, habits) for each logged day in [start, end]."""
+        return self.store.iter_days(start and parse_day(start), end and parse_day(end))
+
+    def period_counts(self, view, today=None):
+        """Graph buckets for the view and the completions in each."""
+        buckets = period_buckets(view, parse_day(today))
+        if all(start == end for label, start, end in buckets):
+            # One bucket per day (week, month): one query for the whole span.
+            return buckets, self.store.daily_counts(buckets[0][1], buckets[-1][2])
+        return buckets, [self.store.range_count(start, end) for label, start, end in buckets]
+
+    def period_capacity(self, buckets):
+        """Most completions any single bucket can hold: the graph's y-axis limit."""
+        return max((end - start).days + 1 for label, start, end in buckets) * len(self.habits)
+
+    def bucket_details(self, bucket, count):
+        label, start, end = bucket
+        if start == end:
+            return self.store.get(start.isoformat())
+        if count:
+            return [f"{count} habits completed"]
+        return []
+
+    def daily_counts(self, start, end=None):
+        """Completions on each day from start to end (default today)."""
+        return self.store.daily_counts(parse_day(start), parse_day(end))
+
+    def week_total(self, today=None):
+        this_week = week_dates(parse_day(today))
+        return self.store.range_count(this_week[0], this_week[-1])
+
+    def rolling_rates(self, today=None, windows=ROLLING_WINDOWS):
+        today = parse_day(today)
+        return [(days, self.store.completion_rate(days, today, len(self.habits))) for days in windows]
+
+    def summary(self, today=None):
+        """
+        Current and longest streaks, totals and this week's and month's
+        completion rates, per habit and for "any habit", as of today.
+        """
+        today = parse_day(today)
+        bitmap = self.store.bitmap()
+        stats = self._stats.sync(bitmap, self.store.stats_base())
+        if stats.tail is not None and today.toordinal() < stats.tail:
+            # As of an earlier date: rebuild up to it and leave the live
+            # aggregates alone. The store loads whatever that needs into
+            # the same bitmap.
+            stats = HabitStats.build(bitmap, today.toordinal(), self.store.stats_base(today.toordinal()))
+        return stats.summary({habit: bitmap.habit_ids[habit] for habit in self.habits}, today.toordinal())
+
+    def stats(self, today=None):
+        today = parse_day(today)
+        stats = self.summary(today)
+        stats["habit_totals"] = {habit: habit_stats["total"] for habit, habit_stats in stats["habits"].items()}
+        stats["rolling_rates"] = {f"{days}d": rate for days, rate in self.rolling_rates(today)}
+        stats["this_week"] = self.week_total(today)
+        return stats
+
+    def stats_match_rebuild(self):
+        """Checks the incrementally kept stats against a full rebuild."""
+        bitmap = self.store.bitmap()
+        base = self.store.stats_base()
+        return self._stats.sync(bitmap, base).matches_rebuild(bitmap, base)
+
+    def import_records(self, records):
+        """
+        Writes (date_str, habits) records in one store batch. A run of records
+        for the same day, like the one-row-per-habit CSV that export writes,
+        is merged into that day; records must be sorted or grouped by day,
+        since only the current day is remembered. Returns the number of
+        records read.
+        """
+        current_day = None
+        count = 0
+        with self.store.batch():
+            for date_str, completed in records:
+                date_str = parse_day(date_str).isoformat()
+                if date_str == current_day:
+                    completed = list(dict.fromkeys(self.store.get(date_str) + list(completed)))
+                current_day = date_str
+                self.store.set_day(date_str, completed)
+                count += 1
+        return count
+
+    def flush(self):
+        self.store.flush()
+
+    def close(self):
+        self.store.close()
@@ -0,0 +1,142 @@
+"""
+Streaming readers and writers for bulk import/export.
+
+CSV is long format, one (date, habit) row per completion, with an empty
+habit marking a day logged with nothing done. JSONL is one
+{"date": ..., "habits": [...]} object per line, the same shape as the
+journal. Both read and write one row at a time, so memory stays flat no
+matter how large the file is.
+"""
+import csv
+import json
+import os
+
+FORMATS = ("csv", "jsonl")
+CSV_HEADER = ["date", "habit"]
+NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+def guess_format(path):
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if extension in FORMATS:
+        return extension
+    if extension in ("json", "ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {path!r}; pass --format")
+
+
+def read_csv(f):
+    """Yields (date, [habit]) per row; HabitLog.import_records merges same-day rows."""
+    reader = csv.reader(f)
+    for row in reader:
+        if not row or row == CSV_HEADER:
+            continue
+        date_str = row[0].strip()
+        habit = row[1].strip() if len(row) > 1 else ""
+        yield date_str, [habit] if habit else []
+
+
+def read_jsonl(f):
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            yield record["date"], record["habits"]
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            raise ValueError(f"Line {line_number}: expected {{\"date\": ..., \"habits\": [...]}} ({e})")
+
+
+def iter_json_object(f, chunk_size=1 << 16):
+    """
+    Yields the (key, value) pairs of the top-level JSON object in f without
+    loading the whole file, e.g. the days of a large habits.json. Each value
+    must fit in memory; the object as a whole needn't.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def token(expected):
+        # Skips whitespace and returns the next character, which must be one of expected.
+        nonlocal buffer, pos, eof
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer):
+                char = buffer[pos]
+                if char not in expected:
+                    raise ValueError(f"Expected one of {expected!r} in JSON object, found {char!r}")
+                pos += 1
+                return char
+            if eof:
+                raise ValueError("JSON object ended early")
+            buffer, pos = f.read(chunk_size), 0
+            eof = not buffer
+
+    def value():
+        # Decodes the next value, reading more whenever it runs past the buffer.
+        nonlocal buffer, pos, eof
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            try:
+                result, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError("JSON object ended early")
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            if isinstance(result, (int, float)) and not eof:
+                # A number running up to the end of the buffer may continue
+                # in the next chunk.
+                tail = end
+                while tail < len(buffer) and buffer[tail] in NUMBER_CHARS:
+                    tail += 1
+                if tail == len(buffer):
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    buffer, pos = buffer[pos:] + chunk, 0
+                    continue
+            pos = end
+            return result
+
+    token("{")
+    if token('"}') == "}":
+        return
+    pos -= 1
+    while True:
+        key = value()
+        token(":")
+        yield key, value()
+        if token(",}") == "}":
+            return
+        token('"')
+        pos -= 1
+
+
+def write_csv(f, days):
+    writer = csv.writer(f)
+    writer.writerow(CSV_HEADER)
+    rows = 0
+    for date_str, habits in days:
+        for habit in habits or [""]:
+            writer.writerow([date_str, habit])
+            rows += 1
+    return rows
+
+
+def write_jsonl(f, days):
+    rows = 0
+    for date_str, habits in days:
+        f.write(json.dumps({"date": date_str, "habits": habits}) + "\n")
+        rows += 1
+    return rows
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
@@ -0,0 +1,261 @@
+from datetime import date
+
+from habit_bitmap import HABIT_BITS, HABIT_MASK, LOGGED_BIT
+
+# Slot 63 (the logged bit in a stored mask) tracks "any habit done that day",
+# so the overall streak shares the per-habit bookkeeping.
+ANY_KEY = HABIT_BITS
+KEY_SLOTS = HABIT_BITS + 1
+
+
+def key_bits(mask):
+    completed = mask & HABIT_MASK
+    return completed | (LOGGED_BIT if completed else 0)
+
+
+def week_key(ordinal):
+    """Ordinal of the Monday starting the week containing ordinal."""
+    return ordinal - (ordinal - 1) % 7
+
+
+def month_key(ordinal):
+    day = date.fromordinal(ordinal)
+    return day.year * 12 + day.month - 1
+
+
+class HabitStats:
+    """
+    Streaks, totals and week/month completion counts kept up to date as days
+    are logged, so reading them never walks the history.
+
+    Streak state is held as of the latest logged day (the tail): for each
+    habit, the run ending the day before the tail and the longest run before
+    the tail, plus the tail's own mask. Re-logging the tail just swaps its
+    mask, and logging a later day folds the tail in, so both are O(1) per
+    habit. Totals and week/month buckets are adjusted by the bits that
+    changed, whatever the day.
+
+    The aggregates follow one HabitBitmap and its version counter. If the
+    bitmap was replaced (the store reloaded), written to without update()
+    (a batch import), or a day before the tail was changed (a backfill),
+    they are rebuilt from the bitmap on the next read.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._source = None
+        self._version = None
+        self.tail = None
+        self.tail_mask = 0
+        # Habit IDs below this have been seen; higher slots are all zero.
+        self.width = 0
+        self.runs = [0] * KEY_SLOTS
+        self.longest = [0] * KEY_SLOTS
+        self.totals = [0] * KEY_SLOTS
+        self.days_logged = 0
+        self.completions = 0
+        self.weeks = {}
+        self.months = {}
+
+    @classmethod
+    def build(cls, bitmap, end_ordinal=None, base=None):
+        """
+        Computes the aggregates from scratch, optionally only up to
+        end_ordinal. base, if given, is a checkpoint (see from_checkpoint)
+        covering every day up to its tail; only later days are read from the
+        bitmap.
+        """
+        stats = cls()
+        stats.rebuild(bitmap, end_ordinal, base)
+        return stats
+
+    def rebuild(self, bitmap, end_ordinal=None, base=None):
+        self.reset()
+        first = bitmap.first_ordinal
+        if base is not None and base.tail is not None:
+            self._restore(base)
+            first = None if first is None else max(first, base.tail + 1)
+        if first is not None:
+            last = bitmap.last_ordinal if end_ordinal is None else min(end_ordinal, bitmap.last_ordinal)
+            offset = first - bitmap.first_ordinal
+            for i, mask in enumerate(bitmap.days[offset:max(last - bitmap.first_ordinal + 1, offset)]):
+                if mask:
+                    self._apply(first + i, 0, mask)
+        if end_ordinal is None:
+            self._source = bitmap
+            self._version = bitmap.version
+
+    def sync(self, bitmap, base=None):
+        """Rebuilds if the bitmap changed in ways update() wasn't told about."""
+        if bitmap is not self._source or bitmap.version != self._version:
+            self.rebuild(bitmap, base=base)
+        return self
+
+    def checkpoint(self):
+        """
+        The state needed to carry on from the tail, as JSON-ready data. Week
+        and month counts are kept only for the tail's week and month, the
+        ones later days can still add to.
+        """
+        return {
+            "tail": self.tail,
+            "tail_mask": self.tail_mask,
+            "width": self.width,
+            "runs": self.runs,
+            "longest": self.longest,
+            "totals": self.totals,
+            "days_logged": self.days_logged,
+            "completions": self.completions,
+            "week": self.weeks.get(week_key(self.tail)) if self.tail is not None else None,
+            "month": self.months.get(month_key(self.tail)) if self.tail is not None else None,
+        }
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint):
+        stats = cls()
+        stats.tail = checkpoint["tail"]
+        stats.tail_mask = checkpoint["tail_mask"]
+        stats.width = checkpoint["width"]
+        stats.runs = list(checkpoint["runs"])
+        stats.longest = list(checkpoint["longest"])
+        stats.totals = list(checkpoint["totals"])
+        stats.days_logged = checkpoint["days_logged"]
+        stats.completions = checkpoint["completions"]
+        if stats.tail is not None:
+            if checkpoint["week"]:
+                stats.weeks[week_key(stats.tail)] = list(checkpoint["week"])
+            if checkpoint["month"]:
+                stats.months[month_key(stats.tail)] = list(checkpoint["month"])
+        return stats
+
+    def _restore(self, base):
+        self.tail, self.tail_mask, self.width = base.tail, base.tail_mask, base.width
+        self.runs, self.longest, self.totals = list(base.runs), list(base.longest), list(base.totals)
+        self.days_logged, self.completions = base.days_logged, base.completions
+        self.weeks = {key: list(counts) for key, counts in base.weeks.items()}
+        self.months = {key: list(counts) for key, counts in base.months.items()}
+
+    @property
+    def tracking(self):
+        """False until the first sync, and whenever a rebuild is pending."""
+        return self._source is not None
+
+    def update(self, bitmap, ordinal, old_mask):
+        """Applies one set_day on bitmap, given the mask it replaced."""
+        if bitmap is not self._source or bitmap.version != self._version + 1:
+            self._source = None
+            return
+        if self.tail is not None and ordinal < self.tail:
+            # A backfill can split or join runs anywhere before the tail.
+            self._source = None
+            return
+        self._version = bitmap.version
+        self._apply(ordinal, old_mask, bitmap.mask_at(ordinal))
+
+    def _apply(self, ordinal, old_mask, new_mask):
+        changed = key_bits(old_mask) ^ key_bits(new_mask)
+        if changed:
+            added = key_bits(new_mask)
+            week = self.weeks.setdefault(week_key(ordinal), [0] * KEY_SLOTS)
+            month = self.months.setdefault(month_key(ordinal), [0] * KEY_SLOTS)
+            while changed:
+                key = (changed & -changed).bit_length() - 1
+                changed &= changed - 1
+                delta = 1 if added >> key & 1 else -1
+                self.totals[key] += delta
+                week[key] += delta
+                month[key] += delta
+        self.width = max(self.width, (new_mask & HABIT_MASK).bit_length())
+        self.completions += (new_mask & HABIT_MASK).bit_count() - (old_mask & HABIT_MASK).bit_count()
+        self.days_logged += bool(new_mask & LOGGED_BIT) - bool(old_mask & LOGGED_BIT)
+
+        if self.tail is None or ordinal > self.tail:
+            if self.tail is not None:
+                self._fold_tail(gap=ordinal - self.tail > 1)
+            self.tail = ordinal
+        self.tail_mask = new_mask
+
+    def _fold_tail(self, gap):
+        bits = key_bits(self.tail_mask)
+        runs, longest = self.runs, self.longest
+        for key in (*range(self.width), ANY_KEY):
+            done = bits >> key & 1
+            if done:
+                runs[key] += 1
+                if runs[key] > longest[key]:
+                    longest[key] = runs[key]
+            if gap or not done:
+                runs[key] = 0
+
+    def current_streak(self, key, today_ordinal):
+        """Run of days ending today, or yesterday if today isn't done yet."""
+        if self.tail is None or today_ordinal > self.tail + 1:
+            return 0
+        if today_ordinal < self.tail:
+            raise ValueError("current_streak needs today on or after the latest logged day")
+        tail_done = key_bits(self.tail_mask) >> key & 1
+        if tail_done:
+            return self.runs[key] + 1
+        return self.runs[key] if today_ordinal == self.tail else 0
+
+    def longest_streak(self, key):
+        tail_done = key_bits(self.tail_mask) >> key & 1
+        return max(self.longest[key], self.runs[key] + tail_done)
+
+    def _rates(self, key, today_ordinal):
+        week = self.weeks.get(week_key(today_ordinal))
+        month = self.months.get(month_key(today_ordinal))
+        day = date.fromordinal(today_ordinal)
+        return (
+            (week[key] if week else 0) / (day.weekday() + 1),
+            (month[key] if month else 0) / day.day,
+        )
+
+    def summary(self, habit_ids, today_ordinal):
+        """
+        Per-habit and overall stats as of today_ordinal, which must be on or
+        after the latest logged day. habit_ids maps habit names to bitmap IDs.
+        """
+        habits = {}
+        for name, key in habit_ids.items():
+            week_rate, month_rate = self._rates(key, today_ordinal)
+            habits[name] = {
+                "current_streak": self.current_streak(key, today_ordinal),
+                "longest_streak": self.longest_streak(key),
+                "total": self.totals[key],
+                "week_rate": week_rate,
+                "month_rate": month_rate,
+            }
+        week_rate, month_rate = self._rates(ANY_KEY, today_ordinal)
+        return {
+            "days_logged": self.days_logged,
+            "total_completions": self.completions,
+            "habits": habits,
+            "any": {
+                "current_streak": self.current_streak(ANY_KEY, today_ordinal),
+                "longest_streak": self.longest_streak(ANY_KEY),
+                "total": self.totals[ANY_KEY],
+                "week_rate": week_rate,
+                "month_rate": month_rate,
+            },
+        }
+
+    def state(self):
+        """Everything the aggregates hold, normalised for comparison."""
+        return {
+            "tail": self.tail,
+            "tail_mask": self.tail_mask,
+            "runs": self.runs,
+            "longest": [self.longest_streak(key) for key in range(KEY_SLOTS)],
+            "totals": self.totals,
+            "days_logged": self.days_logged,
+            "completions": self.completions,
+            "weeks": {k: v for k, v in self.weeks.items() if any(v)},
+            "months": {k: v for k, v in self.months.items() if any(v)},
+        }
+
+    def matches_rebuild(self, bitmap, base=None):
+        """True if the incrementally maintained state equals a full rebuild."""
+        return self.state() == HabitStats.build(bitmap, base=base).state()
@@ -0,0 +1,825 @@
+import gzip
+import json
+import lzma
+import os
+import stat
+import sys
+import tempfile
+import threading
+from array import array
+from contextlib import contextmanager
+from datetime import date
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows); writes are still atomic replaces, so
+    # readers never see a half-written file, but two writers can race.
+    fcntl = None
+
+from habit_bitmap import LOGGED_BIT, HABIT_MASK, HabitBitmap, to_ordinal
+from habit_io import iter_json_object
+from habit_stats import HabitStats
+from sqlite_store import SqliteStore
+
+STORAGE_ENV_VAR = "HABIT_TRACKER_STORAGE"
+# A reload is retried if the files change while being read; after this many
+# attempts it is done under the write lock instead.
+OPTIMISTIC_READ_ATTEMPTS = 3
+# Weeks of history, this one included, that tiered storage keeps in the hot file.
+HOT_WEEKS = 8
+# Archive segment compression: file suffix, compress, decompress.
+COMPRESSORS = {
+    "gzip": (".gz", gzip.compress, gzip.decompress),
+    "lzma": (".xz", lzma.compress, lzma.decompress),
+}
+
+
+def _read_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Read once at import: os.umask can only be read by setting it, which
+# would race with files other threads create.
+UMASK = _read_umask()
+
+
+def _replace_mode(path):
+    """The permissions a file replacing path should have: path's own, or the usual ones for a new file."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+
+def atomic_write_json(path, data, indent=4):
+    """Writes data to a temp file next to path, then renames it into place."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp files are 0600; keep the mode the file being replaced had.
+        os.chmod(tmp_path, _replace_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_bytes(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, _replace_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def load_json_file(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+@contextmanager
+def file_lock(path, blocking=True):
+    """
+    Holds an exclusive advisory lock on path (created if missing). Yields
+    False instead of waiting if blocking is off and the lock is taken.
+    """
+    if fcntl is None:
+        yield True
+        return
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class HabitStore:
+    """
+    In-memory view of habits.json shared by the trackers.
+
+    The file is parsed once into a HabitBitmap; reads are served from memory,
+    writes go straight through to disk, and the file is only re-read when its
+    inode, mtime or size changes underneath us (another instance, a git
+    pull, a hand edit). habits seeds the bitmap's habit IDs so they follow
+    the configured habit order.
+
+    Writers from any number of processes take an flock on <path>.lock and
+    reload anything committed since they last looked before applying their
+    change, so no log is lost. Readers take no lock: files are only ever
+    replaced atomically, and a reload that raced a writer is retried.
+    """
+
+    def __init__(self, path="habits.json", habits=()):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.cache_path = path + ".bin"
+        self.habits = list(habits)
+        self._days = HabitBitmap(self.habits)
+        self._signature = None
+        # Bumped on every reload and write; see generation().
+        self._generation = 0
+        self._batch_depth = 0
+        self._batch_failed = False
+        self._lock_depth = 0
+        self._dirty = False
+        self._cache_stale = False
+        self.refresh()
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _read(self):
+        try:
+            with open(self.path, "rb") as f:
+                # fstat: the file we are reading, even if it is replaced meanwhile.
+                st = os.fstat(f.fileno())
+                source = [st.st_ino, st.st_mtime_ns, st.st_size]
+                days = self._read_cache(source)
+                if days is None:
+                    days = HabitBitmap.from_dict(json.load(f), self.habits)
+                    self._write_cache(days, source)
+        except FileNotFoundError:
+            days = HabitBitmap(self.habits)
+        return days
+
+    def _read_cache(self, source):
+        """The bitmap saved next to habits.json, if it was saved from this exact version of the file."""
+        try:
+            with open(self.cache_path, "rb") as f:
+                header = json.loads(f.readline())
+                if header.get("source") != source:
+                    return None
+                return HabitBitmap.from_bytes(f.read(), self.habits)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_cache(self, days, source):
+        header = json.dumps({"source": list(source)}).encode() + b"\n"
+        try:
+            atomic_write_bytes(self.cache_path, header + days.to_bytes())
+        except OSError:
+            # Only a shortcut for the next load; habits.json is what counts.
+            pass
+
+    def _write_day(self, date_str, habits):
+        if self._batch_depth:
+            self._dirty = True
+            return
+        atomic_write_json(self.path, self._days.to_dict())
+        self._cache_stale = True
+
+    def _flush_batch(self):
+        if self._dirty:
+            atomic_write_json(self.path, self._days.to_dict())
+            self._dirty = False
+            self._cache_stale = True
+
+    def _discard_batch(self):
+        # Nothing from the batch reached the file, so reloading it drops
+        # the batch from memory too.
+        self._dirty = False
+        self._signature = None
+        self.refresh()
+
+    def refresh(self):
+        """Reloads the file if it changed on disk. Returns True if it did."""
+        if self._batch_depth:
+            # Mid-batch the file lags memory by design; don't reload our own writes.
+            return False
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return False
+        for attempt in range(OPTIMISTIC_READ_ATTEMPTS):
+            days = self._read()
+            # If nothing changed while we read, what we read is consistent.
+            latest = self._stat_signature()
+            if latest == signature or self._lock_depth:
+                break
+            signature = latest
+        else:
+            with self.write_lock():
+                return True
+        self._days = days
+        self._signature = signature
+        self._generation += 1
+        return True
+
+    @contextmanager
+    def write_lock(self):
+        """
+        Holds the cross-process writer lock, reloading first if another
+        process has committed since our last look. Reentrant.
+        """
+        if self._lock_depth:
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+            return
+        with file_lock(self.lock_path):
+            self._lock_depth = 1
+            try:
+                self.refresh()
+                yield
+            finally:
+                self._lock_depth = 0
+
+    def generation(self):
+        """
+        Changes whenever the stored data does. A counter rather than anything
+        derived from the bitmap, whose id() and version can repeat across reloads.
+        """
+        self.refresh()
+        return self._generation
+
+    def _view(self, start_ordinal=None, end_ordinal=None):
+        """
+        The in-memory HabitBitmap, reloaded first if the file changed, holding
+        at least the days in [start_ordinal, end_ordinal] (None: unbounded).
+        """
+        self.refresh()
+        return self._days
+
+    def bitmap(self):
+        """The in-memory HabitBitmap, reloaded first if the file changed."""
+        return self._view()
+
+    def stats_base(self, end_ordinal=None):
+        """
+        HabitStats that bitmap() continues from, for stores that keep part of
+        the history out of memory. None: the bitmap holds all of it.
+        """
+        return None
+
+    def data(self):
+        """Returns a date -> habits dict built from the in-memory history."""
+        return self._view().to_dict()
+
+    def get(self, date_str):
+        ordinal = to_ordinal(date_str)
+        return self._view(ordinal, ordinal).get(date_str)
+
+    def get_many(self, dates):
+        ordinals = [to_ordinal(date) for date in dates]
+        days = self._view(min(ordinals, default=None), max(ordinals, default=None))
+        return {date: days.get(date) for date in dates}
+
+    def count(self, date_str):
+        ordinal = to_ordinal(date_str)
+        return self._view(ordinal, ordinal).count(date_str)
+
+    def contains(self, date_str, habit):
+        ordinal = to_ordinal(date_str)
+        return self._view(ordinal, ordinal).contains(date_str, habit)
+
+    def week_sum(self, week_start):
+        ordinal = to_ordinal(week_start)
+        return self._view(ordinal, ordinal + 6).week_sum(week_start)
+
+    def range_count(self, start, end):
+        """Total completions between two dates (inclusive)."""
+        start_ordinal, end_ordinal = to_ordinal(start), to_ordinal(end)
+        return self._view(start_ordinal, end_ordinal).range_sum(start_ordinal, end_ordinal)
+
+    def daily_counts(self, start, end):
+        start_ordinal, end_ordinal = to_ordinal(start), to_ordinal(end)
+        return self._view(start_ordinal, end_ordinal).daily_counts(start_ordinal, end_ordinal)
+
+    def range_masks(self, start, end):
+        """The stored mask of every day from start to end, 0 for days not logged. Bits follow bitmap().habit_ids."""
+        start_ordinal, end_ordinal = to_ordinal(start), to_ordinal(end)
+        return self._view(start_ordinal, end_ordinal).range_masks(start_ordinal, end_ordinal)
+
+    def completion_rate(self, days, end, habit_count=None):
+        """Share of possible completions achieved in the days up to end."""
+        end_ordinal = to_ordinal(end)
+        bitmap = self._view(end_ordinal - days + 1, end_ordinal)
+        habit_count = habit_count or len(self.habits) or len(bitmap.habit_names)
+        if not habit_count:
+            return 0.0
+        return bitmap.range_sum(end_ordinal - days + 1, end_ordinal) / (days * habit_count)
+
+    def iter_days(self, start=None, end=None):
+        """Yields (date_str, habits) for logged days in [start, end], oldest first."""
+        start_ordinal = None if start is None else to_ordinal(start)
+        end_ordinal = None if end is None else to_ordinal(end)
+        return self._view(start_ordinal, end_ordinal).iter_days(start_ordinal, end_ordinal)
+
+    def set_day(self, date_str, habits):
+        """Records habits for date_str and returns the day's previous mask."""
+        with self.write_lock():
+            old_mask = self._days.set_day(date_str, habits)
+            self._generation += 1
+            self._write_day(date_str, list(habits))
+            if not self._batch_depth:
+                # Holding the lock, the only change since our last look is ours.
+                self._signature = self._stat_signature()
+        return old_mask
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups many set_day calls (an import, a backfill) so the file is
+        written once at the end instead of once per day. Other processes'
+        writes wait until the batch is done. If the batch raises, none of
+        it is written, even if a nested batch's error was caught.
+        """
+        with self.write_lock():
+            self._batch_depth += 1
+            completed = False
+            try:
+                yield self
+                completed = True
+            finally:
+                self._batch_depth -= 1
+                self._batch_failed = self._batch_failed or not completed
+                if not self._batch_depth:
+                    if self._batch_failed:
+                        self._batch_failed = False
+                        self._discard_batch()
+                    else:
+                        self._flush_batch()
+                    self._signature = self._stat_signature()
+
+    def flush(self):
+        """Makes sure habits.json on disk reflects every write so far."""
+
+    def close(self):
+        self.flush()
+        if self._cache_stale and self._signature is not None:
+            # Memory matches the habits.json we last wrote, so the next
+            # start can skip parsing it.
+            self._write_cache(self._days, self._signature)
+            self._cache_stale = False
+
+
+class JournalStore(HabitStore):
+    """
+    HabitStore that appends one JSON line per log to a journal file instead of
+    rewriting the whole history.
+
+    Loading reads the habits.json snapshot and replays the journal on top of
+    it. Once the journal grows past compact_threshold entries it is folded
+    back into the snapshot on a background thread, so habits.json stays the
+    readable source of truth for index.html and sync.py.
+
+    Appends take the same cross-process lock as HabitStore writes. Only the
+    journal rotation does during compaction; writing the snapshot holds a
+    separate lock that just keeps two processes from compacting at once.
+    """
+
+    def __init__(self, path="habits.json", habits=(), compact_threshold=500, fsync=True):
+        base, _ = os.path.splitext(path)
+        self.journal_path = base + ".journal"
+        self.compacting_path = self.journal_path + ".compacting"
+        self.compact_lock_path = self.journal_path + ".compact.lock"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._journal_entries = 0
+        self._compactor = None
+        self._compacting = False
+        self._batch_file = None
+        self._batch_start = 0
+        super().__init__(path, habits)
+
+    def _stat_signature(self):
+        signature = []
+        for path in (self.path, self.compacting_path, self.journal_path):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                signature.append(None)
+            else:
+                signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    def _replay(self, path, days):
+        entries = 0
+        good_bytes = 0
+        try:
+            with open(path, "rb+") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("incomplete journal line")
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-append; the log
+                        # it belonged to was never acknowledged. Holding the
+                        # lock, no one can still be writing it, so cut it off
+                        # and the next append starts on a clean line. Without
+                        # the lock it may be an append in progress: skip it.
+                        if self._lock_depth:
+                            f.truncate(good_bytes)
+                        break
+                    days.set_day(record["date"], record["habits"])
+                    entries += 1
+                    good_bytes += len(line)
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _read(self):
+        days = super()._read()
+        self._replay(self.compacting_path, days)
+        self._journal_entries = self._replay(self.journal_path, days)
+        return days
+
+    def refresh(self):
+        with self._lock:
+            if self._compacting:
+                # The files are mid-rotation by our own compactor and memory
+                # already holds everything in them.
+                return False
+            return super().refresh()
+
+    def _write_day(self, date_str, habits):
+        line = json.dumps({"date": date_str, "habits": habits}) + "\n"
+        if self._batch_depth:
+            # Keep one handle open for the whole batch and sync once at the end.
+            if self._batch_file is None:
+                self._batch_file = open(self.journal_path, "a")
+                self._batch_start = self._batch_file.tell()
+            self._batch_file.write(line)
+        else:
+            with open(self.journal_path, "a") as f:
+                f.write(line)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+        self._journal_entries += 1
+
+    def _flush_batch(self):
+        if self._batch_file is not None:
+            self._batch_file.flush()
+            if self.fsync:
+                os.fsync(self._batch_file.fileno())
+            self._batch_file.close()
+            self._batch_file = None
+        if self._journal_entries >= self.compact_threshold:
+            self.compact_in_background()
+
+    def _discard_batch(self):
+        if self._batch_file is not None:
+            # Holding the writer lock, no other process has appended since
+            # the batch started, so everything past that point is ours.
+            self._batch_file.close()
+            self._batch_file = None
+            os.truncate(self.journal_path, self._batch_start)
+        super()._discard_batch()
+
+    def set_day(self, date_str, habits):
+        with self._lock:
+            old_mask = super().set_day(date_str, habits)
+            needs_compaction = not self._batch_depth and self._journal_entries >= self.compact_threshold
+        if needs_compaction:
+            self.compact_in_background()
+        return old_mask
+
+    @contextmanager
+    def batch(self):
+        with self._lock:
+            with super().batch():
+                yield self
+
+    def compact(self, wait=False):
+        """
+        Folds the journal into the habits.json snapshot. If another process
+        is already compacting, returns at once unless wait is set.
+        """
+        with file_lock(self.compact_lock_path, blocking=wait) as acquired:
+            if not acquired:
+                return
+            with self._lock, self.write_lock():
+                # write_lock reloaded, so memory has every process's appends.
+                if not os.path.exists(self.compacting_path):
+                    if not os.path.exists(self.journal_path):
+                        return
+                    # New logs start a fresh journal while we write the snapshot.
+                    os.replace(self.journal_path, self.compacting_path)
+                snapshot = self._days.copy()
+                self._journal_entries = 0
+                self._compacting = True
+            try:
+                atomic_write_json(self.path, snapshot.to_dict())
+                os.remove(self.compacting_path)
+            finally:
+                with self._lock:
+                    self._compacting = False
+                    # Other processes may have appended meanwhile; leave the
+                    # next refresh to pick that up rather than assume not.
+                    self._signature = None
+
+    def compact_in_background(self):
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return self._compactor
+            self._compactor = threading.Thread(target=self.compact, name="habit-journal-compactor", daemon=True)
+            self._compactor.start()
+            return self._compactor
+
+    def flush(self):
+        """Waits for any running compaction and folds the remaining journal."""
+        if self._compactor is not None:
+            self._compactor.join()
+        self.compact(wait=True)
+
+
+class TieredStore(HabitStore):
+    """
+    HabitStore that keeps only the last hot_weeks weeks in a small JSON file
+    (habits.hot.json) and rolls older days into one compressed segment per
+    year under habits.archive/, so opening the store costs the same however
+    long the history is.
+
+    A segment is the year's raw day masks, little-endian uint64 from its
+    first to its last logged day. habits.archive/index.json lists the
+    segments with their date ranges and the habit IDs their bits refer to,
+    and checkpoints the streak stats at the end of each year. Queries load
+    the segments they overlap on first touch; the stats start from the
+    newest checkpoint and replay only the hot window.
+
+    Rollover moves days that aged out of the hot window into the archive. It
+    runs on open and whenever a write lands before the window (a backfill),
+    under the same lock as writes. Segments are written before the index
+    that points at them, and the index before the hot file loses its days,
+    so a crash part way leaves every day readable in one tier or the other.
+    The first open with no tiered files yet splits an existing habits.json.
+    """
+
+    def __init__(self, path="habits.json", habits=(), hot_weeks=HOT_WEEKS, compression="gzip"):
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression {compression!r}; expected one of {', '.join(COMPRESSORS)}")
+        base, _ = os.path.splitext(path)
+        self.source_path = path
+        self.archive_dir = base + ".archive"
+        self.index_path = os.path.join(self.archive_dir, "index.json")
+        self.hot_weeks = hot_weeks
+        self.compression = compression
+        self._index = {"habits": [], "through": None, "segments": {}}
+        self._loaded = set()
+        self._hot_first = None
+        self._stale_years = set()
+        super().__init__(base + ".hot.json", habits)
+        self.lock_path = path + ".lock"
+        if not os.path.exists(self.path) and not os.path.exists(self.index_path) and os.path.exists(self.source_path):
+            self.migrate()
+        elif self._rollover_due():
+            self.rollover()
+
+    def cut(self):
+        """Ordinal of the hot window's first day: a Monday, and never inside the archive."""
+        today = date.today()
+        monday = today.toordinal() - today.weekday()
+        through = self._index["through"]
+        return max(monday - 7 * (self.hot_weeks - 1), through + 1 if through is not None else 0)
+
+    def _stat_signature(self):
+        signature = []
+        for path in (self.path, self.index_path):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                signature.append(None)
+            else:
+                signature.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    def _read(self):
+        self._index = load_json_file(self.index_path, {"habits": [], "through": None, "segments": {}})
+        self._loaded = set()
+        # Archived masks were encoded with the index's habit IDs, so those come first.
+        days = HabitBitmap.from_dict(load_json_file(self.path, {}), self._index["habits"] + self.habits)
+        self._hot_first = days.first_ordinal
+        return days
+
+    def _read_segment(self, segment):
+        decompress = next(codec[2] for codec in COMPRESSORS.values() if segment["file"].endswith(codec[0]))
+        with open(os.path.join(self.archive_dir, segment["file"]), "rb") as f:
+            masks = array("Q", decompress(f.read()))
+        if sys.byteorder == "big":
+            masks.byteswap()
+        return masks
+
+    def _ensure(self, start_ordinal=None, end_ordinal=None):
+        """Loads the archive segments overlapping [start_ordinal, end_ordinal] that aren't in memory yet."""
+        through = self._index["through"]
+        if through is None or (start_ordinal is not None and start_ordinal > through):
+            return
+        for year, segment in sorted(self._index["segments"].items()):
+            if year in self._loaded:
+                continue
+            if (start_ordinal is not None and segment["last"] < start_ordinal) or \
+                    (end_ordinal is not None and segment["first"] > end_ordinal):
+                continue
+            try:
+                masks = self._read_segment(segment)
+            except FileNotFoundError:
+                # A writer replaced the segment after we read the index;
+                # reload and take the new one.
+                self._signature = None
+                self.refresh()
+                return self._ensure(start_ordinal, end_ordinal)
+            # Days already in memory were logged since the segment was written.
+            self._days.merge_masks(segment["first"], masks)
+            self._loaded.add(year)
+
+    def _view(self, start_ordinal=None, end_ordinal=None):
+        self.refresh()
+        self._ensure(start_ordinal, end_ordinal)
+        return self._days
+
+    def bitmap(self):
+        """
+        The hot window plus whichever segments queries have loaded so far.
+        stats_base() stands in for the rest of the history.
+        """
+        self.refresh()
+        return self._days
+
+    def stats_base(self, end_ordinal=None):
+        """
+        HabitStats as of the newest year checkpoint before end_ordinal
+        (default: the whole archive), with every day after it loaded.
+        """
+        while True:
+            self.refresh()
+            generation = self._generation
+            checkpoint = None
+            after = None
+            for year, segment in sorted(self._index["segments"].items()):
+                if end_ordinal is None or segment["last"] < end_ordinal:
+                    checkpoint, after = segment["checkpoint"], segment["last"] + 1
+            self._ensure(after, end_ordinal)
+            # If loading the segments had to reload the index, the checkpoint may be stale.
+            if self._generation == generation:
+                return None if checkpoint is None else HabitStats.from_checkpoint(checkpoint)
+
+    def _write_hot(self):
+        hot = dict(self._days.iter_days(self.cut()))
+        atomic_write_json(self.path, hot)
+        self._hot_first = to_ordinal(next(iter(hot))) if hot else None
+
+    def _write_day(self, date_str, habits):
+        ordinal = to_ordinal(date_str)
+        if ordinal < self.cut():
+            self._stale_years.add(date.fromordinal(ordinal).year)
+        if self._batch_depth:
+            self._dirty = True
+        elif self._rollover_due():
+            self.rollover()
+        else:
+            self._write_hot()
+
+    def _flush_batch(self):
+        if self._rollover_due():
+            self.rollover()
+        elif self._dirty:
+            self._write_hot()
+        self._dirty = False
+
+    def _discard_batch(self):
+        self._stale_years.clear()
+        super()._discard_batch()
+
+    def set_day(self, date_str, habits):
+        ordinal = to_ordinal(date_str)
+        with self.write_lock():
+            # Load the day's segment first so the previous mask is right
+            # and the rest of its year is there for the rollover.
+            self._ensure(ordinal, ordinal)
+            return super().set_day(date_str, habits)
+
+    def _rollover_due(self):
+        return bool(self._stale_years) or (self._hot_first is not None and self._hot_first < self.cut())
+
+    def rollover(self):
+        """Moves every day before the hot window into the archive."""
+        with self.write_lock():
+            cut = self.cut()
+            years = set(self._stale_years)
+            if self._hot_first is not None and self._hot_first < cut:
+                years.update(range(date.fromordinal(self._hot_first).year, date.fromordinal(cut - 1).year + 1))
+            if not years:
+                return
+            self._archive(min(years), cut)
+            self._write_hot()
+            self._stale_years.clear()
+            self._signature = self._stat_signature()
+
+    def _archive(self, first_year, cut):
+        # Each checkpoint builds on the year before, so every year from the
+        # earliest changed one is redone, and needs its days in memory.
+        self._ensure(date(first_year, 1, 1).toordinal(), cut - 1)
+        suffix, compress, _ = COMPRESSORS[self.compression]
+        os.makedirs(self.archive_dir, exist_ok=True)
+        segments = {year: segment for year, segment in self._index["segments"].items() if int(year) < first_year}
+        base = None
+        if segments:
+            base = HabitStats.from_checkpoint(segments[max(segments)]["checkpoint"])
+        last_year = date.fromordinal(cut - 1).year
+        for year in range(first_year, last_year + 1):
+            start = date(year, 1, 1).toordinal()
+            masks = self._days.range_masks(start, min(date(year, 12, 31).toordinal(), cut - 1))
+            logged = [i for i, mask in enumerate(masks) if mask]
+            if not logged:
+                continue
+            masks = array("Q", masks[logged[0]:logged[-1] + 1])
+            if sys.byteorder == "big":
+                masks.byteswap()
+            first, last = start + logged[0], start + logged[-1]
+            # Named by first day too: a reader holding an older index must
+            # never merge this file at that index's (later) first day. Same
+            # name, same first day, and the file only ever gains days.
+            name = f"{year}-{first}.bin{suffix}"
+            atomic_write_bytes(os.path.join(self.archive_dir, name), compress(masks.tobytes()))
+            if sys.byteorder == "big":
+                masks.byteswap()
+            base = HabitStats.build(self._days, last, base)
+            segments[str(year)] = {
+                "file": name,
+                "first": first,
+                "last": last,
+                "days": sum(1 for mask in masks if mask & LOGGED_BIT),
+                "completions": sum((mask & HABIT_MASK).bit_count() for mask in masks),
+                "checkpoint": base.checkpoint(),
+            }
+            self._loaded.add(str(year))
+        stale = {segment["file"] for segment in self._index["segments"].values()} - \
+            {segment["file"] for segment in segments.values()}
+        self._index = {"habits": list(self._days.habit_names), "through": cut - 1, "segments": segments}
+        atomic_write_json(self.index_path, self._index)
+        for name in stale:
+            try:
+                os.remove(os.path.join(self.archive_dir, name))
+            except FileNotFoundError:
+                pass
+
+    def migrate(self):
+        """Splits habits.json into the hot file and the archive, streaming it a day at a time."""
+        with self.write_lock():
+            with open(self.source_path, "r") as f:
+                for date_str, names in iter_json_object(f):
+                    self._days.set_day(date_str, names)
+            self._hot_first = self._days.first_ordinal
+            self.rollover()
+            if not os.path.exists(self.path):
+                self._write_hot()
+        # Reload, so memory drops back to just the hot window.
+        self._signature = None
+        self.refresh()
+
+
+STORAGE_BACKENDS = {
+    "json": HabitStore,
+    "journal": JournalStore,
+    "sqlite": SqliteStore,
+    "tiered": TieredStore,
+}
+
+
+def open_store(path="habits.json", backend=None, habits=()):
+    """
+    Opens the habit store using the named backend, falling back to the
+    HABIT_TRACKER_STORAGE environment variable and then plain JSON.
+    """
+    backend = backend or os.environ.get(STORAGE_ENV_VAR, "json")
+    try:
+        store_class = STORAGE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown storage backend {backend!r}; expected one of {', '.join(STORAGE_BACKENDS)}")
+    return store_class(path, habits)
@@ -0,0 +1,181 @@
+"""
+A GitHub-style year heatmap: one column per week, one row per weekday,
+shaded by the share of habits done that day.
+
+The whole year is rasterized in one numpy pass into a single PhotoImage
+rather than drawn as hundreds of canvas items. Hovering maps the pixel back
+to its day arithmetically, and a log that only changes today's count
+repaints just that cell.
+"""
+import tkinter as tk
+from datetime import timedelta
+from tkinter import ttk
+
+import numpy as np
+
+BACKGROUND = "#ffffff"
+# No data, then increasing shares of the day's habits done.
+PALETTE = ["#ebedf0", "#9be9a8", "#40c463", "#30a14e", "#216e39"]
+FUTURE = -1
+# Beyond this many changed cells a full re-rasterize is cheaper than put()s.
+INCREMENTAL_LIMIT = 8
+
+
+def hex_to_rgb(color):
+    return [int(color[i:i + 2], 16) for i in (1, 3, 5)]
+
+
+class HeatmapRaster:
+    """
+    The heatmap's pixels and geometry, without Tk. Cell i is day
+    start + i, laid out column-major: seven days to a column.
+    """
+
+    def __init__(self, weeks=53, cell=11, gap=2):
+        self.weeks = weeks
+        self.cell = cell
+        self.gap = gap
+        self.pitch = cell + gap
+        self.width = weeks * self.pitch + gap
+        self.height = 7 * self.pitch + gap
+        # Slot 0 is the background (gaps and days after today), so cell
+        # levels index from 1.
+        self.colors = np.array([hex_to_rgb(BACKGROUND)] + [hex_to_rgb(color) for color in PALETTE], dtype=np.uint8)
+        self.cell_map = self._build_cell_map()
+
+    def _build_cell_map(self):
+        # Each pixel's cell index, or -1 for the gaps between cells.
+        x = np.arange(self.width) - self.gap
+        y = np.arange(self.height) - self.gap
+        col = np.where((x >= 0) & (x % self.pitch < self.cell), x // self.pitch, -1)
+        row = np.where((y >= 0) & (y % self.pitch < self.cell), y // self.pitch, -1)
+        cell_map = col[np.newaxis, :] * 7 + row[:, np.newaxis]
+        cell_map[(row[:, np.newaxis] < 0) | (col[np.newaxis, :] < 0)] = -1
+        return cell_map
+
+    def grid_start(self, today):
+        """The Monday the grid starts on, so that today's week is the last column."""
+        return today - timedelta(days=today.weekday() + 7 * (self.weeks - 1))
+
+    def levels(self, counts, habit_count):
+        """Palette level per cell (0 none, 1-4 quartiles of habit_count), FUTURE after today."""
+        counts = np.asarray(counts, dtype=np.int64)
+        levels = np.full(self.weeks * 7, FUTURE, dtype=np.int64)
+        shares = np.ceil(counts * 4 / max(habit_count, 1))
+        levels[:len(counts)] = np.clip(shares, 0, 4)
+        return levels
+
+    def render(self, levels):
+        """RGB pixels, (height, width, 3) uint8."""
+        # Background is colour 0; level L is colour L + 1; FUTURE maps to 0.
+        cell_colors = np.append(np.asarray(levels) + 1, 0)
+        return self.colors[cell_colors[self.cell_map]]
+
+    def ppm(self, levels):
+        pixels = self.render(levels)
+        return f"P6 {self.width} {self.height} 255\n".encode("ascii") + pixels.tobytes()
+
+    def cell_box(self, index):
+        col, row = divmod(index, 7)
+        x = self.gap + col * self.pitch
+        y = self.gap + row * self.pitch
+        return x, y, x + self.cell, y + self.cell
+
+    def index_at(self, x, y):
+        """The cell under pixel (x, y), or None over a gap or outside the grid."""
+        col, cell_x = divmod(int(x) - self.gap, self.pitch)
+        row, cell_y = divmod(int(y) - self.gap, self.pitch)
+        if not (0 <= col < self.weeks and 0 <= row < 7) or cell_x >= self.cell or cell_y >= self.cell:
+            return None
+        return col * 7 + row
+
+    def color(self, level):
+        return BACKGROUND if level == FUTURE else PALETTE[level]
+
+
+class HeatmapView:
+    """
+    The year heatmap as one canvas image item plus month labels, with a
+    hover tooltip. show() re-rasterizes only when more than a few cells
+    changed; otherwise the changed cells are painted into the existing
+    PhotoImage.
+    """
+
+    def __init__(self, master, raster=None):
+        self.raster = raster or HeatmapRaster()
+        self.frame = ttk.Frame(master, style="Main.TFrame")
+        self.month_height = 16
+        self.canvas = tk.Canvas(self.frame, width=self.raster.width, height=self.raster.height + self.month_height,
+                                highlightthickness=0, bg=BACKGROUND)
+        self.canvas.pack(expand=True)
+        self.image = None
+        self.image_id = self.canvas.create_image(0, self.month_height, anchor="nw")
+        self.month_ids = []
+        self.tooltip = ttk.Label(self.frame, text="", background="white", relief="solid", borderwidth=1, font=("Helvetica", 10))
+        self.canvas.bind("<Motion>", self._on_hover)
+        self.canvas.bind("<Leave>", lambda event: self._hide_tooltip())
+
+        self.start = None
+        self.levels = None
+        self.details = None
+        self._hover_index = None
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def pack_forget(self):
+        self.frame.pack_forget()
+        self._hide_tooltip()
+
+    def show(self, start, counts, habit_count, details=None):
+        """
+        Shows counts (one per day from start, up to today) on the grid
+        starting at start. details maps a date to its tooltip lines.
+        """
+        self.details = details
+        levels = self.raster.levels(counts, habit_count)
+        if self.image is not None and start == self.start:
+            changed = np.flatnonzero(levels != self.levels)
+            if len(changed) <= INCREMENTAL_LIMIT:
+                for index in changed:
+                    x1, y1, x2, y2 = self.raster.cell_box(int(index))
+                    self.image.put(self.raster.color(int(levels[index])), to=(x1, y1, x2, y2))
+                self.levels = levels
+                return
+        self.image = tk.PhotoImage(data=self.raster.ppm(levels), format="PPM")
+        self.canvas.itemconfig(self.image_id, image=self.image)
+        if start != self.start:
+            self._label_months(start)
+        self.start = start
+        self.levels = levels
+
+    def _label_months(self, start):
+        for item in self.month_ids:
+            self.canvas.delete(item)
+        self.month_ids = []
+        for col in range(self.raster.weeks):
+            sunday = start + timedelta(days=7 * col + 6)
+            # Label the column that holds each month's first day.
+            if sunday.day <= 7:
+                x = self.raster.gap + col * self.raster.pitch
+                self.month_ids.append(self.canvas.create_text(x, self.month_height / 2, text=sunday.strftime("%b"),
+                                                              anchor="w", font=("Helvetica", 9)))
+
+    def _hide_tooltip(self):
+        self._hover_index = None
+        self.tooltip.place_forget()
+
+    def _on_hover(self, event):
+        index = self.raster.index_at(event.x, event.y - self.month_height)
+        if index is None or self.levels is None or self.levels[index] == FUTURE:
+            self._hide_tooltip()
+            return
+        if index == self._hover_index:
+            return
+        self._hover_index = index
+        day = self.start + timedelta(days=index)
+        lines = [day.strftime("%a %d %b %Y")]
+        if self.details is not None:
+            lines += self.details(day)
+        self.tooltip.config(text="\n".join(lines))
+        self.tooltip.place(x=self.canvas.winfo_x() + event.x + 12, y=self.canvas.winfo_y() + event.y + 12)
@@ -1,25 +1,79 @@
 
 import tkinter as tk
-from tkinter import ttk
-from ttkthemes import ThemedTk
-import json
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import math
+from datetime import date
+from tkinter import ttk, messagebox, simpledialog
+from canvas_widgets import Debouncer, HabitWheel, ProgressPuzzle
+from habit_core import DEFAULT_HABITS
+from periods import VIEW_AXIS_LABELS, VIEW_TITLES, VIEWS
+import profiles
+import profiling
+import startup
+import sync
+
+STATS_HABIT_LINES = 8
+HEATMAP_VIEW = "Heatmap"
+CORRELATION_VIEW = "Correlation"
+NEW_PROFILE_OPTION = "New profile..."
 
 class HabitTracker:
-    def __init__(self, root):
+    def __init__(self, root, profile=profiles.DEFAULT_PROFILE):
         self.root = root
         self.root.title("Habit Tracker")
         self.root.configure(bg="#f0f0f0")
 
-        self.habits = ["Calculus", "Chemistry", "Reading", "Projects", "Exercise"]
+        self.habits = list(DEFAULT_HABITS)
         self.habit_states = [False] * len(self.habits)
-
+        # Every profile tracks the same habits here; only the data differs.
+        self.profile = profile
+        self.profiles = profiles.ProfileCache(lambda name: self.habits)
+        self.habit_log = self.profiles.get(profile)
+        # Sync commits the default profile's habits.json whichever profile is showing,
+        # so that is the store it flushes and the writer lock it holds while staging.
+        default_data = profiles.profile_paths(profiles.DEFAULT_PROFILE).data
+        self.sync_worker = sync.worker_from_env(prepare=lambda: self.profiles.flush(profiles.DEFAULT_PROFILE),
+                                                lock_path=default_data + ".lock")
+        self.profiler = profiling.attach(self)
+
+        self.chart = None
+        self.heatmap = None
+        self.matrix_view = None
         self.create_widgets()
         self.load_daily_habits_state()
         self.update_background()
+        startup.after_first_paint(self.root, self.finish_startup)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def configure_styles(self):
+        # ttk styles belong to the active theme, so this runs again once the
+        # theme is applied after first paint.
+        self.root.style = ttk.Style()
+        self.root.style.configure("Main.TFrame", background="#f0f0f0")
+        self.root.style.configure("TButton", padding=10, font=("Helvetica", 12))
+        self.root.style.configure("Header.TLabel", background="#f0f0f0", font=("Helvetica", 18, "bold"))
+        self.root.style.configure("Puzzle.TLabel", background="#f0f0f0", font=("Helvetica", 14, "bold"))
+        self.root.style.configure("View.TRadiobutton", background="#f0f0f0", font=("Helvetica", 11))
+        self.root.style.configure("Rates.TLabel", background="#f0f0f0", font=("Helvetica", 11))
+
+    def finish_startup(self):
+        startup.mark("first_window")
+        startup.apply_theme(self.root, "arc")
+        self.configure_styles()
+        self.update_background()
+        self.root.after(0, self.load_chart)
+
+    def load_chart(self):
+        # matplotlib is the bulk of import time, so the graph panel is
+        # filled in only after the wheel and log button are on screen.
+        from chart import HabitChart
+
+        self.graph_loading_label.destroy()
+        self.chart = HabitChart(self.graph_frame, show_tooltips=True)
+        if self.profiler is not None:
+            self.profiler.instrument_chart(self.chart)
+        self.update_graph()
+        self.root.update_idletasks()
+        startup.mark("interactive")
+        startup.finish_probe(self.root)
 
     def create_widgets(self):
         left_frame = ttk.Frame(self.root, style="Main.TFrame")
@@ -28,29 +82,51 @@ class HabitTracker:
         content_frame = ttk.Frame(left_frame, style="Main.TFrame")
         content_frame.pack(expand=True)
 
-        self.root.style = ttk.Style()
-        self.root.style.configure("Main.TFrame", background="#f0f0f0")
-        self.root.style.configure("TButton", padding=10, font=("Helvetica", 12))
-        self.root.style.configure("Header.TLabel", background="#f0f0f0", font=("Helvetica", 18, "bold"))
-        self.root.style.configure("Puzzle.TLabel", background="#f0f0f0", font=("Helvetica", 14, "bold"))
+        self.configure_styles()
+
+        self.profile_var = tk.StringVar(value=self.profile)
+        self.profile_menu = ttk.Combobox(content_frame, textvariable=self.profile_var, state="readonly", width=24)
+        self.profile_menu.bind("<<ComboboxSelected>>", self.on_profile_selected)
+        self.refresh_profile_menu()
+        self.profile_menu.pack(pady=(0, 10))
 
         header_label = ttk.Label(content_frame, text="Track Your Habits", style="Header.TLabel")
         header_label.pack(pady=(0, 20))
 
         self.canvas = tk.Canvas(content_frame, bg="#f0f0f0", highlightthickness=0)
         self.canvas.pack(expand=True, fill='both', pady=20)
+        self.wheel = HabitWheel(self.canvas, self.habits)
         self.draw_pentagon()
         self.canvas.bind("<Button-1>", self.on_canvas_click)
-        self.canvas.bind("<Configure>", self.draw_pentagon)
+        self.canvas.bind("<Configure>", Debouncer(self.canvas, self.draw_pentagon))
 
         log_button = ttk.Button(content_frame, text="Log Habits", command=self.log_habits)
         log_button.pack(pady=20)
 
+        self.stats_label = ttk.Label(content_frame, text="", style="Rates.TLabel", justify="left")
+        self.stats_label.pack(pady=(0, 10))
+        self.update_stats()
+
+        self.sync_label = ttk.Label(content_frame, text="", style="Rates.TLabel")
+        if self.sync_worker is not None:
+            self.sync_label.pack()
+            self.poll_sync_status()
+
         right_frame = ttk.Frame(self.root, style="Main.TFrame")
         right_frame.pack(side="right", expand=True, fill="both", padx=(20, 40), pady=40)
 
+        self.graph_view = tk.StringVar(value="Week")
+        view_frame = ttk.Frame(right_frame, style="Main.TFrame")
+        view_frame.pack(side="top", fill="x", pady=(0, 10))
+        for view in VIEWS + (HEATMAP_VIEW, CORRELATION_VIEW):
+            ttk.Radiobutton(view_frame, text=view, value=view, variable=self.graph_view, style="View.TRadiobutton", command=self.update_graph).pack(side="left", padx=(0, 10))
+        self.rates_label = ttk.Label(view_frame, text="", style="Rates.TLabel")
+        self.rates_label.pack(side="right")
+
         self.graph_frame = ttk.Frame(right_frame, style="Main.TFrame")
         self.graph_frame.pack(side="top", expand=True, fill="both", pady=(0, 20))
+        self.graph_loading_label = ttk.Label(self.graph_frame, text="Loading graph...", style="Rates.TLabel")
+        self.graph_loading_label.pack(expand=True)
         
         self.puzzle_frame = ttk.Frame(right_frame, style="Main.TFrame")
         self.puzzle_frame.pack(side="bottom", expand=True, fill="both")
@@ -60,40 +136,18 @@ class HabitTracker:
 
         self.puzzle_canvas = tk.Canvas(self.puzzle_frame, bg="#f0f0f0", highlightthickness=0)
         self.puzzle_canvas.pack(expand=True, fill='both', pady=10)
-        self.puzzle_canvas.bind("<Configure>", self.update_puzzle)
+        self.puzzle = ProgressPuzzle(self.puzzle_canvas, habit_count=len(self.habits))
+        self.puzzle_canvas.bind("<Configure>", Debouncer(self.puzzle_canvas, self.update_puzzle))
 
         self.update_graph()
         self.update_puzzle()
 
     def draw_pentagon(self, event=None):
-        self.canvas.delete("all")
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-        center_x, center_y = width / 2, height / 2
-        radius = min(width, height) * 0.35
-        self.triangle_ids = []
-        for i in range(5):
-            angle = (math.pi / 2.5) * i - math.pi / 2
-            x1 = center_x + radius * math.cos(angle)
-            y1 = center_y + radius * math.sin(angle)
-            
-            angle2 = (math.pi / 2.5) * (i + 1) - math.pi / 2
-            x2 = center_x + radius * math.cos(angle2)
-            y2 = center_y + radius * math.sin(angle2)
-            
-            color = "#4caf50" if self.habit_states[i] else "#cccccc"
-            triangle = self.canvas.create_polygon(center_x, center_y, x1, y1, x2, y2, fill=color, outline="white", width=2)
-            self.triangle_ids.append(triangle)
-
-            label_angle = (angle + angle2) / 2
-            label_x = center_x + (radius + 25) * math.cos(label_angle)
-            label_y = center_y + (radius + 25) * math.sin(label_angle)
-            self.canvas.create_text(label_x, label_y, text=self.habits[i], font=("Helvetica", 10, "bold"))
+        self.wheel.render(self.habit_states)
 
     def on_canvas_click(self, event):
-        item = self.canvas.find_closest(event.x, event.y)[0]
-        if item in self.triangle_ids:
-            index = self.triangle_ids.index(item)
+        index = self.wheel.index_at(event.x, event.y)
+        if index is not None:
             self.habit_states[index] = not self.habit_states[index]
             self.draw_pentagon()
             self.update_background()
@@ -110,165 +164,176 @@ class HabitTracker:
         self.root.style.configure("Main.TFrame", background=color)
         self.root.style.configure("Header.TLabel", background=color)
         self.root.style.configure("Puzzle.TLabel", background=color)
+        self.root.style.configure("View.TRadiobutton", background=color)
+        self.root.style.configure("Rates.TLabel", background=color)
 
     def log_habits(self):
-        data = self.load_data()
-        today_str = datetime.now().strftime("%Y-%m-%d")
-        
-        completed_today = [self.habits[i] for i, state in enumerate(self.habit_states) if state]
-        
-        data[today_str] = completed_today
-        self.save_data(data)
+        self.habit_log.log_states(self.habit_states)
+        if self.sync_worker is not None:
+            self.sync_worker.request()
         
         self.habit_states = [False] * len(self.habits)
         self.draw_pentagon()
         self.update_graph()
+        self.update_stats()
         self.update_puzzle()
         self.update_background()
 
     def load_daily_habits_state(self):
-        data = self.load_data()
-        today_str = datetime.now().strftime("%Y-%m-%d")
-        if today_str in data:
-            completed_today = data[today_str]
-            for i, habit in enumerate(self.habits):
-                if habit in completed_today:
-                    self.habit_states[i] = True
+        self.habit_states = self.habit_log.states_on()
         self.draw_pentagon()
 
-    def load_data(self):
-        try:
-            with open("habits.json", "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-
-    def save_data(self, data):
-        with open("habits.json", "w") as f:
-            json.dump(data, f, indent=4)
-
     def update_graph(self):
-        for widget in self.graph_frame.winfo_children():
-            widget.destroy()
+        self.update_rolling_rates()
+        view = self.graph_view.get()
+        if view == HEATMAP_VIEW:
+            self.show_heatmap()
+            return
+        if view == CORRELATION_VIEW:
+            self.show_correlation()
+            return
+        for panel in (self.heatmap, self.matrix_view):
+            if panel is not None:
+                panel.pack_forget()
+        if self.chart is None:
+            return
 
-        data = self.load_data()
-        today = datetime.now()
-        start_of_week = today - timedelta(days=today.weekday())
-        week_dates = [(start_of_week + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
-        
-        habits_completed_data = {date: data.get(date, []) for date in week_dates}
-        habits_completed_counts = [len(habits) for habits in habits_completed_data.values()]
+        buckets, habits_completed = self.habit_log.period_counts(view)
+        labels = [label for label, start, end in buckets]
 
-        if not any(habits_completed_counts):
-            no_data_label = ttk.Label(self.graph_frame, text="No habit data for this week.", style="Header.TLabel")
-            no_data_label.pack(expand=True)
+        if not any(habits_completed):
+            self.chart.show_empty(f"No habit data for this {view.lower()}.")
             return
 
-        fig, ax = plt.subplots(figsize=(5, 3), facecolor="#f0f0f0")
-        points = ax.plot(week_dates, habits_completed_counts, marker='o', linestyle='-', color='#4caf50', markerfacecolor='#4caf50', markersize=8, picker=5)[0]
-        ax.set_xlabel("Date", color="#333333")
-        ax.set_ylabel("Habits Completed", color="#333333")
-        ax.set_title("Weekly Habit Progress", color="#333333")
-        ax.set_yticks(range(6))
-        ax.set_ylim(0, 5)
-        ax.grid(True, which='both', linestyle='--', linewidth=0.5)
-        ax.set_facecolor("#ffffff")
-        plt.xticks(rotation=45, ha="right", color="#333333")
-        plt.yticks(color="#333333")
-        plt.tight_layout()
-
-        canvas = FigureCanvasTkAgg(fig, master=self.graph_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(expand=True, fill="both")
-
-        tooltip = ttk.Label(self.graph_frame, text="", background="white", relief="solid", borderwidth=1, font=("Helvetica", 10))
-        tooltip.place_forget()
-
-        def on_hover(event):
-            if event.inaxes == ax:
-                cont, ind = points.contains(event)
-                if cont:
-                    idx = ind['ind'][0]
-                    date = week_dates[idx]
-                    habits_list = habits_completed_data[date]
-                    if habits_list:
-                        tooltip_text = "\n".join(habits_list)
-                        tooltip.config(text=tooltip_text)
-                        tooltip.place(x=event.x, y=event.y)
-                    else:
-                        tooltip.place_forget()
-                else:
-                    tooltip.place_forget()
-            else:
-                tooltip.place_forget()
-
-        fig.canvas.mpl_connect("motion_notify_event", on_hover)
-        plt.close(fig)
-
-    def _create_rounded_rectangle(self, canvas, x1, y1, x2, y2, radius=25, **kwargs):
-        """Draws a rounded rectangle on a canvas."""
-        points = [x1 + radius, y1,
-                  x1 + radius, y1,
-                  x2 - radius, y1,
-                  x2 - radius, y1,
-                  x2, y1,
-                  x2, y1 + radius,
-                  x2, y1 + radius,
-                  x2, y2 - radius,
-                  x2, y2 - radius,
-                  x2, y2,
-                  x2 - radius, y2,
-                  x2 - radius, y2,
-                  x1 + radius, y2,
-                  x1 + radius, y2,
-                  x1, y2,
-                  x1, y2 - radius,
-                  x1, y2 - radius,
-                  x1, y1 + radius,
-                  x1, y1 + radius,
-                  x1, y1]
-        return canvas.create_polygon(points, **kwargs, smooth=True)
-
-    def update_puzzle(self, event=None):
-        self.puzzle_canvas.delete("all")
+        y_max = self.habit_log.period_capacity(buckets)
+        details = lambda idx: self.habit_log.bucket_details(buckets[idx], habits_completed[idx])
+        self.chart.show(labels, habits_completed, f"{VIEW_TITLES[view]} Habit Progress", VIEW_AXIS_LABELS[view], y_max, details=details)
+
+    def show_heatmap(self):
+        # Needs numpy but not matplotlib, so it can show before the graph loads.
+        from heatmap import HeatmapView
+
+        if self.heatmap is None:
+            self.heatmap = HeatmapView(self.graph_frame)
+        self.show_panel(self.heatmap)
+        today = date.today()
+        start = self.heatmap.raster.grid_start(today)
+        self.heatmap.show(start, self.habit_log.daily_counts(start, today), len(self.habits), details=self.habit_log.completed_on)
+
+    def show_correlation(self):
+        from analytics import HabitMatrix
+        from matrix_view import MatrixView
+
+        if self.matrix_view is None:
+            self.matrix_view = MatrixView(self.graph_frame)
+        self.show_panel(self.matrix_view)
+        self.matrix_view.show(HabitMatrix.load(self.habit_log))
+
+    def show_panel(self, panel):
+        """Puts the heatmap or the correlation matrix in the graph panel in place of the graph."""
+        for other in (self.heatmap, self.matrix_view):
+            if other is not None and other is not panel:
+                other.pack_forget()
+        if self.chart is not None:
+            self.chart.hide()
+        else:
+            self.graph_loading_label.pack_forget()
+        panel.pack(expand=True, fill="both")
+
+    def update_rolling_rates(self):
+        rates = [f"{days}d {rate:.0%}" for days, rate in self.habit_log.rolling_rates()]
+        self.rates_label.config(text="   ".join(rates))
+
+    def update_stats(self):
+        summary = self.habit_log.summary()
+        overall = summary["any"]
+        lines = [f"Streak: {overall['current_streak']} days (best {overall['longest_streak']})"]
+        habits = list(summary["habits"].items())
+        if len(habits) > STATS_HABIT_LINES:
+            # Only the running streaks fit when there are many habits.
+            habits.sort(key=lambda item: item[1]["current_streak"], reverse=True)
+        for habit, stats in habits[:STATS_HABIT_LINES]:
+            lines.append(f"{habit}: {stats['current_streak']} days (best {stats['longest_streak']}), {stats['week_rate']:.0%} this week")
+        if len(habits) > STATS_HABIT_LINES:
+            lines.append(f"...and {len(habits) - STATS_HABIT_LINES} more")
+        self.stats_label.config(text="\n".join(lines))
+
+    def poll_sync_status(self):
+        # The sync worker reports from its own thread; only the mainloop
+        # touches the label.
+        message = None
+        while not self.sync_worker.status.empty():
+            state, message = self.sync_worker.status.get_nowait()
+        if message is not None:
+            self.sync_label.config(text=message)
+        self.root.after(500, self.poll_sync_status)
+
+    def on_close(self):
+        if self.sync_worker is not None:
+            self.sync_label.config(text="Syncing before exit...")
+            self.root.update_idletasks()
+            self.sync_worker.stop(timeout=10)
+        if self.chart is not None:
+            self.chart.close()
+        self.profiles.close()
+        self.root.destroy()
+
+    def refresh_profile_menu(self):
+        self.profile_menu["values"] = profiles.list_profiles() + [NEW_PROFILE_OPTION]
+
+    def on_profile_selected(self, event=None):
+        name = self.profile_var.get()
+        if name == NEW_PROFILE_OPTION:
+            self.profile_var.set(self.profile)
+            self.new_profile()
+        else:
+            self.switch_profile(name)
+
+    def new_profile(self):
+        name = simpledialog.askstring("New Profile", "Profile name:", parent=self.root)
+        if not name or not name.strip():
+            return
+        name = name.strip()
+        if name in profiles.list_profiles():
+            self.switch_profile(name)
+            return
+        try:
+            profiles.create_profile(name)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.refresh_profile_menu()
+        self.switch_profile(name)
 
-        data = self.load_data()
-        today = datetime.now()
-        start_of_week = today - timedelta(days=today.weekday())
-        week_dates = [(start_of_week + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
-        
-        total_habits_this_week = sum(len(data.get(date, [])) for date in week_dates)
+    def switch_profile(self, name):
+        """Shows another profile's habits and history; recently used ones are still open."""
+        if name == self.profile:
+            return
+        self.habit_log = self.profiles.get(name)
+        if self.profiler is not None:
+            self.profiler.instrument_store(self.habit_log.store)
+        self.profile = name
+        self.profile_var.set(name)
+        profiles.save_last_profile(name)
+        if self.habit_log.habits != self.habits:
+            self.habits = self.habit_log.habits
+            self.canvas.delete("all")
+            self.wheel = HabitWheel(self.canvas, self.habits)
+            self.puzzle_canvas.delete("all")
+            self.puzzle = ProgressPuzzle(self.puzzle_canvas, habit_count=len(self.habits))
+        self.load_daily_habits_state()
+        self.update_graph()
+        self.update_stats()
+        self.update_puzzle()
+        self.update_background()
 
-        canvas_width = self.puzzle_canvas.winfo_width()
-        canvas_height = self.puzzle_canvas.winfo_height()
-        
-        rows, cols = 5, 7
-        gap = 5
-        corner_radius = 8
-
-        cell_width = (canvas_width - (cols + 1) * gap) / cols
-        cell_height = (canvas_height - (rows + 1) * gap) / rows
-
-        # Draw all squares as gray initially
-        for r in range(rows):
-            for c in range(cols):
-                x1 = gap + c * (cell_width + gap)
-                y1 = gap + r * (cell_height + gap)
-                x2 = x1 + cell_width
-                y2 = y1 + cell_height
-                self._create_rounded_rectangle(self.puzzle_canvas, x1, y1, x2, y2, radius=corner_radius, fill="#e0e0e0", outline="")
-
-        # Draw green squares based on total_habits_this_week
-        for i in range(min(total_habits_this_week, rows * cols)):
-            row = i // cols
-            col = i % cols
-            x1 = gap + col * (cell_width + gap)
-            y1 = gap + row * (cell_height + gap)
-            x2 = x1 + cell_width
-            y2 = y1 + cell_height
-            self._create_rounded_rectangle(self.puzzle_canvas, x1, y1, x2, y2, radius=corner_radius, fill="#4caf50", outline="")
+    def update_puzzle(self, event=None):
+        self.puzzle.render(self.habit_log.week_total())
 
 if __name__ == "__main__":
-    root = ThemedTk(theme="arc")
-    app = HabitTracker(root)
+    profiling.enable_from_args()
+    root = tk.Tk()
+    profile = profiles.profile_from_args()
+    profiles.create_profile(profile)
+    app = HabitTracker(root, profile)
     root.mainloop()
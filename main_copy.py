@@ -1,57 +1,87 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from ttkthemes import ThemedTk
-import json
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import math
-import os
-
-HABITS_CONFIG_FILE = "user_habits.json"
-
-def load_habits_config():
-    if not os.path.exists(HABITS_CONFIG_FILE):
-        return None
-    try:
-        with open(HABITS_CONFIG_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return None
-
-def save_habits_config(habits):
-    with open(HABITS_CONFIG_FILE, "w") as f:
-        json.dump(habits, f, indent=4)
+from datetime import date
+from tkinter import ttk, messagebox, simpledialog
+from canvas_widgets import Debouncer, HabitWheel, ProgressPuzzle
+from habit_bitmap import HABIT_BITS
+from habit_core import DEFAULT_HABITS, HABITS_CONFIG_FILE, load_habits_config, save_habits_config
+from periods import VIEW_AXIS_LABELS, VIEW_TITLES, VIEWS
+import profiles
+import profiling
+import startup
+import sync
+
+STATS_HABIT_LINES = 8
+HEATMAP_VIEW = "Heatmap"
+CORRELATION_VIEW = "Correlation"
+NEW_PROFILE_OPTION = "New profile..."
 
 class SetupWindow:
-    def __init__(self, root, on_complete):
+    def __init__(self, root, on_complete, initial_rows=5, config_path=HABITS_CONFIG_FILE):
         self.root = root
         self.on_complete = on_complete
+        self.config_path = config_path
         self.root.title("Setup Your Habits")
-        self.root.geometry("400x400")
+        self.root.geometry("400x500")
 
         self.frame = ttk.Frame(self.root, padding="20")
         self.frame.pack(expand=True, fill="both")
 
-        ttk.Label(self.frame, text="Please enter your 5 daily habits:", font=("Helvetica", 14, "bold")).pack(pady=(0, 20))
+        ttk.Label(self.frame, text="Please enter your daily habits:", font=("Helvetica", 14, "bold")).pack(pady=(0, 10))
+        ttk.Label(self.frame, text="Press Enter in the last box for another one.").pack(pady=(0, 10))
+
+        # The entries scroll, since some people track dozens of habits.
+        list_frame = ttk.Frame(self.frame)
+        list_frame.pack(expand=True, fill="both")
+        self.list_canvas = tk.Canvas(list_frame, highlightthickness=0)
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.list_canvas.yview)
+        self.list_canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.list_canvas.pack(side="left", expand=True, fill="both")
+        self.entries_frame = ttk.Frame(self.list_canvas)
+        self.list_canvas.create_window((0, 0), window=self.entries_frame, anchor="nw")
+        self.entries_frame.bind("<Configure>", lambda event: self.list_canvas.configure(scrollregion=self.list_canvas.bbox("all")))
 
         self.entries = []
-        for i in range(5):
-            ttk.Label(self.frame, text=f"Habit {i+1}:").pack(anchor="w", padx=10)
-            entry = ttk.Entry(self.frame, width=40)
-            entry.pack(pady=5, padx=10)
-            self.entries.append(entry)
+        for _ in range(initial_rows):
+            self.add_entry()
+        self.entries[0].focus_set()
 
-        save_button = ttk.Button(self.frame, text="Save and Start", command=self.save_habits)
-        save_button.pack(pady=20)
+        buttons = ttk.Frame(self.frame)
+        buttons.pack(pady=(10, 0))
+        ttk.Button(buttons, text="Add Habit", command=self.add_entry).pack(side="left", padx=5)
+        ttk.Button(buttons, text="Save and Start", command=self.save_habits).pack(side="left", padx=5)
+
+    def add_entry(self, event=None):
+        if len(self.entries) >= HABIT_BITS:
+            return
+        ttk.Label(self.entries_frame, text=f"Habit {len(self.entries) + 1}:").pack(anchor="w", padx=10)
+        entry = ttk.Entry(self.entries_frame, width=40)
+        entry.pack(pady=5, padx=10)
+        entry.bind("<Return>", self.on_return)
+        self.entries.append(entry)
+        if event is not None:
+            entry.focus_set()
+            self.list_canvas.update_idletasks()
+            self.list_canvas.yview_moveto(1.0)
+
+    def on_return(self, event):
+        if event.widget is self.entries[-1]:
+            self.add_entry(event)
+        else:
+            event.widget.tk_focusNext().focus_set()
 
     def save_habits(self):
-        habits = [entry.get().strip() for entry in self.entries]
-        if any(not habit for habit in habits):
-            messagebox.showerror("Error", "Please fill in all 5 habits.")
+        # Blank boxes are just unused rows.
+        habits = [habit for habit in (entry.get().strip() for entry in self.entries) if habit]
+        if not habits:
+            messagebox.showerror("Error", "Please enter at least one habit.")
             return
-        
-        save_habits_config(habits)
+        duplicates = sorted({habit for habit in habits if habits.count(habit) > 1})
+        if duplicates:
+            messagebox.showerror("Error", f"Each habit needs a different name: {', '.join(duplicates)}")
+            return
+
+        save_habits_config(habits, self.config_path)
         
         for widget in self.frame.winfo_children():
             widget.destroy()
@@ -59,18 +89,67 @@ class SetupWindow:
         
         self.on_complete(habits)
 
+def profile_habits(profile):
+    return load_habits_config(profiles.profile_paths(profile).habits) or DEFAULT_HABITS
+
 class HabitTracker:
-    def __init__(self, root, habits):
+    def __init__(self, root, habits, profile=profiles.DEFAULT_PROFILE):
         self.root = root
-        self.habits = habits
         self.root.title("Habit Tracker")
         self.root.configure(bg="#f0f0f0")
 
+        self.profile = profile
+        self.profiles = profiles.ProfileCache(lambda name: habits if name == profile else profile_habits(name))
+        self.habit_log = self.profiles.get(profile)
+        self.habits = self.habit_log.habits
         self.habit_states = [False] * len(self.habits)
-
+        # Sync commits the default profile's habits.json whichever profile is showing,
+        # so that is the store it flushes and the writer lock it holds while staging.
+        default_data = profiles.profile_paths(profiles.DEFAULT_PROFILE).data
+        self.sync_worker = sync.worker_from_env(prepare=lambda: self.profiles.flush(profiles.DEFAULT_PROFILE),
+                                                lock_path=default_data + ".lock")
+        self.profiler = profiling.attach(self)
+
+        self.chart = None
+        self.heatmap = None
+        self.matrix_view = None
         self.create_widgets()
         self.load_daily_habits_state()
         self.update_background()
+        startup.after_first_paint(self.root, self.finish_startup)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def configure_styles(self):
+        # ttk styles belong to the active theme, so this runs again once the
+        # theme is applied after first paint.
+        self.root.style = ttk.Style()
+        self.root.style.configure("Main.TFrame", background="#f0f0f0")
+        self.root.style.configure("TButton", padding=10, font=("Helvetica", 12))
+        self.root.style.configure("Header.TLabel", background="#f0f0f0", font=("Helvetica", 18, "bold"))
+        self.root.style.configure("Puzzle.TLabel", background="#f0f0f0", font=("Helvetica", 14, "bold"))
+        self.root.style.configure("View.TRadiobutton", background="#f0f0f0", font=("Helvetica", 11))
+        self.root.style.configure("Rates.TLabel", background="#f0f0f0", font=("Helvetica", 11))
+
+    def finish_startup(self):
+        startup.mark("first_window")
+        startup.apply_theme(self.root, "arc")
+        self.configure_styles()
+        self.update_background()
+        self.root.after(0, self.load_chart)
+
+    def load_chart(self):
+        # matplotlib is the bulk of import time, so the graph panel is
+        # filled in only after the wheel and log button are on screen.
+        from chart import HabitChart
+
+        self.graph_loading_label.destroy()
+        self.chart = HabitChart(self.graph_frame)
+        if self.profiler is not None:
+            self.profiler.instrument_chart(self.chart)
+        self.update_graph()
+        self.root.update_idletasks()
+        startup.mark("interactive")
+        startup.finish_probe(self.root)
 
     def create_widgets(self):
         left_frame = ttk.Frame(self.root, style="Main.TFrame")
@@ -79,29 +158,51 @@ class HabitTracker:
         content_frame = ttk.Frame(left_frame, style="Main.TFrame")
         content_frame.pack(expand=True)
 
-        self.root.style = ttk.Style()
-        self.root.style.configure("Main.TFrame", background="#f0f0f0")
-        self.root.style.configure("TButton", padding=10, font=("Helvetica", 12))
-        self.root.style.configure("Header.TLabel", background="#f0f0f0", font=("Helvetica", 18, "bold"))
-        self.root.style.configure("Puzzle.TLabel", background="#f0f0f0", font=("Helvetica", 14, "bold"))
+        self.configure_styles()
+
+        self.profile_var = tk.StringVar(value=self.profile)
+        self.profile_menu = ttk.Combobox(content_frame, textvariable=self.profile_var, state="readonly", width=24)
+        self.profile_menu.bind("<<ComboboxSelected>>", self.on_profile_selected)
+        self.refresh_profile_menu()
+        self.profile_menu.pack(pady=(0, 10))
 
         header_label = ttk.Label(content_frame, text="Track Your Habits", style="Header.TLabel")
         header_label.pack(pady=(0, 20))
 
         self.canvas = tk.Canvas(content_frame, bg="#f0f0f0", highlightthickness=0)
         self.canvas.pack(expand=True, fill='both', pady=20)
+        self.wheel = HabitWheel(self.canvas, self.habits)
         self.draw_pentagon()
         self.canvas.bind("<Button-1>", self.on_canvas_click)
-        self.canvas.bind("<Configure>", self.draw_pentagon)
+        self.canvas.bind("<Configure>", Debouncer(self.canvas, self.draw_pentagon))
 
         log_button = ttk.Button(content_frame, text="Log Habits", command=self.log_habits)
         log_button.pack(pady=20)
 
+        self.stats_label = ttk.Label(content_frame, text="", style="Rates.TLabel", justify="left")
+        self.stats_label.pack(pady=(0, 10))
+        self.update_stats()
+
+        self.sync_label = ttk.Label(content_frame, text="", style="Rates.TLabel")
+        if self.sync_worker is not None:
+            self.sync_label.pack()
+            self.poll_sync_status()
+
         right_frame = ttk.Frame(self.root, style="Main.TFrame")
         right_frame.pack(side="right", expand=True, fill="both", padx=(20, 40), pady=40)
 
+        self.graph_view = tk.StringVar(value="Week")
+        view_frame = ttk.Frame(right_frame, style="Main.TFrame")
+        view_frame.pack(side="top", fill="x", pady=(0, 10))
+        for view in VIEWS + (HEATMAP_VIEW, CORRELATION_VIEW):
+            ttk.Radiobutton(view_frame, text=view, value=view, variable=self.graph_view, style="View.TRadiobutton", command=self.update_graph).pack(side="left", padx=(0, 10))
+        self.rates_label = ttk.Label(view_frame, text="", style="Rates.TLabel")
+        self.rates_label.pack(side="right")
+
         self.graph_frame = ttk.Frame(right_frame, style="Main.TFrame")
         self.graph_frame.pack(side="top", expand=True, fill="both", pady=(0, 20))
+        self.graph_loading_label = ttk.Label(self.graph_frame, text="Loading graph...", style="Rates.TLabel")
+        self.graph_loading_label.pack(expand=True)
         
         self.puzzle_frame = ttk.Frame(right_frame, style="Main.TFrame")
         self.puzzle_frame.pack(side="bottom", expand=True, fill="both")
@@ -111,40 +212,18 @@ class HabitTracker:
 
         self.puzzle_canvas = tk.Canvas(self.puzzle_frame, bg="#f0f0f0", highlightthickness=0)
         self.puzzle_canvas.pack(expand=True, fill='both', pady=10)
-        self.puzzle_canvas.bind("<Configure>", self.update_puzzle)
+        self.puzzle = ProgressPuzzle(self.puzzle_canvas, habit_count=len(self.habits))
+        self.puzzle_canvas.bind("<Configure>", Debouncer(self.puzzle_canvas, self.update_puzzle))
 
         self.update_graph()
         self.update_puzzle()
 
     def draw_pentagon(self, event=None):
-        self.canvas.delete("all")
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-        center_x, center_y = width / 2, height / 2
-        radius = min(width, height) * 0.35
-        self.triangle_ids = []
-        for i in range(5):
-            angle = (math.pi / 2.5) * i - math.pi / 2
-            x1 = center_x + radius * math.cos(angle)
-            y1 = center_y + radius * math.sin(angle)
-            
-            angle2 = (math.pi / 2.5) * (i + 1) - math.pi / 2
-            x2 = center_x + radius * math.cos(angle2)
-            y2 = center_y + radius * math.sin(angle2)
-            
-            color = "#4caf50" if self.habit_states[i] else "#cccccc"
-            triangle = self.canvas.create_polygon(center_x, center_y, x1, y1, x2, y2, fill=color, outline="white", width=2)
-            self.triangle_ids.append(triangle)
-
-            label_angle = (angle + angle2) / 2
-            label_x = center_x + (radius + 25) * math.cos(label_angle)
-            label_y = center_y + (radius + 25) * math.sin(label_angle)
-            self.canvas.create_text(label_x, label_y, text=self.habits[i], font=("Helvetica", 10, "bold"))
+        self.wheel.render(self.habit_states)
 
     def on_canvas_click(self, event):
-        item = self.canvas.find_closest(event.x, event.y)[0]
-        if item in self.triangle_ids:
-            index = self.triangle_ids.index(item)
+        index = self.wheel.index_at(event.x, event.y)
+        if index is not None:
             self.habit_states[index] = not self.habit_states[index]
             self.draw_pentagon()
             self.update_background()
@@ -161,149 +240,194 @@ class HabitTracker:
         self.root.style.configure("Main.TFrame", background=color)
         self.root.style.configure("Header.TLabel", background=color)
         self.root.style.configure("Puzzle.TLabel", background=color)
+        self.root.style.configure("View.TRadiobutton", background=color)
+        self.root.style.configure("Rates.TLabel", background=color)
 
     def log_habits(self):
-        data = self.load_data()
-        today_str = datetime.now().strftime("%Y-%m-%d")
-        
-        completed_today = [self.habits[i] for i, state in enumerate(self.habit_states) if state]
-        
-        data[today_str] = completed_today
-        self.save_data(data)
+        self.habit_log.log_states(self.habit_states)
+        if self.sync_worker is not None:
+            self.sync_worker.request()
         
         self.habit_states = [False] * len(self.habits)
         self.draw_pentagon()
         self.update_graph()
+        self.update_stats()
         self.update_puzzle()
         self.update_background()
 
     def load_daily_habits_state(self):
-        data = self.load_data()
-        today_str = datetime.now().strftime("%Y-%m-%d")
-        if today_str in data:
-            completed_today = data[today_str]
-            for i, habit in enumerate(self.habits):
-                if habit in completed_today:
-                    self.habit_states[i] = True
+        self.habit_states = self.habit_log.states_on()
         self.draw_pentagon()
 
-    def load_data(self):
-        try:
-            with open("habits.json", "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {}
-
-    def save_data(self, data):
-        with open("habits.json", "w") as f:
-            json.dump(data, f, indent=4)
-
     def update_graph(self):
-        for widget in self.graph_frame.winfo_children():
-            widget.destroy()
+        self.update_rolling_rates()
+        view = self.graph_view.get()
+        if view == HEATMAP_VIEW:
+            self.show_heatmap()
+            return
+        if view == CORRELATION_VIEW:
+            self.show_correlation()
+            return
+        for panel in (self.heatmap, self.matrix_view):
+            if panel is not None:
+                panel.pack_forget()
+        if self.chart is None:
+            return
 
-        data = self.load_data()
-        today = datetime.now()
-        start_of_week = today - timedelta(days=today.weekday())
-        week_dates = [(start_of_week + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
-        
-        habits_completed = [len(data.get(date, [])) for date in week_dates]
+        buckets, habits_completed = self.habit_log.period_counts(view)
+        labels = [label for label, start, end in buckets]
 
         if not any(habits_completed):
-            no_data_label = ttk.Label(self.graph_frame, text="No habit data for this week.", style="Header.TLabel")
-            no_data_label.pack(expand=True)
+            self.chart.show_empty(f"No habit data for this {view.lower()}.")
             return
 
-        fig, ax = plt.subplots(figsize=(5, 3), facecolor="#f0f0f0")
-        ax.plot(week_dates, habits_completed, marker='o', linestyle='-', color='#4caf50', markerfacecolor='#4caf50', markersize=8)
-        ax.set_xlabel("Date", color="#333333")
-        ax.set_ylabel("Habits Completed", color="#333333")
-        ax.set_title("Weekly Habit Progress", color="#333333")
-        ax.set_yticks(range(6))
-        ax.set_ylim(0, 5)
-        ax.grid(True, which='both', linestyle='--', linewidth=0.5)
-        ax.set_facecolor("#ffffff")
-        plt.xticks(rotation=45, ha="right", color="#333333")
-        plt.yticks(color="#333333")
-        plt.tight_layout()
-
-        canvas = FigureCanvasTkAgg(fig, master=self.graph_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(expand=True, fill="both")
-        plt.close(fig)
-
-    def _create_rounded_rectangle(self, canvas, x1, y1, x2, y2, radius=25, **kwargs):
-        points = [x1 + radius, y1,
-                  x1 + radius, y1,
-                  x2 - radius, y1,
-                  x2 - radius, y1,
-                  x2, y1,
-                  x2, y1 + radius,
-                  x2, y1 + radius,
-                  x2, y2 - radius,
-                  x2, y2 - radius,
-                  x2, y2,
-                  x2 - radius, y2,
-                  x2 - radius, y2,
-                  x1 + radius, y2,
-                  x1 + radius, y2,
-                  x1, y2,
-                  x1, y2 - radius,
-                  x1, y2 - radius,
-                  x1, y1 + radius,
-                  x1, y1 + radius,
-                  x1, y1]
-        return canvas.create_polygon(points, **kwargs, smooth=True)
+        y_max = self.habit_log.period_capacity(buckets)
+        self.chart.show(labels, habits_completed, f"{VIEW_TITLES[view]} Habit Progress", VIEW_AXIS_LABELS[view], y_max)
+
+    def show_heatmap(self):
+        # Needs numpy but not matplotlib, so it can show before the graph loads.
+        from heatmap import HeatmapView
+
+        if self.heatmap is None:
+            self.heatmap = HeatmapView(self.graph_frame)
+        self.show_panel(self.heatmap)
+        today = date.today()
+        start = self.heatmap.raster.grid_start(today)
+        self.heatmap.show(start, self.habit_log.daily_counts(start, today), len(self.habits), details=self.habit_log.completed_on)
+
+    def show_correlation(self):
+        from analytics import HabitMatrix
+        from matrix_view import MatrixView
+
+        if self.matrix_view is None:
+            self.matrix_view = MatrixView(self.graph_frame)
+        self.show_panel(self.matrix_view)
+        self.matrix_view.show(HabitMatrix.load(self.habit_log))
+
+    def show_panel(self, panel):
+        """Puts the heatmap or the correlation matrix in the graph panel in place of the graph."""
+        for other in (self.heatmap, self.matrix_view):
+            if other is not None and other is not panel:
+                other.pack_forget()
+        if self.chart is not None:
+            self.chart.hide()
+        else:
+            self.graph_loading_label.pack_forget()
+        panel.pack(expand=True, fill="both")
+
+    def update_rolling_rates(self):
+        rates = [f"{days}d {rate:.0%}" for days, rate in self.habit_log.rolling_rates()]
+        self.rates_label.config(text="   ".join(rates))
+
+    def update_stats(self):
+        summary = self.habit_log.summary()
+        overall = summary["any"]
+        lines = [f"Streak: {overall['current_streak']} days (best {overall['longest_streak']})"]
+        habits = list(summary["habits"].items())
+        if len(habits) > STATS_HABIT_LINES:
+            # Only the running streaks fit when there are many habits.
+            habits.sort(key=lambda item: item[1]["current_streak"], reverse=True)
+        for habit, stats in habits[:STATS_HABIT_LINES]:
+            lines.append(f"{habit}: {stats['current_streak']} days (best {stats['longest_streak']}), {stats['week_rate']:.0%} this week")
+        if len(habits) > STATS_HABIT_LINES:
+            lines.append(f"...and {len(habits) - STATS_HABIT_LINES} more")
+        self.stats_label.config(text="\n".join(lines))
+
+    def poll_sync_status(self):
+        # The sync worker reports from its own thread; only the mainloop
+        # touches the label.
+        message = None
+        while not self.sync_worker.status.empty():
+            state, message = self.sync_worker.status.get_nowait()
+        if message is not None:
+            self.sync_label.config(text=message)
+        self.root.after(500, self.poll_sync_status)
+
+    def on_close(self):
+        if self.sync_worker is not None:
+            self.sync_label.config(text="Syncing before exit...")
+            self.root.update_idletasks()
+            self.sync_worker.stop(timeout=10)
+        if self.chart is not None:
+            self.chart.close()
+        self.profiles.close()
+        self.root.destroy()
+
+    def refresh_profile_menu(self):
+        self.profile_menu["values"] = profiles.list_profiles() + [NEW_PROFILE_OPTION]
+
+    def on_profile_selected(self, event=None):
+        name = self.profile_var.get()
+        if name == NEW_PROFILE_OPTION:
+            self.profile_var.set(self.profile)
+            self.new_profile()
+        else:
+            self.switch_profile(name)
+
+    def new_profile(self):
+        name = simpledialog.askstring("New Profile", "Profile name:", parent=self.root)
+        if not name or not name.strip():
+            return
+        name = name.strip()
+        if name in profiles.list_profiles():
+            self.switch_profile(name)
+            return
+        try:
+            paths = profiles.create_profile(name)
+        except (ValueError, OSError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.refresh_profile_menu()
+        top = tk.Toplevel(self.root)
+        top.transient(self.root)
+
+        def start(habits):
+            top.destroy()
+            self.switch_profile(name)
+        SetupWindow(top, start, config_path=paths.habits)
+
+    def switch_profile(self, name):
+        """Shows another profile's habits and history; recently used ones are still open."""
+        if name == self.profile:
+            return
+        self.habit_log = self.profiles.get(name)
+        if self.profiler is not None:
+            self.profiler.instrument_store(self.habit_log.store)
+        self.profile = name
+        self.profile_var.set(name)
+        profiles.save_last_profile(name)
+        if self.habit_log.habits != self.habits:
+            self.habits = self.habit_log.habits
+            self.canvas.delete("all")
+            self.wheel = HabitWheel(self.canvas, self.habits)
+            self.puzzle_canvas.delete("all")
+            self.puzzle = ProgressPuzzle(self.puzzle_canvas, habit_count=len(self.habits))
+        self.load_daily_habits_state()
+        self.update_graph()
+        self.update_stats()
+        self.update_puzzle()
+        self.update_background()
 
     def update_puzzle(self, event=None):
-        self.puzzle_canvas.delete("all")
-
-        data = self.load_data()
-        today = datetime.now()
-        start_of_week = today - timedelta(days=today.weekday())
-        week_dates = [(start_of_week + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
-        
-        total_habits_this_week = sum(len(data.get(date, [])) for date in week_dates)
-
-        canvas_width = self.puzzle_canvas.winfo_width()
-        canvas_height = self.puzzle_canvas.winfo_height()
-        
-        rows, cols = 5, 7
-        gap = 5
-        corner_radius = 8
-
-        cell_width = (canvas_width - (cols + 1) * gap) / cols
-        cell_height = (canvas_height - (rows + 1) * gap) / rows
-
-        for r in range(rows):
-            for c in range(cols):
-                x1 = gap + c * (cell_width + gap)
-                y1 = gap + r * (cell_height + gap)
-                x2 = x1 + cell_width
-                y2 = y1 + cell_height
-                self._create_rounded_rectangle(self.puzzle_canvas, x1, y1, x2, y2, radius=corner_radius, fill="#e0e0e0", outline="")
-
-        for i in range(min(total_habits_this_week, rows * cols)):
-            row = i // cols
-            col = i % cols
-            x1 = gap + col * (cell_width + gap)
-            y1 = gap + row * (cell_height + gap)
-            x2 = x1 + cell_width
-            y2 = y1 + cell_height
-            self._create_rounded_rectangle(self.puzzle_canvas, x1, y1, x2, y2, radius=corner_radius, fill="#4caf50", outline="")
+        self.puzzle.render(self.habit_log.week_total())
 
 def main():
-    root = ThemedTk(theme="arc")
+    profiling.enable_from_args()
+    root = tk.Tk()
     
+    profile = profiles.profile_from_args()
+
     def launch_app(habits):
         root.geometry("1200x800")
-        app = HabitTracker(root, habits)
+        app = HabitTracker(root, habits, profile)
 
-    habits = load_habits_config()
+    paths = profiles.create_profile(profile)
+    habits = load_habits_config(paths.habits)
     if habits:
         launch_app(habits)
     else:
-        SetupWindow(root, on_complete=launch_app)
+        SetupWindow(root, on_complete=launch_app, config_path=paths.habits)
+        startup.after_first_paint(root, lambda: startup.apply_theme(root, "arc"))
     
     root.mainloop()
 
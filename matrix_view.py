@@ -0,0 +1,155 @@
+"""
+The habit correlation matrix as a grid of cells, for the graph panel: row
+habit against column habit on the same day or the next, blue where they go
+together and red where one tends to mean not the other.
+
+Like the heatmap, the grid is rasterized in one numpy pass into a single
+PhotoImage, and hovering maps the pixel back to its cell arithmetically.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+from heatmap import BACKGROUND, hex_to_rgb
+
+POSITIVE = "#2166ac"
+NEGATIVE = "#b2182b"
+NEUTRAL = "#ffffff"
+MISSING = "#ebedf0"
+LAGS = (("Same day", 0), ("Next day", 1))
+LABEL_CHARS = 14
+
+
+class MatrixRaster:
+    """The matrix's pixels and geometry for `size` habits, without Tk."""
+
+    def __init__(self, size, extent=360, gap=1):
+        self.size = size
+        self.gap = gap
+        self.cell = max(4, min(40, extent // max(size, 1) - gap))
+        self.pitch = self.cell + gap
+        self.extent = size * self.pitch + gap
+        self.background = np.array(hex_to_rgb(BACKGROUND), dtype=np.float64)
+        self.neutral = np.array(hex_to_rgb(NEUTRAL), dtype=np.float64)
+        self.positive = np.array(hex_to_rgb(POSITIVE), dtype=np.float64)
+        self.negative = np.array(hex_to_rgb(NEGATIVE), dtype=np.float64)
+        self.missing = np.array(hex_to_rgb(MISSING), dtype=np.float64)
+        # Each pixel's row/column cell index along one axis, or -1 in a gap.
+        offsets = np.arange(self.extent) - gap
+        self.axis_cells = np.where((offsets >= 0) & (offsets % self.pitch < self.cell), offsets // self.pitch, -1)
+
+    def cell_colors(self, values):
+        """(size, size, 3) colours for values in [-1, 1]; NaN is MISSING."""
+        values = np.asarray(values, dtype=np.float64)
+        strength = np.clip(np.abs(np.nan_to_num(values)), 0, 1)[..., np.newaxis]
+        target = np.where((values >= 0)[..., np.newaxis], self.positive, self.negative)
+        colors = self.neutral + strength * (target - self.neutral)
+        colors[np.isnan(values)] = self.missing
+        return colors.round().astype(np.uint8)
+
+    def render(self, values):
+        """RGB pixels, (extent, extent, 3) uint8."""
+        colors = self.cell_colors(values)
+        rows, cols = self.axis_cells[:, np.newaxis], self.axis_cells[np.newaxis, :]
+        pixels = colors[np.maximum(rows, 0), np.maximum(cols, 0)]
+        pixels[(rows < 0) | (cols < 0)] = self.background.astype(np.uint8)
+        return pixels
+
+    def ppm(self, values):
+        pixels = self.render(values)
+        return f"P6 {self.extent} {self.extent} 255\n".encode("ascii") + pixels.tobytes()
+
+    def index_at(self, x, y):
+        """(row, col) of the cell under pixel (x, y), or None over a gap or outside."""
+        col, cell_x = divmod(int(x) - self.gap, self.pitch)
+        row, cell_y = divmod(int(y) - self.gap, self.pitch)
+        if not (0 <= col < self.size and 0 <= row < self.size) or cell_x >= self.cell or cell_y >= self.cell:
+            return None
+        return row, col
+
+
+class MatrixView:
+    """
+    Correlation between every pair of habits as one canvas image, with the
+    habit names along the top and left, a same-day/next-day toggle and a
+    hover tooltip.
+    """
+
+    def __init__(self, master):
+        self.frame = ttk.Frame(master, style="Main.TFrame")
+        self.lag = tk.IntVar(value=0)
+        lag_frame = ttk.Frame(self.frame, style="Main.TFrame")
+        lag_frame.pack(side="top", fill="x")
+        for text, lag in LAGS:
+            ttk.Radiobutton(lag_frame, text=text, value=lag, variable=self.lag, style="View.TRadiobutton",
+                            command=self._draw).pack(side="left", padx=(0, 10))
+        self.canvas = tk.Canvas(self.frame, highlightthickness=0, bg=BACKGROUND)
+        self.canvas.pack(expand=True)
+        self.tooltip = ttk.Label(self.frame, text="", background="white", relief="solid", borderwidth=1, font=("Helvetica", 10))
+        self.canvas.bind("<Motion>", self._on_hover)
+        self.canvas.bind("<Leave>", lambda event: self._hide_tooltip())
+
+        self.matrix = None
+        self.raster = None
+        self.image = None
+        self.values = None
+        self.co_rates = None
+        self.margin = 0
+        self._hover_index = None
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def pack_forget(self):
+        self.frame.pack_forget()
+        self._hide_tooltip()
+
+    def show(self, matrix):
+        """Draws a HabitMatrix at the selected lag."""
+        self.matrix = matrix
+        if self.raster is None or self.raster.size != len(matrix.habits):
+            self.raster = MatrixRaster(len(matrix.habits))
+        self.co_rates = matrix.conditional_rates()
+        self._draw()
+
+    def _draw(self):
+        if self.matrix is None:
+            return
+        self.values = self.matrix.lagged_correlation(self.lag.get())
+        self.image = tk.PhotoImage(data=self.raster.ppm(self.values), format="PPM")
+        # Labels get whatever a cell's worth of font allows; none below 7 px.
+        font_size = min(10, self.raster.cell - 2)
+        labels = [habit[:LABEL_CHARS] for habit in self.matrix.habits] if font_size >= 7 else []
+        self.margin = 8 + 7 * max((len(label) for label in labels), default=0)
+        self.canvas.delete("all")
+        self.canvas.config(width=self.margin + self.raster.extent, height=self.margin + self.raster.extent)
+        self.canvas.create_image(self.margin, self.margin, image=self.image, anchor="nw")
+        for i, label in enumerate(labels):
+            center = self.margin + self.raster.gap + i * self.raster.pitch + self.raster.cell / 2
+            self.canvas.create_text(self.margin - 4, center, text=label, anchor="e", font=("Helvetica", font_size))
+            self.canvas.create_text(center, self.margin - 4, text=label, anchor="w", angle=90, font=("Helvetica", font_size))
+        self._hover_index = None
+
+    def _hide_tooltip(self):
+        self._hover_index = None
+        self.tooltip.place_forget()
+
+    def _on_hover(self, event):
+        index = None if self.raster is None else self.raster.index_at(event.x - self.margin, event.y - self.margin)
+        if index is None:
+            self._hide_tooltip()
+            return
+        if index == self._hover_index:
+            return
+        self._hover_index = index
+        row, col = index
+        habits = self.matrix.habits
+        when = "the same day" if self.lag.get() == 0 else "the next day"
+        value = self.values[row, col]
+        lines = [f"{habits[row]} -> {habits[col]} {when}",
+                 "r = n/a" if np.isnan(value) else f"r = {value:+.2f}"]
+        if self.lag.get() == 0 and row != col:
+            lines.append(f"{habits[col]} done on {self.co_rates[row, col]:.0%} of {habits[row]} days")
+        self.tooltip.config(text="\n".join(lines))
+        self.tooltip.place(x=self.canvas.winfo_x() + event.x + 12, y=self.canvas.winfo_y() + event.y + 12)
@@ -0,0 +1,55 @@
+"""
+One-shot migration of habits.json and user_habits.json into the SQLite
+store (habits.db next to habits.json).
+
+habits.json is streamed a day at a time, so histories larger than memory
+convert fine. The JSON files are left as they are.
+
+    python migrate_sqlite.py [--data habits.json] [--habits-file user_habits.json]
+    HABIT_TRACKER_STORAGE=sqlite python main.py
+"""
+import argparse
+import os
+import sys
+import time
+
+from habit_core import DATA_FILE, DEFAULT_HABITS, HABITS_CONFIG_FILE, load_habits_config
+from habit_io import iter_json_object
+from sqlite_store import SqliteStore
+
+
+def migrate(json_path, store):
+    """Streams every day of json_path into store. Returns the number of days."""
+    if not os.path.exists(json_path):
+        return 0
+    with open(json_path, "r") as f:
+        return store.load_days(iter_json_object(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert habits.json and user_habits.json to the SQLite store.")
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--habits-file", default=HABITS_CONFIG_FILE)
+    parser.add_argument("--force", action="store_true", help="merge into an existing database")
+    args = parser.parse_args()
+
+    # The configured order goes in first so habit IDs (and bit positions) follow it.
+    habits = load_habits_config(args.habits_file) or DEFAULT_HABITS
+    store = SqliteStore(args.data, habits)
+    try:
+        if store.count_days() and not args.force:
+            print(f"{store.db_path} already has data; pass --force to merge into it", file=sys.stderr)
+            return 1
+        start = time.perf_counter()
+        days = migrate(args.data, store)
+        print(f"Migrated {days} days from {args.data} to {store.db_path} in {time.perf_counter() - start:.1f}s")
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
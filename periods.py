@@ -0,0 +1,41 @@
+import calendar
+from datetime import date, datetime, timedelta
+
+VIEWS = ("Week", "Month", "Year")
+VIEW_TITLES = {"Week": "Weekly", "Month": "Monthly", "Year": "Yearly"}
+VIEW_AXIS_LABELS = {"Week": "Date", "Month": "Day", "Year": "Month"}
+ROLLING_WINDOWS = (30, 90, 365)
+
+
+def week_dates(today):
+    start_of_week = today - timedelta(days=today.weekday())
+    return [start_of_week + timedelta(days=i) for i in range(7)]
+
+
+def period_buckets(view, today):
+    """
+    Splits the week, month or year containing today into graph buckets.
+
+    Returns a list of (label, start, end) tuples with inclusive date bounds:
+    one bucket per day for the week and month views, one per month for the
+    year view.
+    """
+    if isinstance(today, str):
+        today = date.fromisoformat(today)
+    elif isinstance(today, datetime):
+        today = today.date()
+
+    if view == "Week":
+        return [(day.strftime("%Y-%m-%d"), day, day) for day in week_dates(today)]
+    if view == "Month":
+        days_in_month = calendar.monthrange(today.year, today.month)[1]
+        days = [today.replace(day=d) for d in range(1, days_in_month + 1)]
+        return [(day.strftime("%d"), day, day) for day in days]
+    if view == "Year":
+        buckets = []
+        for month in range(1, 13):
+            days_in_month = calendar.monthrange(today.year, month)[1]
+            start = date(today.year, month, 1)
+            buckets.append((start.strftime("%b"), start, start.replace(day=days_in_month)))
+        return buckets
+    raise ValueError(f"Unknown view {view!r}; expected one of {', '.join(VIEWS)}")
@@ -0,0 +1,145 @@
+"""
+Separate habit lists and histories for several people on one machine.
+
+The default profile is the habits.json and user_habits.json the app has
+always used; every other profile keeps its own pair under
+profiles/<name>/. Nothing is read from a profile until it is opened, and
+ProfileCache keeps only the most recently used few open so switching back
+is instant while memory stays bounded.
+"""
+import argparse
+import os
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+from habit_core import DATA_FILE, HABITS_CONFIG_FILE, HabitLog
+
+PROFILE_ENV_VAR = "HABIT_TRACKER_USER"
+PROFILES_DIR = "profiles"
+DEFAULT_PROFILE = "default"
+LAST_PROFILE_FILE = "last_profile"
+PROFILE_CACHE_SIZE = 4
+PROFILE_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9 _.-]{0,63}")
+
+ProfilePaths = namedtuple("ProfilePaths", "data habits")
+
+
+def check_profile_name(name):
+    # Names become directory names, so no separators and no "..".
+    if not PROFILE_NAME.fullmatch(name) or name.endswith(".") or ".." in name:
+        raise ValueError(f"Invalid profile name {name!r}: use letters, digits, spaces, '_', '-' or '.'")
+    # profiles/last_profile is a file, on case-insensitive filesystems too.
+    if name.lower() == LAST_PROFILE_FILE:
+        raise ValueError(f"Invalid profile name {name!r}: the name is reserved")
+    return name
+
+
+def profile_paths(name, root="."):
+    """Where a profile's data and habit list live."""
+    if name == DEFAULT_PROFILE:
+        return ProfilePaths(os.path.join(root, DATA_FILE), os.path.join(root, HABITS_CONFIG_FILE))
+    directory = os.path.join(root, PROFILES_DIR, check_profile_name(name))
+    return ProfilePaths(os.path.join(directory, DATA_FILE), os.path.join(directory, HABITS_CONFIG_FILE))
+
+
+def list_profiles(root="."):
+    """The default profile, then the others by name. Only lists directories; opens nothing."""
+    try:
+        entries = os.scandir(os.path.join(root, PROFILES_DIR))
+    except FileNotFoundError:
+        return [DEFAULT_PROFILE]
+    with entries:
+        names = sorted(entry.name for entry in entries
+                       if entry.is_dir() and entry.name != DEFAULT_PROFILE and PROFILE_NAME.fullmatch(entry.name))
+    return [DEFAULT_PROFILE] + names
+
+
+def create_profile(name, root="."):
+    """Makes the profile's directory; its files appear with the first save."""
+    paths = profile_paths(name, root)
+    os.makedirs(os.path.dirname(paths.data) or ".", exist_ok=True)
+    return paths
+
+
+def load_last_profile(root="."):
+    try:
+        with open(os.path.join(root, PROFILES_DIR, LAST_PROFILE_FILE), "r") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return name if name in list_profiles(root) else None
+
+
+def save_last_profile(name, root="."):
+    os.makedirs(os.path.join(root, PROFILES_DIR), exist_ok=True)
+    with open(os.path.join(root, PROFILES_DIR, LAST_PROFILE_FILE), "w") as f:
+        f.write(name + "\n")
+
+
+def profile_from_args(argv=None, root="."):
+    """
+    The profile to start with: `--user NAME` on the command line, then
+    HABIT_TRACKER_USER, then the last one used, then the default.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--user")
+    args, _ = parser.parse_known_args(argv)
+    name = args.user or os.environ.get(PROFILE_ENV_VAR) or load_last_profile(root) or DEFAULT_PROFILE
+    return check_profile_name(name)
+
+
+class ProfileCache:
+    """
+    Open HabitLogs by profile name, least recently used first. get() opens a
+    profile on a miss; past capacity the least recently used one is closed
+    (its store flushed) and dropped, so it is re-read from disk if it is
+    switched back to. habits_for(name) gives the habit list to open a
+    profile with.
+
+    The cache is shared with the sync worker's thread, so a lock keeps a
+    flush from running into a switch that closes the store being flushed.
+    """
+
+    def __init__(self, habits_for, root=".", capacity=PROFILE_CACHE_SIZE, backend=None):
+        if capacity < 1:
+            raise ValueError("ProfileCache needs room for at least one profile")
+        self.habits_for = habits_for
+        self.root = root
+        self.capacity = capacity
+        self.backend = backend
+        self._logs = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __contains__(self, name):
+        return name in self._logs
+
+    def __len__(self):
+        return len(self._logs)
+
+    def get(self, name):
+        with self._lock:
+            habit_log = self._logs.get(name)
+            if habit_log is not None:
+                self._logs.move_to_end(name)
+                return habit_log
+            paths = profile_paths(name, self.root)
+            habit_log = HabitLog(self.habits_for(name), paths.data, self.backend)
+            self._logs[name] = habit_log
+            while len(self._logs) > self.capacity:
+                _, evicted = self._logs.popitem(last=False)
+                evicted.close()
+            return habit_log
+
+    def flush(self, name):
+        """Flushes the profile's store if it is open; a closed one was flushed when it was evicted."""
+        with self._lock:
+            habit_log = self._logs.get(name)
+            if habit_log is not None:
+                habit_log.flush()
+
+    def close(self):
+        with self._lock:
+            while self._logs:
+                _, habit_log = self._logs.popitem(last=False)
+                habit_log.close()
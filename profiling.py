@@ -0,0 +1,212 @@
+"""
+Opt-in instrumentation for finding out why the app feels slow.
+
+Set HABIT_TRACKER_PROFILE=1 (or to a file name, or run main.py with
+--profile) and the app times its Tk callbacks, the store's file I/O and the
+chart's renders and blits, and watches the mainloop with a heartbeat to
+measure how long it was blocked. On exit it prints a summary table and
+writes a Chrome trace (open it in chrome://tracing or ui.perfetto.dev).
+"""
+import argparse
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+PROFILE_ENV_VAR = "HABIT_TRACKER_PROFILE"
+DEFAULT_TRACE_FILE = "habit_profile.json"
+
+CALLBACKS = ("on_canvas_click", "log_habits", "update_graph", "update_puzzle", "draw_pentagon", "update_background",
+             "switch_profile")
+# Where each store backend actually touches the disk. Missing ones are skipped.
+IO_METHODS = ("_read", "_write_day", "_flush_batch", "set_day", "compact", "flush", "rollover", "_read_segment")
+
+
+class Profiler:
+    """
+    Collects timed spans as Chrome trace "complete" events. Spans may nest
+    and may come from any thread.
+    """
+
+    def __init__(self, trace_path=DEFAULT_TRACE_FILE):
+        self.trace_path = trace_path
+        self.events = []
+        self.start = time.perf_counter()
+        self.pid = os.getpid()
+        self._stores = weakref.WeakSet()
+
+    def _timestamp(self, t):
+        return (t - self.start) * 1e6
+
+    def record(self, name, category, start, end, **args):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": self._timestamp(start),
+            "dur": (end - start) * 1e6,
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    @contextmanager
+    def span(self, name, category="app"):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, time.perf_counter())
+
+    def wrap(self, fn, name, category):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(name, category, start, time.perf_counter())
+        return timed
+
+    def instrument(self, obj, names, category, prefix=""):
+        """
+        Replaces obj's bound methods with timed ones. Do this before the
+        methods are handed to Tk (bind, command=...), which keeps its own
+        reference to whatever it was given.
+        """
+        for name in names:
+            method = getattr(obj, name, None)
+            if method is not None:
+                setattr(obj, name, self.wrap(method, prefix + name, category))
+
+    def instrument_store(self, store):
+        # Switching back to a profile still in the cache hands over a store
+        # that is already timed.
+        if store in self._stores:
+            return
+        self._stores.add(store)
+        self.instrument(store, IO_METHODS, "io", prefix=type(store).__name__ + ".")
+
+    def instrument_chart(self, chart):
+        # Rendering happens on the chart's worker thread; the main thread
+        # only blits the finished raster.
+        self.instrument(chart.renderer, ("render",), "render", prefix="chart.")
+        self.instrument(chart, ("blit",), "render", prefix="chart.")
+
+    def summary(self):
+        """(category, name, calls, total_ms, mean_ms, p95_ms, max_ms) rows, slowest total first."""
+        durations = {}
+        for event in self.events:
+            durations.setdefault((event["cat"], event["name"]), []).append(event["dur"] / 1000)
+        rows = []
+        for (category, name), samples in durations.items():
+            samples.sort()
+            total = sum(samples)
+            p95 = samples[min(int(len(samples) * 0.95), len(samples) - 1)]
+            rows.append((category, name, len(samples), total, total / len(samples), p95, samples[-1]))
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    def print_summary(self, file=None):
+        file = file or sys.stderr
+        print(f"{'category':<10} {'name':<32} {'calls':>6} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}", file=file)
+        for category, name, calls, total, mean, p95, longest in self.summary():
+            print(f"{category:<10} {name:<32} {calls:>6} {total:>10.1f} {mean:>9.2f} {p95:>9.2f} {longest:>9.2f}", file=file)
+
+    def write_trace(self, path=None):
+        path = path or self.trace_path
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        return path
+
+    def finish(self):
+        self.print_summary()
+        print(f"Trace written to {self.write_trace()}", file=sys.stderr)
+
+
+class StallMonitor:
+    """
+    A root.after heartbeat. Each tick should land interval_ms after the last
+    one; any lateness is time the mainloop spent blocked in a callback or a
+    redraw. Stalls longer than threshold_ms become "stall" spans in the trace.
+    """
+
+    def __init__(self, root, profiler, interval_ms=20, threshold_ms=50):
+        self.root = root
+        self.profiler = profiler
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.ticks = 0
+        self.stalled = 0.0
+        self.longest = 0.0
+        self._expected = None
+
+    def start(self):
+        self._expected = time.perf_counter() + self.interval
+        self.root.after(int(self.interval * 1000), self._tick)
+        return self
+
+    def _tick(self):
+        now = time.perf_counter()
+        lateness = now - self._expected
+        self.ticks += 1
+        if lateness > 0:
+            self.stalled += lateness
+            self.longest = max(self.longest, lateness)
+            if lateness >= self.threshold:
+                self.profiler.record("mainloop stall", "stall", self._expected, now, late_ms=round(lateness * 1000, 1))
+        self._expected = now + self.interval
+        self.root.after(int(self.interval * 1000), self._tick)
+
+    def print_summary(self, file=None):
+        file = file or sys.stderr
+        stalls = sum(1 for event in self.profiler.events if event["cat"] == "stall")
+        print(f"mainloop: {self.ticks} heartbeats, {stalls} stalls over {self.threshold * 1000:.0f} ms, "
+              f"{self.stalled * 1000:.0f} ms blocked in total, longest {self.longest * 1000:.0f} ms", file=file)
+
+
+def profiler_from_env():
+    """
+    Returns a Profiler if HABIT_TRACKER_PROFILE is set, else None. A value
+    other than 1 is the path the trace is written to.
+    """
+    value = os.environ.get(PROFILE_ENV_VAR, "0")
+    if value in ("", "0"):
+        return None
+    return Profiler(DEFAULT_TRACE_FILE if value == "1" else value)
+
+
+def attach(app):
+    """
+    Instruments a HabitTracker-like app (callbacks, store I/O, heartbeat) and
+    reports at exit. Call it before the app binds its callbacks. Returns the
+    Profiler, or None when profiling is off.
+    """
+    profiler = profiler_from_env()
+    if profiler is None:
+        return None
+    profiler.instrument(app, CALLBACKS, "callback")
+    profiler.instrument_store(app.habit_log.store)
+    monitor = StallMonitor(app.root, profiler).start()
+
+    def report():
+        profiler.finish()
+        monitor.print_summary()
+    atexit.register(report)
+    return profiler
+
+
+def enable_from_args(argv=None):
+    """Turns profiling on for `--profile [TRACE_FILE]` on the command line."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--profile", nargs="?", const="1", metavar="TRACE_FILE")
+    args, _ = parser.parse_known_args(argv)
+    if args.profile:
+        os.environ[PROFILE_ENV_VAR] = args.profile
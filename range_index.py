@@ -0,0 +1,65 @@
+class FenwickTree:
+    """
+    Binary indexed tree over a growable list of integers.
+
+    Point updates, appends and prefix/range sums are all O(log n), so the
+    per-day completion counts can be summed over any window (a week, a month,
+    the last 365 days) without walking every day in it.
+    """
+
+    def __init__(self, values=()):
+        self._tree = [0]
+        self._values = []
+        for value in values:
+            self._values.append(value)
+            self._tree.append(value)
+        # Linear-time build: push each node's partial sum up to its parent.
+        for i in range(1, len(self._tree)):
+            parent = i + (i & -i)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[i]
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def append(self, value):
+        i = len(self._tree)
+        # Node i covers (i - lowbit(i), i]; everything but the new value is
+        # already summed in the existing prefix.
+        lowbit = i & -i
+        self._tree.append(value + self.prefix_sum(i - 1) - self.prefix_sum(i - lowbit))
+        self._values.append(value)
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def add(self, index, delta):
+        self._values[index] += delta
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def set(self, index, value):
+        self.add(index, value - self._values[index])
+
+    def prefix_sum(self, count):
+        """Sum of the first count values."""
+        total = 0
+        i = min(count, len(self._values))
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, start, end):
+        """Sum of values[start..end], inclusive, clipped to the stored range."""
+        start = max(start, 0)
+        end = min(end, len(self._values) - 1)
+        if start > end:
+            return 0
+        return self.prefix_sum(end + 1) - self.prefix_sum(start)
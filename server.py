@@ -0,0 +1,191 @@
+"""
+Local HTTP API over the habit data, so the Tk app, index.html and scripts
+can share one store instead of each reading habits.json.
+
+    python server.py [--port 8765] [--data habits.json] [--storage journal]
+
+    GET  /habits                     configured habit list
+    GET  /days/2025-07-20            habits logged that day
+    PUT  /days/2025-07-20            {"habits": ["Calculus", ...]}
+    GET  /days?from=...&to=...       logged days in a range
+    GET  /stats[?date=...]           totals, streaks and completion rates
+
+GET responses carry an ETag; a request whose If-None-Match still matches
+gets an empty 304. Everything goes through one HabitLog, and writes are
+serialized on an asyncio.Lock.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+from habit_core import DATA_FILE, DEFAULT_HABITS, HABITS_CONFIG_FILE, HabitLog, load_habits_config, parse_day
+from habit_store import STORAGE_BACKENDS
+
+MAX_BODY = 1 << 20
+REASONS = {200: "OK", 204: "No Content", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class HabitServer:
+    def __init__(self, habit_log):
+        self.habit_log = habit_log
+        self.lock = asyncio.Lock()
+        self._generation = None
+        self._cache = {}
+
+    async def get(self, target):
+        # Bodies are cached per data generation (and day, since stats depend
+        # on it), so revalidating unchanged data needs no work. Holding the
+        # lock keeps reads from seeing a write half-applied.
+        async with self.lock:
+            generation = self.habit_log.store.generation()
+            if generation != self._generation:
+                self._cache.clear()
+                self._generation = generation
+            key = (target, datetime.now().date())
+            cached = self._cache.get(key)
+            if cached is None:
+                body = json.dumps(self.route_get(target)).encode()
+                cached = (f'"{hashlib.sha1(body).hexdigest()[:16]}"', body)
+                self._cache[key] = cached
+            return cached
+
+    def route_get(self, target):
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        if parts == ["habits"]:
+            return self.habit_log.habits
+        if parts == ["stats"]:
+            return self.habit_log.stats(query.get("date"))
+        if parts == ["days"]:
+            return [{"date": date_str, "habits": habits}
+                    for date_str, habits in self.habit_log.query(query.get("from"), query.get("to"))]
+        if len(parts) == 2 and parts[0] == "days":
+            day = parse_day(parts[1])
+            return {"date": day.isoformat(), "habits": self.habit_log.completed_on(day)}
+        raise HttpError(404, f"No such resource: {url.path}")
+
+    async def put(self, target, body):
+        parts = [part for part in urlsplit(target).path.split("/") if part]
+        if len(parts) != 2 or parts[0] != "days":
+            raise HttpError(405, "Only /days/<date> can be written")
+        try:
+            habits = json.loads(body)["habits"]
+        except (ValueError, KeyError, TypeError):
+            raise HttpError(400, 'Expected a JSON body like {"habits": [...]}')
+        if not isinstance(habits, list):
+            raise HttpError(400, "habits must be a list")
+        day = parse_day(parts[1])
+        async with self.lock:
+            # The write and its fsync run off the loop so connections keep
+            # being accepted and parsed meanwhile.
+            completed = await asyncio.get_running_loop().run_in_executor(None, self.habit_log.log, habits, day)
+        return json.dumps({"date": day.isoformat(), "habits": completed}).encode()
+
+    async def respond(self, method, target, headers, body):
+        """Returns (status, extra headers, body) for one request."""
+        if method == "OPTIONS":
+            return 204, {"Access-Control-Allow-Methods": "GET, PUT, OPTIONS",
+                         "Access-Control-Allow-Headers": "Content-Type, If-None-Match"}, b""
+        if method == "GET":
+            etag, payload = await self.get(target)
+            if etag in (tag.strip() for tag in headers.get("if-none-match", "").split(",")):
+                return 304, {"ETag": etag}, b""
+            return 200, {"ETag": etag}, payload
+        if method in ("PUT", "POST"):
+            return 200, {}, await self.put(target, body)
+        raise HttpError(405, f"Method {method} not allowed")
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    status, extra, payload = 413, {}, json.dumps({"error": "Request body too large"}).encode()
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, extra, payload = await self.respond(method, target, headers, body)
+                    except HttpError as e:
+                        status, extra, payload = e.status, {}, json.dumps({"error": str(e)}).encode()
+                    except ValueError as e:
+                        status, extra, payload = 400, {}, json.dumps({"error": str(e)}).encode()
+                    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                lines = [f"HTTP/1.1 {status} {REASONS[status]}",
+                         "Content-Type: application/json",
+                         f"Content-Length: {len(payload)}",
+                         "Cache-Control: no-cache",
+                         "Access-Control-Allow-Origin: *",
+                         "Access-Control-Expose-Headers: ETag"]
+                lines += [f"{name}: {value}" for name, value in extra.items()]
+                if not keep_alive:
+                    lines.append("Connection: close")
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # A dropped connection or an unparseable request; nothing to answer.
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(habit_log, host="127.0.0.1", port=8765, ready=None):
+    server = HabitServer(habit_log)
+    listener = await asyncio.start_server(server.handle, host, port)
+    if ready is not None:
+        ready(listener)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the habit data over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--habits-file", default=HABITS_CONFIG_FILE)
+    parser.add_argument("--storage", choices=list(STORAGE_BACKENDS))
+    args = parser.parse_args()
+
+    habits = load_habits_config(args.habits_file) or DEFAULT_HABITS
+    habit_log = HabitLog(habits, args.data, args.storage)
+    ready = lambda listener: print(f"Serving habit data on http://{args.host}:{listener.sockets[0].getsockname()[1]}/")
+    try:
+        asyncio.run(serve(habit_log, args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        habit_log.close()
+
+
+if __name__ == "__main__":
+    main()
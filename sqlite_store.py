@@ -0,0 +1,281 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from habit_bitmap import HABIT_BITS, LOGGED_BIT, HabitBitmap, to_ordinal
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS habits (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS completions (
+    date TEXT NOT NULL,
+    habit_id INTEGER NOT NULL REFERENCES habits (id),
+    PRIMARY KEY (date, habit_id)
+) WITHOUT ROWID;
+"""
+
+# Statements are module constants so sqlite3's per-connection statement
+# cache hands back the same prepared statement on every call.
+SELECT_DAY = "SELECT habit_id FROM completions WHERE date = ? ORDER BY habit_id"
+SELECT_LOGGED = "SELECT 1 FROM days WHERE date = ?"
+SELECT_CONTAINS = "SELECT 1 FROM completions WHERE date = ? AND habit_id = ?"
+COUNT_DAY = "SELECT COUNT(*) FROM completions WHERE date = ?"
+COUNT_RANGE = "SELECT COUNT(*) FROM completions WHERE date BETWEEN ? AND ?"
+DAILY_COUNTS = "SELECT date, COUNT(*) FROM completions WHERE date BETWEEN ? AND ? GROUP BY date"
+SELECT_RANGE = """
+SELECT days.date, completions.habit_id FROM days LEFT JOIN completions ON completions.date = days.date
+WHERE days.date BETWEEN ? AND ? ORDER BY days.date, completions.habit_id
+"""
+INSERT_DAY = "INSERT OR IGNORE INTO days (date) VALUES (?)"
+DELETE_COMPLETIONS = "DELETE FROM completions WHERE date = ?"
+INSERT_COMPLETION = "INSERT INTO completions (date, habit_id) VALUES (?, ?)"
+
+FIRST_DATE = date.min.isoformat()
+LAST_DATE = date.max.isoformat()
+
+
+class SqliteStore:
+    """
+    Habit history in SQLite: one row per logged day and one (date, habit_id)
+    row per completion, keyed on date so week, month and rolling-window
+    sums are single indexed range queries.
+
+    The database lives next to the JSON path (habits.json -> habits.db) and
+    runs in WAL mode, so readers in other processes never block the writer.
+    Habit IDs follow the configured habit order and double as bit positions
+    in the masks set_day returns, like HabitBitmap's. The full-history
+    bitmap behind the streak stats is only loaded when asked for.
+    """
+
+    def __init__(self, path="habits.json", habits=()):
+        base, _ = os.path.splitext(path)
+        self.path = path
+        self.db_path = base + ".db"
+        self.lock_path = path + ".lock"
+        self.habits = list(habits)
+        self.conn = sqlite3.connect(self.db_path, isolation_level=None, cached_statements=64, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.executescript(SCHEMA)
+        self._batch_depth = 0
+        self._writes = 0
+        self._bitmap = None
+        self._data_version = self._current_data_version()
+        self.habit_ids = {}
+        self.habit_names = {}
+        self._load_habits()
+        with self._transaction():
+            for habit in self.habits:
+                self.intern(habit)
+
+    def _current_data_version(self):
+        # Changes whenever another connection commits.
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _load_habits(self):
+        self.habit_ids = {name: habit_id for habit_id, name in self.conn.execute("SELECT id, name FROM habits")}
+        self.habit_names = {habit_id: name for name, habit_id in self.habit_ids.items()}
+
+    def intern(self, habit):
+        habit_id = self.habit_ids.get(habit)
+        if habit_id is None:
+            if len(self.habit_ids) >= HABIT_BITS:
+                raise ValueError(f"Cannot track more than {HABIT_BITS} distinct habits")
+            habit_id = len(self.habit_ids)
+            self.conn.execute("INSERT INTO habits (id, name) VALUES (?, ?)", (habit_id, habit))
+            self.habit_ids[habit] = habit_id
+            self.habit_names[habit_id] = habit
+        return habit_id
+
+    @contextmanager
+    def _transaction(self):
+        if self._batch_depth:
+            yield
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Holding the write lock, catch up on anything another process
+            # committed (new habits, days behind the cached bitmap).
+            self.refresh()
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            self._load_habits()
+            # The cached bitmap took the rolled back writes too.
+            self._bitmap = None
+            self._writes += 1
+            raise
+        self.conn.execute("COMMIT")
+        self._data_version = self._current_data_version()
+
+    def refresh(self):
+        """Drops cached state if another connection committed. Returns True if one did."""
+        if self._batch_depth:
+            return False
+        version = self._current_data_version()
+        if version == self._data_version:
+            return False
+        self._data_version = version
+        self._bitmap = None
+        self._load_habits()
+        return True
+
+    def generation(self):
+        """Changes whenever the stored data does."""
+        self.refresh()
+        return (self._data_version, self._writes)
+
+    def bitmap(self):
+        """The whole history as a HabitBitmap, loaded on first use and kept in step with writes."""
+        self.refresh()
+        if self._bitmap is None:
+            names = [self.habit_names[habit_id] for habit_id in sorted(self.habit_names)]
+            bitmap = HabitBitmap(names)
+            for date_str, habit_ids in self._iter_rows(FIRST_DATE, LAST_DATE):
+                bitmap.set_day(date_str, [self.habit_names[habit_id] for habit_id in habit_ids])
+            self._bitmap = bitmap
+        return self._bitmap
+
+    def stats_base(self, end_ordinal=None):
+        """None: bitmap() always holds the whole history."""
+        return None
+
+    def _mask(self, date_str):
+        mask = LOGGED_BIT if self.conn.execute(SELECT_LOGGED, (date_str,)).fetchone() else 0
+        for (habit_id,) in self.conn.execute(SELECT_DAY, (date_str,)):
+            mask |= 1 << habit_id
+        return mask
+
+    def _iter_rows(self, start, end):
+        """Yields (date_str, habit_ids) for logged days in [start, end], streaming from one cursor."""
+        current, habit_ids = None, []
+        for date_str, habit_id in self.conn.execute(SELECT_RANGE, (start, end)):
+            if date_str != current:
+                if current is not None:
+                    yield current, habit_ids
+                current, habit_ids = date_str, []
+            if habit_id is not None:
+                habit_ids.append(habit_id)
+        if current is not None:
+            yield current, habit_ids
+
+    def data(self):
+        return dict(self.iter_days())
+
+    def get(self, date_str):
+        self.refresh()
+        return [self.habit_names[habit_id] for (habit_id,) in self.conn.execute(SELECT_DAY, (date_str,))]
+
+    def get_many(self, dates):
+        return {date_str: self.get(date_str) for date_str in dates}
+
+    def count_days(self):
+        """Number of logged days."""
+        return self.conn.execute("SELECT COUNT(*) FROM days").fetchone()[0]
+
+    def count(self, date_str):
+        return self.conn.execute(COUNT_DAY, (date_str,)).fetchone()[0]
+
+    def contains(self, date_str, habit):
+        self.refresh()
+        habit_id = self.habit_ids.get(habit)
+        if habit_id is None:
+            return False
+        return self.conn.execute(SELECT_CONTAINS, (date_str, habit_id)).fetchone() is not None
+
+    def range_count(self, start, end):
+        """Total completions between two dates (inclusive), as one range query."""
+        return self.conn.execute(COUNT_RANGE, (str(start), str(end))).fetchone()[0]
+
+    def week_sum(self, week_start):
+        start = date.fromordinal(to_ordinal(week_start))
+        return self.range_count(start, start + timedelta(days=6))
+
+    def daily_counts(self, start, end):
+        start_ordinal, end_ordinal = to_ordinal(start), to_ordinal(end)
+        counts = [0] * max(0, end_ordinal - start_ordinal + 1)
+        first, last = date.fromordinal(start_ordinal).isoformat(), date.fromordinal(end_ordinal).isoformat()
+        for date_str, count in self.conn.execute(DAILY_COUNTS, (first, last)):
+            counts[date.fromisoformat(date_str).toordinal() - start_ordinal] = count
+        return counts
+
+    def range_masks(self, start, end):
+        """The mask of every day from start to end, 0 for days not logged. Bits follow bitmap().habit_ids."""
+        return self.bitmap().range_masks(to_ordinal(start), to_ordinal(end))
+
+    def completion_rate(self, days, end, habit_count=None):
+        """Share of possible completions achieved in the days up to end."""
+        habit_count = habit_count or len(self.habits) or len(self.habit_ids)
+        if not habit_count:
+            return 0.0
+        end_ordinal = to_ordinal(end)
+        start = date.fromordinal(end_ordinal - days + 1)
+        return self.range_count(start, date.fromordinal(end_ordinal)) / (days * habit_count)
+
+    def iter_days(self, start=None, end=None):
+        """Yields (date_str, habits) for logged days in [start, end], oldest first."""
+        self.refresh()
+        start = FIRST_DATE if start is None else str(start)
+        end = LAST_DATE if end is None else str(end)
+        for date_str, habit_ids in self._iter_rows(start, end):
+            yield date_str, [self.habit_names[habit_id] for habit_id in habit_ids]
+
+    def set_day(self, date_str, habits):
+        """Records habits for date_str and returns the day's previous mask."""
+        with self._transaction():
+            old_mask = self._mask(date_str)
+            habit_ids = sorted({self.intern(habit) for habit in habits})
+            self.conn.execute(INSERT_DAY, (date_str,))
+            self.conn.execute(DELETE_COMPLETIONS, (date_str,))
+            self.conn.executemany(INSERT_COMPLETION, [(date_str, habit_id) for habit_id in habit_ids])
+        self._writes += 1
+        if self._bitmap is not None:
+            self._bitmap.set_day(date_str, [self.habit_names[habit_id] for habit_id in habit_ids])
+        return old_mask
+
+    @contextmanager
+    def batch(self):
+        """Runs many set_day calls in one transaction."""
+        with self._transaction():
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+
+    def load_days(self, records):
+        """
+        Bulk-inserts (date_str, habits) records in one transaction, for
+        migrations into an empty store. Returns the number of records read.
+        """
+        count = 0
+        with self.batch():
+            for date_str, habits in records:
+                if not isinstance(habits, list):
+                    raise ValueError(f"{date_str}: expected a list of habits, got {habits!r}")
+                date_str = date.fromisoformat(date_str).isoformat()
+                habit_ids = {self.intern(habit) for habit in habits}
+                self.conn.execute(INSERT_DAY, (date_str,))
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO completions (date, habit_id) VALUES (?, ?)",
+                    [(date_str, habit_id) for habit_id in habit_ids],
+                )
+                count += 1
+        self._writes += 1
+        self._bitmap = None
+        return count
+
+    def flush(self):
+        """Folds the WAL back into the main database file."""
+        self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        self.flush()
+        self.conn.close()
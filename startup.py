@@ -0,0 +1,39 @@
+import json
+import os
+import time
+
+STARTUP_PROBE_ENV_VAR = "HABIT_TRACKER_STARTUP_PROBE"
+
+
+def probing():
+    return bool(os.environ.get(STARTUP_PROBE_ENV_VAR))
+
+
+def mark(event):
+    """
+    Reports a startup milestone as a JSON line on stdout when the startup
+    probe is enabled (see benchmarks/bench_startup.py).
+    """
+    if probing():
+        print(json.dumps({"event": event, "time": time.time()}), flush=True)
+
+
+def after_first_paint(widget, callback):
+    """
+    Runs callback once Tk has drawn the window: idle callbacks run after the
+    pending redraws, and the extra after(0) lets the paint reach the screen.
+    """
+    widget.after_idle(lambda: widget.after(0, callback))
+
+
+def apply_theme(root, theme="arc"):
+    # ttkthemes pulls in PIL, so it is imported only once there is a window
+    # on screen to theme.
+    from ttkthemes import ThemedStyle
+
+    ThemedStyle(root).set_theme(theme)
+
+
+def finish_probe(root):
+    if probing():
+        root.after(0, root.destroy)
@@ -1,14 +1,32 @@
 
+import os
+import queue
 import subprocess
+import threading
+import time
+import traceback
+from contextlib import nullcontext
 from datetime import datetime
 
+import build_site
+from habit_store import file_lock
+
+SYNC_ENV_VAR = "HABIT_TRACKER_SYNC"
+SYNC_WINDOW_ENV_VAR = "HABIT_TRACKER_SYNC_WINDOW"
+
 def sync_data():
     """
-    Adds, commits, and pushes the habits.json file to the remote repository.
+    Adds, commits, and pushes the habits.json file, and the data/ that
+    index.html reads, to the remote repository.
     """
     try:
-        # Add the habits.json file to the staging area
-        subprocess.run(["git", "add", "habits.json"], check=True)
+        # Rebuild the page's data so the GitHub Pages view keeps up
+        build_site.build_files()
+
+        # Add the files to the staging area, while no tracker is writing
+        # habits.json
+        with file_lock("habits.json.lock"):
+            subprocess.run(["git", "add", "--", "habits.json", build_site.OUT_DIR], check=True)
 
         # Commit the changes with a timestamp
         commit_message = f"Update habit data for {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
@@ -24,5 +42,173 @@ def sync_data():
     except FileNotFoundError:
         print("Git is not installed or not in your PATH. Please install Git and try again.")
 
+def describe_error(error):
+    if isinstance(error, subprocess.CalledProcessError):
+        output = (error.stderr or error.stdout or "").strip().splitlines()
+        for line in output:
+            if line.startswith(("fatal:", "error:")):
+                return line
+        return output[-1] if output else f"git exited with status {error.returncode}"
+    if isinstance(error, FileNotFoundError):
+        return "Git is not installed or not in your PATH."
+    return str(error)
+
+class SyncWorker:
+    """
+    Syncs habit data to the git remote from a background thread.
+
+    request() is cheap and safe to call from the Tk mainloop on every log.
+    Requests arriving within `window` seconds of the first one are coalesced
+    into a single commit, which is then pushed with exponential backoff.
+    Progress is reported as (state, message) tuples on the thread-safe
+    `status` queue, where state is one of "pending", "committed", "pushed",
+    "retrying" or "error".
+
+    repo_dir, remote and branch default to the current repository and its
+    upstream, so the worker can be pointed at a scratch clone of a local
+    bare repository. If lock_path is given, the store's writer lock is held
+    while staging so a half-applied write is never committed.
+    """
+
+    def __init__(self, repo_dir=".", paths=("habits.json",), window=30.0, remote=None, branch=None,
+                 max_attempts=5, initial_backoff=2.0, max_backoff=120.0, prepare=None, lock_path=None):
+        self.repo_dir = repo_dir
+        self.paths = list(paths)
+        self.window = window
+        self.remote = remote
+        self.branch = branch
+        self.max_attempts = max_attempts
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        # Called on the worker thread before staging, e.g. to fold a
+        # storage journal into habits.json.
+        self.prepare = prepare
+        self.lock_path = lock_path
+        self.status = queue.Queue()
+        self._requests = queue.Queue()
+        self._stopping = threading.Event()
+        self._unpushed = False
+        self._thread = threading.Thread(target=self._run, name="habit-sync", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def request(self):
+        """Asks for the current data to be synced at the end of the window."""
+        self._requests.put(time.monotonic())
+
+    def stop(self, timeout=None):
+        """Syncs anything still pending (one push attempt) and stops the thread."""
+        self._stopping.set()
+        self._requests.put(None)
+        self._thread.join(timeout)
+
+    def _report(self, state, message):
+        self.status.put((state, message))
+
+    def _git(self, *args, check=True):
+        return subprocess.run(["git", *args], cwd=self.repo_dir, check=check, capture_output=True, text=True)
+
+    def _run(self):
+        while True:
+            if self._requests.get() is None:
+                if self._unpushed:
+                    self._push(attempts=1)
+                return
+
+            changes = 1
+            stopping = False
+            self._report("pending", "Changes waiting to sync")
+            deadline = time.monotonic() + self.window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                changes += 1
+
+            self._sync(changes, attempts=1 if stopping else self.max_attempts)
+            if stopping:
+                return
+
+    def _sync(self, changes, attempts):
+        try:
+            if self.prepare is not None:
+                self.prepare()
+            committed = self._commit(changes)
+        except (subprocess.CalledProcessError, OSError) as e:
+            self._report("error", f"Sync failed: {describe_error(e)}")
+            return
+        except Exception as e:
+            # A bug in prepare or here must not end the thread, or the
+            # status would say "waiting to sync" forever.
+            traceback.print_exc()
+            self._report("error", f"Sync failed: {describe_error(e)}")
+            return
+        if committed or self._unpushed:
+            self._unpushed = True
+            self._push(attempts)
+
+    def _commit(self, changes):
+        with file_lock(self.lock_path) if self.lock_path else nullcontext():
+            self._git("add", "--", *self.paths)
+        if self._git("diff", "--cached", "--quiet", "--", *self.paths, check=False).returncode == 0:
+            return False
+        commit_message = f"Update habit data for {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        if changes > 1:
+            commit_message += f" ({changes} logs)"
+        # Committing only our paths leaves anything else the user staged alone.
+        self._git("commit", "-m", commit_message, "--", *self.paths)
+        self._report("committed", commit_message)
+        return True
+
+    def _push(self, attempts):
+        command = ["push"]
+        if self.remote:
+            command.append(self.remote)
+            if self.branch:
+                command.append(f"HEAD:{self.branch}")
+        delay = self.initial_backoff
+        for attempt in range(1, attempts + 1):
+            try:
+                self._git(*command)
+            except (subprocess.CalledProcessError, OSError) as e:
+                if attempt == attempts:
+                    self._report("error", f"Push failed, will retry on next sync: {describe_error(e)}")
+                    return
+                self._report("retrying", f"Push failed, retrying in {delay:g}s: {describe_error(e)}")
+                if self._stopping.wait(delay):
+                    self._report("error", "Push abandoned on shutdown; commits are kept locally")
+                    return
+                delay = min(delay * 2, self.max_backoff)
+            else:
+                self._unpushed = False
+                self._report("pushed", "Synced habit data to the remote repository")
+                return
+
+def worker_from_env(prepare=None, lock_path=None):
+    """
+    Returns a started SyncWorker if HABIT_TRACKER_SYNC is set, else None.
+    HABIT_TRACKER_SYNC_WINDOW overrides the coalescing window in seconds.
+    """
+    if os.environ.get(SYNC_ENV_VAR, "0") in ("", "0"):
+        return None
+    window = float(os.environ.get(SYNC_WINDOW_ENV_VAR, "30"))
+
+    def prepare_site():
+        if prepare is not None:
+            prepare()
+        # index.html reads data/, so it is rebuilt and committed with habits.json.
+        build_site.build_files()
+    return SyncWorker(paths=("habits.json", build_site.OUT_DIR), window=window, prepare=prepare_site,
+                      lock_path=lock_path).start()
+
 if __name__ == "__main__":
     sync_data()
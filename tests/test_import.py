@@ -0,0 +1,44 @@
+"""
+An import that fails part way through saves nothing, whatever the backend.
+
+    python -m pytest tests
+"""
+import io
+import os
+import tempfile
+import unittest
+
+from habit_core import HabitLog
+from habit_io import read_csv
+from habit_store import STORAGE_BACKENDS
+
+HABITS = ["Calculus", "Reading"]
+GOOD_CSV = "date,habit\n2025-01-01,Calculus\n"
+BAD_CSV = "date,habit\n2025-01-02,Calculus\n2025-01-03,Reading\n2025-13-45,Reading\n2025-01-04,Calculus\n"
+
+
+class FailedImportTest(unittest.TestCase):
+    def check_backend(self, backend):
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, "habits.json")
+            habit_log = HabitLog(HABITS, path, backend)
+            habit_log.import_records(read_csv(io.StringIO(GOOD_CSV)))
+            with self.assertRaises(ValueError):
+                habit_log.import_records(read_csv(io.StringIO(BAD_CSV)))
+            # Neither memory nor the files keep the rows before the bad one.
+            self.assertEqual(habit_log.store.data(), {"2025-01-01": ["Calculus"]})
+            habit_log.log_states([False, True], "2025-01-05")
+            habit_log.close()
+
+            reopened = HabitLog(HABITS, path, backend)
+            self.assertEqual(reopened.store.data(), {"2025-01-01": ["Calculus"], "2025-01-05": ["Reading"]})
+            reopened.close()
+
+    def test_backends(self):
+        for backend in STORAGE_BACKENDS:
+            with self.subTest(backend=backend):
+                self.check_backend(backend)
+
+
+if __name__ == "__main__":
+    unittest.main()